@@ -12,9 +12,37 @@
 # make_server() reçoit le chemin du dossier de l'application pour que
 # les modules serveur puissent accéder aux fichiers de données (CSV, GeoJSON…)
 # sans hardcoder leur emplacement.
+#
+# Pour servir l'application sur plusieurs processus avec des données
+# préconstruites et partagées : python -m server.deploiement (voir ce fichier).
+#
+# SIMPY_METRICS=1 active la mesure du temps de rendu de chaque output
+# (cf. server/_metrics.py) et de la mémoire retenue par cache et par session
+# (profilage des allocations en plus avec SIMPY_METRICS_MEMOIRE=1), résumées
+# dans le journal. Les routes /metrics et /metrics/memoire ne sont servies que
+# si SIMPY_METRICS_JETON est défini, et exigent l'en-tête
+# « Authorization: Bearer <jeton> » : l'adresse du client ne les protège pas
+# derrière un proxy inverse.
+import os
+
 from shiny import App
 from pathlib import Path
 from ui import app_ui
+from ui._assets import monter as monter_assets
 from server import make_server
 
 app = App(app_ui, make_server(Path(__file__).parent))
+
+# Fichiers de www/ (feuille de style, logos…) servis sous /assets/ avec une
+# empreinte dans l'URL et un cache navigateur permanent (cf. ui/_assets.py).
+monter_assets(app)
+
+# Déploiement multi-workers (server/deploiement.py) : chaque worker doit pouvoir
+# servir les fichiers JS/CSS de toutes les pages, même s'il ne les a jamais rendues.
+if os.environ.get("SIMPY_BUNDLE_DIR"):
+    from server.deploiement import enregistrer_dependances
+    enregistrer_dependances(app)
+
+if os.environ.get("SIMPY_METRICS"):
+    from server._metrics import activer
+    activer(app)
@@ -0,0 +1,10 @@
+# benchmarks/__init__.py — mesures de performance hors Shiny
+#
+# Scripts à lancer depuis le dossier app/ :
+#   python -m benchmarks.figures   → construction et sérialisation des graphiques Plotly
+#   python -m benchmarks.suite     → chargeurs (froid/chaud), cartes et figures par
+#                                    variante, rendus ; historique JSON et régressions
+#   python -m benchmarks.charge    → test de charge : sessions websocket simulées par
+#                                    paliers, latences par output, mémoire du worker
+#   python -m benchmarks.demarrage → temps de « import app » et coût de chaque import
+#                                    (bibliothèques, modules chargés à la demande)
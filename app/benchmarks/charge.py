@@ -0,0 +1,449 @@
+# benchmarks/charge.py — test de charge : sessions Shiny simulées en parallèle
+#
+# Question : combien d'utilisateurs simultanés un worker tient-il avant que
+# le p95 de latence des outputs dépasse 1 s ?
+#
+# Chaque utilisateur virtuel ouvre le websocket de l'application (même protocole
+# que le navigateur) et rejoue en boucle un parcours scripté :
+#
+#   accueil → Énergie → curseur « année » du bilan glissé sur plusieurs années
+#   → mode sombre activé puis désactivé → onglet FLAP-D et choix d'un hub
+#   → curseurs du simulateur prédictif glissés
+#
+# Après chaque étape, l'utilisateur attend que la page soit stable (serveur
+# inactif, plus aucun output en cours de calcul, outputs attendus reçus), puis
+# marque une pause. Un premier parcours non mesuré charge les données du serveur
+# (sauf --sans-echauffement, pour mesurer aussi le démarrage à froid).
+# La latence d'un output est le temps entre l'envoi de l'action et la réception
+# de sa nouvelle valeur. Comme dans un navigateur, le serveur ne calcule que les
+# outputs visibles : ceux des onglets affichés (cf. VISIBLES).
+#
+# La charge monte par paliers (--paliers 1,2,5,10) ; pour chaque palier :
+#   - débit (étapes terminées par seconde, Mo reçus par seconde)
+#   - latences p50/p95/p99 par output et par étape
+#   - mémoire des processus serveur (RSS) au cours du temps (Linux, /proc)
+# La capacité retenue est le dernier palier dont le p95 reste sous --slo-ms.
+#
+# Usage (depuis le dossier app/) :
+#   python -m benchmarks.charge --lancer                          # démarre un worker local
+#   python -m benchmarks.charge --url ws://127.0.0.1:8000 --pid 1234 --paliers 1,5,10,20
+#   python -m benchmarks.charge --lancer --rapport charge.json     # détail au format JSON
+#
+# Dépendance : le paquet websockets (installé avec uvicorn[standard]).
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import urlsplit
+
+APP_DIR = Path(__file__).resolve().parents[1]
+
+# Outputs visibles par onglet affiché (les autres sont suspendus par Shiny)
+VISIBLES = {
+    "accueil": [],
+    "repartition": ["repartition_map", "dc_share_plot", "kpi_total_dc", "kpi_leader_value",
+                    "kpi_leader_caption", "kpi_top10"],
+    "flapd":       ["map_flapd_sites", "map_title", "encarts_villes"],
+    "bilan":       ["fr_map", "prod_pie", "area_chart", "area_title", "pie_title", "region_selector"],
+    "predictif":   ["energiePlot", "info_conso_totale", "nuke_value", "hydro_value", "coal_value",
+                    "wind_value", "solar_value", "bio_value", "nuke_pct_total", "hydro_pct_total",
+                    "wind_pct_total", "solar_pct_total", "bio_pct_total", "coal_pct_total",
+                    "wind_surface", "solar_surface", "surface_info"],
+}
+
+# Valeurs initiales des entrées du module Énergie, envoyées par le navigateur dès
+# que les curseurs apparaissent (cf. ui/energie/, www/texts/energie/) : sans elles,
+# les outputs qui les lisent restent vides (req()).
+ENTREES_ENERGIE = {
+    "year": 2024, "fr_region": "France",
+    "nb_dc": 1, "facteur_charge": 100, "puissance_mw": 200,
+}
+
+HUBS = ["go_paris", "go_london", "go_frankfurt", "go_amsterdam", "go_dublin"]
+
+
+def _percentile(valeurs: list[float], q: float) -> float:
+    if not valeurs:
+        return float("nan")
+    v = sorted(valeurs)
+    return v[min(len(v) - 1, int(round(q * (len(v) - 1))))]
+
+
+# =========================================================
+# Mesures
+# =========================================================
+@dataclass
+class Mesures:
+    par_output: dict[str, list[float]] = field(default_factory=dict)   # ms
+    par_etape:  dict[str, list[float]] = field(default_factory=dict)   # ms
+    etapes:     int = 0
+    octets:     int = 0
+    erreurs:    dict[str, int] = field(default_factory=dict)
+    expirations: dict[str, int] = field(default_factory=dict)   # "étape : outputs restants" → nombre
+
+    def output(self, nom: str, ms: float) -> None:
+        self.par_output.setdefault(nom, []).append(ms)
+
+    def expiration(self, etape: str, restants: str) -> None:
+        cle = f"{etape} : {restants}"
+        self.expirations[cle] = self.expirations.get(cle, 0) + 1
+
+    def etape(self, nom: str, ms: float) -> None:
+        self.par_etape.setdefault(nom, []).append(ms)
+        self.etapes += 1
+
+    def toutes(self) -> list[float]:
+        return [v for l in self.par_output.values() for v in l]
+
+
+# =========================================================
+# Utilisateur virtuel
+# =========================================================
+class Utilisateur:
+    def __init__(self, url: str, mesures: Mesures, pause_s: float, delai_max_s: float, calme_s: float = 0.5):
+        self.url = url
+        self.m = mesures
+        self.pause_s = pause_s
+        self.delai_max_s = delai_max_s
+        self.calme_s = calme_s
+        self.ws = None
+        self.clics: dict[str, int] = {}
+        self.modeles: dict[str, str] = {}     # id de widget → output
+        self.sombre = False
+
+    def _adresse(self) -> dict:
+        """Adresse de la page, transmise par le navigateur à l'ouverture de session (clientdata)."""
+        u = urlsplit(self.url)
+        chemin = u.path.rsplit("/websocket", 1)[0] or "/"
+        return {
+            ".clientdata_url_protocol": "https:" if u.scheme == "wss" else "http:",
+            ".clientdata_url_hostname": u.hostname,
+            ".clientdata_url_port":     str(u.port or ""),
+            ".clientdata_url_pathname": chemin if chemin.endswith("/") else chemin + "/",
+            ".clientdata_url_search":   "",
+        }
+
+    def _visibles(self, *onglets: str) -> dict:
+        """Drapeaux clientdata : les outputs des onglets donnés sont visibles, les autres cachés."""
+        tous = {o for l in VISIBLES.values() for o in l}
+        vus  = {o for ong in onglets for o in VISIBLES[ong]}
+        return {f".clientdata_output_{o}_hidden": o not in vus for o in tous | {"page"}}
+
+    def _clic(self, bouton: str) -> dict:
+        self.clics[bouton] = self.clics.get(bouton, 0) + 1
+        return {f"{bouton}:shiny.action": self.clics[bouton]}
+
+    async def _attendre_stable(self, t0: float, attendus: set[str]) -> tuple[float, str | None]:
+        """
+        Lit les messages jusqu'à ce que la page soit stable : action traitée par le
+        serveur, qui n'est plus occupé, aucun output en cours de calcul ou en attente
+        d'un calcul en arrière-plan, tous les outputs attendus reçus (ceux des
+        sous-modules chargés à la demande n'existent qu'après la fin du chargement,
+        sans message entre-temps), puis calme_s secondes sans message (les curseurs
+        anti-rebond ne relancent les rendus qu'après un court délai).
+        Renvoie l'instant du dernier message reçu, et None ou, si le délai est
+        dépassé, la liste des outputs encore attendus.
+        """
+        en_cours: set[str] = set()
+        en_attente: set[str] = set()      # calcul en arrière-plan (progress persistant)
+        vus: set[str] = set()
+        repondu, occupe = False, False
+        dernier = t0
+        fin = t0 + self.delai_max_s
+        while True:
+            stable = repondu and not occupe and not en_cours and not en_attente and attendus <= vus
+            reste = fin - time.perf_counter()
+            if reste <= 0:
+                restants = en_cours | en_attente | (attendus - vus)
+                return dernier, ", ".join(sorted(restants)) or ("serveur occupé" if occupe else "pas de réponse")
+            attente = min(reste, self.calme_s) if stable else reste
+            try:
+                brut = await asyncio.wait_for(self.ws.recv(), attente)
+            except asyncio.TimeoutError:
+                if stable:
+                    return dernier, None
+                continue
+            self.m.octets += len(brut)
+            dernier = time.perf_counter()
+            if isinstance(brut, bytes):
+                continue
+            msg = json.loads(brut)
+            t = (time.perf_counter() - t0) * 1000.0
+            repondu = True
+
+            recus = list(msg.get("values", {}).items())
+            for nom, valeur in recus:
+                if isinstance(valeur, dict) and "model_id" in valeur:
+                    self.modeles[valeur["model_id"]] = nom
+            # Widgets mis à jour par patch : message adressé au widget de l'output
+            patch = msg.get("custom", {}).get("shinywidgets_comm_msg")
+            if patch:
+                nom = self.modeles.get(json.loads(patch).get("content", {}).get("comm_id"))
+                if nom:
+                    recus.append((nom, None))
+            for nom, _ in recus:
+                en_attente.discard(nom)
+                if nom not in vus:
+                    vus.add(nom)
+                    self.m.output(nom, t)
+            for nom in msg.get("errors", {}):
+                vus.add(nom)
+                en_attente.discard(nom)
+                self.m.erreurs[nom] = self.m.erreurs.get(nom, 0) + 1
+
+            rec = msg.get("recalculating")
+            if rec:
+                if rec.get("status") == "recalculating":
+                    en_cours.add(rec["name"])
+                else:
+                    en_cours.discard(rec["name"])
+            prog = msg.get("progress", {})
+            if prog.get("type") == "binding":
+                ident = prog["message"]["id"]
+                if prog["message"].get("persistent"):
+                    en_attente.add(ident)
+                    en_cours.discard(ident)
+            if "busy" in msg:
+                occupe = msg["busy"] == "busy"
+
+    async def _etape(self, nom: str, donnees: dict, methode: str = "update", attendus=()) -> None:
+        t0 = time.perf_counter()
+        await self.ws.send(json.dumps({"method": methode, "data": donnees}))
+        dernier, restants = await self._attendre_stable(t0, set(attendus))
+        if restants is not None:
+            self.m.expiration(nom, restants)
+        self.m.etape(nom, (dernier - t0) * 1000.0)
+        await asyncio.sleep(self.pause_s * random.uniform(0.5, 1.5))
+
+    async def _glisser(self, nom: str, input_id: str, valeurs: list, pas_s: float = 0.08) -> None:
+        """Curseur glissé : valeurs envoyées rapidement, latence mesurée depuis la dernière."""
+        for v in valeurs[:-1]:
+            await self.ws.send(json.dumps({"method": "update", "data": {input_id: v}}))
+            await asyncio.sleep(pas_s)
+        await self._etape(nom, {input_id: valeurs[-1]})
+
+    async def parcours(self) -> None:
+        await self._etape("accueil", {"darkmode": False, **self._adresse(), **self._visibles("accueil")}, methode="init")
+        await self._etape("energie", {
+            **self._clic("go_energie"), **ENTREES_ENERGIE,
+            "tabs_repartition": "repartition", "tabs_bilan": "bilan", "sim_tabs": "predictif",
+            **self._visibles("repartition", "bilan", "predictif"),
+        }, attendus=VISIBLES["repartition"] + VISIBLES["bilan"] + VISIBLES["predictif"])
+        debut = random.randint(2014, 2018)
+        await self._glisser("bilan_annee", "year", list(range(debut, debut + 6)))
+        self.sombre = not self.sombre
+        await self._etape("mode_sombre", {"darkmode": self.sombre})
+        self.sombre = not self.sombre
+        await self._etape("mode_clair", {"darkmode": self.sombre})
+        await self._etape("flapd", {
+            "tabs_repartition": "flapd", **self._visibles("flapd", "bilan", "predictif"),
+        }, attendus=VISIBLES["flapd"])
+        await self._etape("flapd_hub", self._clic(random.choice(HUBS)))
+        await self._glisser("sim_nb_dc", "nb_dc", list(range(2, random.randint(6, 20))))
+        await self._glisser("sim_puissance", "puissance_mw", list(range(200, random.choice([400, 600, 800]), 50)))
+        await self._glisser("sim_facteur", "facteur_charge", list(range(100, random.choice([40, 60, 80]), -10)))
+
+    async def jouer(self, fin: float) -> None:
+        import websockets
+
+        while time.perf_counter() < fin:
+            self.clics.clear()
+            self.modeles.clear()
+            try:
+                async with websockets.connect(self.url, max_size=None) as ws:
+                    self.ws = ws
+                    await self.parcours()
+            except (OSError, websockets.WebSocketException) as e:
+                self.m.erreurs[f"connexion:{type(e).__name__}"] = self.m.erreurs.get(f"connexion:{type(e).__name__}", 0) + 1
+                await asyncio.sleep(1.0)
+
+
+# =========================================================
+# Mémoire des processus serveur (RSS, Linux)
+# =========================================================
+def _enfants(pid: int) -> list[int]:
+    sortie = []
+    try:
+        for tache in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tache}/children") as f:
+                sortie += [int(p) for p in f.read().split()]
+    except OSError:
+        pass
+    return sortie
+
+
+def rss_mo(pid: int) -> dict[int, float]:
+    """RSS (Mo) du processus et de ses descendants (workers uvicorn)."""
+    sortie, a_voir = {}, [pid]
+    while a_voir:
+        p = a_voir.pop()
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for ligne in f:
+                    if ligne.startswith("VmRSS:"):
+                        sortie[p] = int(ligne.split()[1]) / 1024
+        except OSError:
+            continue
+        a_voir += _enfants(p)
+    return sortie
+
+
+async def echantillonner_memoire(pid: int | None, serie: list, t_depart: float, periode_s: float = 1.0) -> None:
+    if pid is None:
+        return
+    while True:
+        serie.append({"t": round(time.perf_counter() - t_depart, 1), "rss_mo": rss_mo(pid)})
+        await asyncio.sleep(periode_s)
+
+
+# =========================================================
+# Paliers
+# =========================================================
+async def palier(url: str, n: int, duree_s: float, pause_s: float, delai_max_s: float,
+                 pid: int | None, t_depart: float) -> tuple[Mesures, list]:
+    m, memoire = Mesures(), []
+    fin = time.perf_counter() + duree_s
+    echant = asyncio.create_task(echantillonner_memoire(pid, memoire, t_depart))
+
+    async def lancer(i: int):
+        await asyncio.sleep(i * min(2.0, duree_s / 10) / max(n, 1))   # arrivées étalées
+        await Utilisateur(url, m, pause_s, delai_max_s).jouer(fin)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(lancer(i) for i in range(n)))
+    m.duree_s = time.perf_counter() - t0
+    echant.cancel()
+    return m, memoire
+
+
+def resume(n: int, m: Mesures, memoire: list) -> dict:
+    toutes = m.toutes()
+    rss_max = max((sum(e["rss_mo"].values()) for e in memoire), default=None)
+    return {
+        "sessions":       n,
+        "etapes_par_s":   m.etapes / m.duree_s,
+        "mo_recus_par_s": m.octets / m.duree_s / 1e6,
+        "p50_ms":         _percentile(toutes, 0.50),
+        "p95_ms":         _percentile(toutes, 0.95),
+        "p99_ms":         _percentile(toutes, 0.99),
+        "expirations":    m.expirations,
+        "erreurs":        m.erreurs,
+        "rss_max_mo":     rss_max,
+        "outputs": {
+            nom: {"n": len(v), "p50_ms": _percentile(v, .5), "p95_ms": _percentile(v, .95),
+                  "p99_ms": _percentile(v, .99), "max_ms": max(v)}
+            for nom, v in sorted(m.par_output.items())
+        },
+        "etapes": {
+            nom: {"n": len(v), "p50_ms": _percentile(v, .5), "p95_ms": _percentile(v, .95)}
+            for nom, v in m.par_etape.items()
+        },
+        "memoire": memoire,
+    }
+
+
+def afficher(r: dict, slo_ms: float) -> None:
+    rss = f"{r['rss_max_mo']:.0f} Mo" if r["rss_max_mo"] is not None else "n/d"
+    etat = "OK " if r["p95_ms"] <= slo_ms else "KO "
+    print(
+        f"\n[{etat}] {r['sessions']:>3} sessions : {r['etapes_par_s']:.2f} étapes/s, "
+        f"{r['mo_recus_par_s']:.2f} Mo/s, p50 {r['p50_ms']:.0f} ms, p95 {r['p95_ms']:.0f} ms, "
+        f"p99 {r['p99_ms']:.0f} ms, RSS max {rss}"
+    )
+    for cle, n in r["expirations"].items():
+        print(f"      délai dépassé ×{n} — {cle}")
+    if r["erreurs"]:
+        print(f"      erreurs : {r['erreurs']}")
+    for nom, e in r["etapes"].items():
+        print(f"      étape {nom:<16} n={e['n']:<5} p50 {e['p50_ms']:>7.0f} ms  p95 {e['p95_ms']:>7.0f} ms")
+    lents = sorted(r["outputs"].items(), key=lambda x: -x[1]["p95_ms"])[:8]
+    for nom, o in lents:
+        print(f"      {nom:<22} n={o['n']:<5} p50 {o['p50_ms']:>7.0f} ms  p95 {o['p95_ms']:>7.0f} ms  max {o['max_ms']:>7.0f} ms")
+
+
+def _lancer_serveur(port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    import urllib.request
+    for _ in range(120):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1)
+            return proc
+        except OSError:
+            time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError("le serveur n'a pas démarré")
+
+
+async def _principal(args) -> list[dict]:
+    t_depart = time.perf_counter()
+    rapports = []
+    if not args.sans_echauffement:
+        import websockets
+        u = Utilisateur(args.url, Mesures(), 0.0, args.delai_max)
+        async with websockets.connect(args.url, max_size=None) as ws:
+            u.ws = ws
+            await u.parcours()
+    for n in args.paliers:
+        m, memoire = await palier(args.url, n, args.duree, args.pause, args.delai_max, args.pid, t_depart)
+        r = resume(n, m, memoire)
+        afficher(r, args.slo_ms)
+        rapports.append(r)
+        if r["p95_ms"] > 2 * args.slo_ms:
+            print("      (p95 au-delà du double de l'objectif : paliers suivants ignorés)")
+            break
+    return rapports
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Test de charge de l'application par sessions Shiny simulées.")
+    parser.add_argument("--url", default=None, help="adresse du websocket (défaut : ws://127.0.0.1:PORT)")
+    parser.add_argument("--port", type=int, default=8765, help="port du serveur lancé par --lancer (défaut : 8765)")
+    parser.add_argument("--lancer", action="store_true", help="démarrer un worker uvicorn local pour le test")
+    parser.add_argument("--pid", type=int, default=None, help="PID du serveur à surveiller (mémoire)")
+    parser.add_argument("--paliers", default="1,2,5,10", help="nombres de sessions simultanées (défaut : 1,2,5,10)")
+    parser.add_argument("--duree", type=float, default=60.0, help="durée de chaque palier en secondes (défaut : 60)")
+    parser.add_argument("--pause", type=float, default=1.0, help="pause moyenne entre deux actions (s)")
+    parser.add_argument("--delai-max", type=float, default=30.0, help="attente maximale d'une étape (s)")
+    parser.add_argument("--slo-ms", type=float, default=1000.0, help="objectif de p95 (défaut : 1000 ms)")
+    parser.add_argument("--sans-echauffement", action="store_true", help="ne pas charger les données avant le premier palier")
+    parser.add_argument("--rapport", type=Path, default=None, help="écrire le détail des mesures dans ce fichier JSON")
+    args = parser.parse_args(argv)
+    args.paliers = [int(x) for x in args.paliers.split(",")]
+
+    serveur = None
+    if args.lancer:
+        serveur = _lancer_serveur(args.port)
+        args.pid = serveur.pid
+    if args.url is None:
+        args.url = f"ws://127.0.0.1:{args.port}"
+    args.url = args.url.rstrip("/").replace("http", "ws", 1)
+    if not args.url.endswith("/websocket"):
+        args.url += "/websocket/"
+
+    try:
+        rapports = asyncio.run(_principal(args))
+    finally:
+        if serveur is not None:
+            serveur.terminate()
+            serveur.wait()
+
+    tenus = [r["sessions"] for r in rapports if r["p95_ms"] <= args.slo_ms]
+    print(f"\nCapacité : {max(tenus) if tenus else 0} sessions simultanées avec p95 ≤ {args.slo_ms:.0f} ms")
+    if args.rapport:
+        args.rapport.write_text(json.dumps(rapports, ensure_ascii=False, indent=1), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
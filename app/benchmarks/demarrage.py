@@ -0,0 +1,181 @@
+# benchmarks/demarrage.py — temps de démarrage et coût des imports
+#
+# Le démarrage d'un worker, c'est surtout des imports : Shiny, puis tout ce que
+# les modules serveur importent au chargement. Ce script mesure, chacun dans
+# un processus Python neuf (sinon les modules déjà importés faussent tout) :
+#
+#   - le temps de « import app » (construction de l'application comprise),
+#     médiane et minimum sur N processus
+#   - le coût de chaque bibliothèque, d'après python -X importtime : temps
+#     propre cumulé de tous les modules du paquet (shiny, pandas, geopandas…)
+#   - le coût de chaque module de l'application (temps cumulé, imports compris)
+#   - pour chaque module serveur chargé à la demande (onglets Énergie, module
+#     Données) : le temps de son import une fois l'application démarrée, et les
+#     bibliothèques lourdes qu'il a importées. Avec lazy_import()
+#     (server/_common.py), elles ne le sont qu'au premier rendu.
+#
+# Usage (depuis le dossier app/) :
+#   python -m benchmarks.demarrage                     # rapport complet
+#   python -m benchmarks.demarrage -n 10 --top 25      # plus de répétitions, plus de lignes
+#   python -m benchmarks.demarrage --rapport demarrage.json
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from benchmarks.figures import APP_DIR
+
+
+# Modules serveur importés à la demande (cf. server/energie/__init__.py, server/donnees/__init__.py)
+MODULES_DIFFERES = [
+    "server.energie.repartition",
+    "server.energie.flapd",
+    "server.energie.bilan",
+    "server.energie.echanges",
+    "server.energie.simulateurs.predictif",
+    "server.energie.simulateurs.comparatif",
+    "server.donnees.gestionnaire",
+]
+
+# Bibliothèques que les modules serveur ne doivent importer qu'au premier rendu
+BIBLIOTHEQUES_LOURDES = ["geopandas", "shapely", "folium", "branca", "plotly.express"]
+
+# Paquets de l'application (regroupés par module, et non par paquet, dans le rapport)
+PAQUETS_APP = {"app", "server", "ui", "benchmarks"}
+
+
+@dataclass
+class Import:
+    """Une ligne de python -X importtime."""
+    module: str
+    propre_ms: float
+    cumul_ms: float
+    profondeur: int
+
+
+def _python(code: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    """Exécute code dans un interpréteur neuf, depuis le dossier app/."""
+    options = ["-X", "importtime"] if importtime else []
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        cwd=APP_DIR, capture_output=True, text=True, check=True,
+    )
+
+
+def _lire_importtime(stderr: str) -> list[Import]:
+    imports = []
+    for ligne in stderr.splitlines():
+        if not ligne.startswith("import time:") or "self [us]" in ligne:
+            continue
+        propre, cumul, nom = ligne[len("import time:"):].split("|")
+        imports.append(Import(
+            module=nom.strip(),
+            propre_ms=int(propre) / 1000.0,
+            cumul_ms=int(cumul) / 1000.0,
+            profondeur=(len(nom) - len(nom.lstrip()) - 1) // 2,
+        ))
+    return imports
+
+
+# =========================================================
+# Mesures
+# =========================================================
+def temps_import_app(repetitions: int) -> list[float]:
+    """Durée de « import app » (ms) dans repetitions processus neufs (sans -X importtime, qui ralentit)."""
+    code = "import time; t = time.perf_counter(); import app; print((time.perf_counter() - t) * 1000)"
+    return [float(_python(code).stdout.strip()) for _ in range(repetitions)]
+
+
+def profil_imports() -> list[Import]:
+    """Profil python -X importtime de « import app »."""
+    return _lire_importtime(_python("import app", importtime=True).stderr)
+
+
+def par_paquet(imports: list[Import]) -> dict[str, float]:
+    """Temps propre cumulé par paquet de premier niveau (ms), du plus coûteux au moins coûteux."""
+    totaux: dict[str, float] = {}
+    for imp in imports:
+        paquet = imp.module.split(".")[0]
+        totaux[paquet] = totaux.get(paquet, 0.0) + imp.propre_ms
+    return dict(sorted(totaux.items(), key=lambda x: -x[1]))
+
+
+def modules_app(imports: list[Import]) -> dict[str, float]:
+    """Temps cumulé (imports compris) de chaque module de l'application (ms)."""
+    return {
+        imp.module: imp.cumul_ms
+        for imp in imports if imp.module.split(".")[0] in PAQUETS_APP
+    }
+
+
+def cout_module_differe(module: str) -> dict:
+    """
+    Importe module après « import app » dans un processus neuf : durée de
+    l'import (ms) et bibliothèques lourdes qu'il a fait charger.
+    """
+    code = (
+        "import importlib, json, sys, time\n"
+        "import app\n"
+        f"avant = {{m for m in {BIBLIOTHEQUES_LOURDES!r} if m in sys.modules}}\n"
+        "t = time.perf_counter()\n"
+        f"importlib.import_module({module!r})\n"
+        "ms = (time.perf_counter() - t) * 1000\n"
+        f"apres = [m for m in {BIBLIOTHEQUES_LOURDES!r} if m in sys.modules and m not in avant]\n"
+        "print(json.dumps({'ms': ms, 'bibliotheques': apres}))\n"
+    )
+    return json.loads(_python(code).stdout.strip().splitlines()[-1])
+
+
+# =========================================================
+# Rapport
+# =========================================================
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Temps de démarrage et coût des imports.")
+    parser.add_argument("-n", "--repetitions", type=int, default=5, help="processus mesurés pour « import app » (défaut : 5)")
+    parser.add_argument("--top", type=int, default=15, help="nombre de bibliothèques affichées (défaut : 15)")
+    parser.add_argument("--rapport", type=Path, help="écrit aussi le résultat en JSON dans ce fichier")
+    args = parser.parse_args(argv)
+
+    durees = temps_import_app(args.repetitions)
+    print(f"import app : {statistics.median(durees):.0f} ms "
+          f"(médiane sur {len(durees)} processus, minimum {min(durees):.0f} ms)")
+
+    imports = profil_imports()
+    paquets = par_paquet(imports)
+    print("\nBibliothèques (temps propre cumulé, python -X importtime) :")
+    for paquet, ms in list((k, v) for k, v in paquets.items() if k not in PAQUETS_APP)[:args.top]:
+        print(f"  {paquet:<28} {ms:>8.1f} ms")
+    lourdes = [b for b in BIBLIOTHEQUES_LOURDES if any(i.module == b for i in imports)]
+    print(f"  bibliothèques lourdes importées au démarrage : {', '.join(lourdes) or 'aucune'}")
+
+    app = modules_app(imports)
+    print("\nModules de l'application (temps cumulé, imports compris) :")
+    for module, ms in sorted(app.items(), key=lambda x: -x[1])[:args.top]:
+        print(f"  {module:<40} {ms:>8.1f} ms")
+
+    differes = {}
+    print("\nModules chargés à la demande (import après le démarrage) :")
+    for module in MODULES_DIFFERES:
+        r = differes[module] = cout_module_differe(module)
+        print(f"  {module:<40} {r['ms']:>8.1f} ms   "
+              f"bibliothèques lourdes importées : {', '.join(r['bibliotheques']) or 'aucune'}")
+
+    if args.rapport:
+        rapport = {
+            "import_app_ms":        durees,
+            "bibliotheques_ms":     paquets,
+            "lourdes_au_demarrage": lourdes,
+            "modules_app_ms":       app,
+            "modules_differes":     differes,
+        }
+        args.rapport.write_text(json.dumps(rapport, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
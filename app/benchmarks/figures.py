@@ -0,0 +1,167 @@
+# benchmarks/figures.py — coût de construction et de sérialisation des graphiques Plotly
+#
+# Pour chaque graphique de l'application, compare deux chemins sur la même figure :
+#
+#   - "plotly"  : figure validée par go.Figure (listes Python), JSON par fig.to_json()
+#                 → équivalent du chemin historique trace par trace
+#   - "rapide"  : dict brut + tableaux NumPy (server/_figures.py), sans validation,
+#                 JSON par dumps() (orjson + typed arrays binaires)
+#
+# Mesures affichées (meilleur temps sur N répétitions) :
+#   - construction de l'objet figure (ms)
+#   - encodage JSON (ms) et taille du JSON (Ko)
+#   - taille de l'état envoyé au navigateur à l'ouverture du widget (Ko),
+#     hors bundle JavaScript de plotly (identique dans les deux cas)
+#
+# Usage (depuis le dossier app/) :
+#   python -m benchmarks.figures [--repetitions 20]
+from __future__ import annotations
+
+import argparse
+import time
+from base64 import b64encode
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import plotly.graph_objects as go
+
+from server._figures import dumps
+from server.energie import bilan, echanges, repartition
+from server.energie.simulateurs import _shared, comparatif, predictif
+
+
+APP_DIR = Path(__file__).resolve().parents[1]
+
+
+# =========================================================
+# Figures de référence (données réelles de www/data)
+# =========================================================
+def constructeurs_figures(app_dir: Path = APP_DIR, dark: bool = False) -> dict[str, Callable[[], dict]]:
+    """
+    Un constructeur par graphique, dans la configuration affichée par défaut :
+    chaque appel reconstruit la figure brute (données déjà chargées).
+    """
+    sim    = _shared.prepare_sim_data(app_dir)
+    profil = predictif.profil_depuis_paliers(sim.DC_YEARS, sim.DC_TWH_DC)
+    courbes = predictif._build_courbes_dc(sim, profil, 1, 100.0, 200.0)
+
+    d_bilan = bilan._get_data(app_dir)
+    pie_vals = d_bilan["fr_by_year"].loc[max(d_bilan["years"])][bilan.PIE_FIELDS_TS].tolist()
+
+    ech = echanges._get_bundle(app_dir)
+    frontieres = ech["neighbors"][:2]
+    debut = str(ech["df_trade"]["date"].min().date())
+    fin   = str(ech["df_trade"]["date"].max().date())
+    df_share = repartition._get_data(app_dir)["df_share"]
+
+    return {
+        "energiePlot":     lambda: predictif._build_energie_fig(sim, courbes, dark),
+        "barplot":         lambda: comparatif._build_barplot(["Mondial", "France (68,29 M)", "Qatar (2,66 M)"], dark),
+        "prod_pie":        lambda: bilan._build_prod_pie(pie_vals, dark),
+        "bar_exports":     lambda: echanges._build_bar_exports(ech["cube"], 2024, False, dark),
+        "bar_exports (%)": lambda: echanges._build_bar_exports(ech["cube"], 2024, True, dark),
+        "comp_plot":       lambda: echanges._build_comp_plot(
+            ech["df_trade"], debut, fin, "Solde", "Mensuel", 1, frontieres, dark,
+        ),
+        "dc_share_plot":   lambda: repartition._build_dc_share(df_share, dark),
+    }
+
+
+def cas_figures(app_dir: Path = APP_DIR) -> dict[str, dict]:
+    """Une figure brute par graphique, dans la configuration affichée par défaut."""
+    return {nom: construire() for nom, construire in constructeurs_figures(app_dir).items()}
+
+
+# =========================================================
+# Outils de mesure
+# =========================================================
+def _en_listes(obj):
+    """Copie de la figure où les tableaux NumPy redeviennent des listes (chemin historique)."""
+    if isinstance(obj, dict):
+        return {k: _en_listes(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_en_listes(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return obj
+
+
+def _meilleur_temps(fn, repetitions: int) -> tuple[float, object]:
+    """Meilleur temps (ms) sur `repetitions` appels, et résultat du dernier appel."""
+    best, res = float("inf"), None
+    for _ in range(repetitions):
+        t0  = time.perf_counter()
+        res = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0, res
+
+
+def taille_etat_widget(fig: go.Figure) -> int:
+    """
+    Taille (octets) de l'état data + layout transmis par shinywidgets à l'ouverture
+    du widget : les tableaux numériques partent en tampons binaires (encodés en base64).
+    """
+    from ipywidgets.widgets.widget import _remove_buffers
+    from plotly.serializers import _py_to_js
+    from shinywidgets._serialization import json_packer
+
+    etat = {
+        "_widget_data":   _py_to_js(fig.to_dict()["data"], None),
+        "_widget_layout": _py_to_js(fig.to_dict()["layout"], None),
+    }
+    etat, _, tampons = _remove_buffers(etat)
+    return len(json_packer(etat).encode("utf-8")) + sum(len(b64encode(b)) for b in tampons)
+
+
+def mesurer(nom: str, fig: dict, repetitions: int) -> dict:
+    listes = _en_listes(fig)
+
+    t_build_p, fig_p = _meilleur_temps(lambda: go.Figure(listes), repetitions)
+    t_json_p, json_p = _meilleur_temps(fig_p.to_json, repetitions)
+
+    t_build_r, fig_r = _meilleur_temps(
+        lambda: go.Figure(data=[dict(t) for t in fig["data"]], layout=dict(fig["layout"]), _validate=False),
+        repetitions,
+    )
+    t_json_r, json_r = _meilleur_temps(lambda: dumps(fig), repetitions)
+
+    return {
+        "graphique":        nom,
+        "build_plotly_ms":  t_build_p,
+        "build_rapide_ms":  t_build_r,
+        "json_plotly_ms":   t_json_p,
+        "json_rapide_ms":   t_json_r,
+        "json_plotly_ko":   len(json_p.encode("utf-8")) / 1024,
+        "json_rapide_ko":   len(json_r) / 1024,
+        "widget_plotly_ko": taille_etat_widget(fig_p) / 1024,
+        "widget_rapide_ko": taille_etat_widget(fig_r) / 1024,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de construction/sérialisation des graphiques Plotly.")
+    parser.add_argument("-n", "--repetitions", type=int, default=20, help="répétitions par mesure (défaut : 20)")
+    args = parser.parse_args(argv)
+
+    lignes = [mesurer(nom, fig, args.repetitions) for nom, fig in cas_figures().items()]
+
+    entete = (
+        f"{'graphique':<16} {'construction (ms)':>19} {'encodage (ms)':>15} "
+        f"{'JSON (Ko)':>15} {'état widget (Ko)':>17}"
+    )
+    print(entete)
+    print(f"{'':<16} {'plotly → rapide':>19} {'plotly → rapide':>15} {'plotly → rapide':>15} {'plotly → rapide':>17}")
+    print("-" * len(entete))
+    for l in lignes:
+        print(
+            f"{l['graphique']:<16} "
+            f"{l['build_plotly_ms']:>8.2f} → {l['build_rapide_ms']:<8.2f} "
+            f"{l['json_plotly_ms']:>6.2f} → {l['json_rapide_ms']:<6.2f} "
+            f"{l['json_plotly_ko']:>6.1f} → {l['json_rapide_ko']:<6.1f} "
+            f"{l['widget_plotly_ko']:>7.1f} → {l['widget_rapide_ko']:<7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+# benchmarks/suite.py — suite de benchmarks : chargeurs, constructeurs, rendus
+#
+# Quatre familles de mesures, sur les données réelles de www/data :
+#
+#   - chargeurs     : chaque chargeur de données, à froid (cache cached() vidé
+#                     avant chaque appel) puis à chaud (valeur déjà en cache)
+#                       bilan / repartition / gestionnaire / echanges / flapd / simulateurs
+#   - constructeurs : chaque carte Folium et chaque figure Plotly, par variante
+#                     (thème clair/sombre, hub, filière, année…)
+#   - rendus        : ce que shinywidgets fait d'une figure à l'affichage
+#                     (conversion et sérialisation de l'état du widget)
+#   - pages         : HTML des pages accueil / Énergie / Données, construit
+#                     entièrement ou relu dans le cache de pages (ui/_common.py)
+#
+# Pour chaque cas : meilleur temps et temps médian sur N répétitions (ms), et
+# pic de mémoire allouée pendant un appel (Mo, mesuré à part avec tracemalloc).
+# « À froid » signifie sans cache du processus : les fichiers, eux, peuvent
+# déjà être dans le cache disque du système.
+#
+# Chaque exécution est ajoutée à un historique JSON (une ligne par exécution :
+# date, commit, machine, résultats). Les temps sont comparés aux 5 exécutions
+# précédentes sur la même machine : un cas plus lent que le meilleur de ces
+# exécutions d'un facteur --seuil (et d'au moins 2 ms) est signalé comme régression.
+# Avec --verifier, le script se termine en erreur s'il y en a (à lancer avant
+# un déploiement).
+#
+# Usage (depuis le dossier app/) :
+#   python -m benchmarks.suite                       # toute la suite
+#   python -m benchmarks.suite -k flapd -n 10        # cas dont le nom contient "flapd"
+#   python -m benchmarks.suite --verifier            # code de sortie 1 si régression
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from base64 import b64encode
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.figures import APP_DIR, constructeurs_figures
+from server._common import cache_clear
+
+
+HISTORIQUE = Path(__file__).resolve().parent / "historique.jsonl"
+
+# Nombre d'exécutions précédentes servant de référence
+FENETRE_REFERENCE = 5
+# Écart minimal (ms) pour parler de régression : en dessous, c'est du bruit
+ECART_MIN_MS = 2.0
+
+
+@dataclass
+class Cas:
+    nom: str
+    fn: Callable[[], object]
+    # Appelée avant chaque répétition, hors chronométrage (ex. vider le cache)
+    avant: Callable[[], None] | None = None
+
+
+# =========================================================
+# Chargeurs de données
+# =========================================================
+def cas_chargeurs(app_dir: Path = APP_DIR) -> list[Cas]:
+    from server.donnees import gestionnaire
+    from server.energie import bilan, echanges, flapd, repartition
+    from server.energie.simulateurs import _shared
+
+    # (nom, chargeur brut à froid, accès via le cache du processus)
+    chargeurs = [
+        ("bilan._load_data_prepared",        lambda: bilan._load_data_prepared(app_dir),
+                                             lambda: bilan._get_data(app_dir)),
+        ("repartition._load_data_prepared",  lambda: repartition._load_data_prepared(app_dir),
+                                             lambda: repartition._get_data(app_dir)),
+        ("gestionnaire._load_prepared",      lambda: gestionnaire._load_prepared(app_dir),
+                                             lambda: gestionnaire._get_prepared(app_dir)),
+        ("echanges._load_all",               lambda: echanges._load_all(app_dir),
+                                             lambda: echanges._get_bundle(app_dir)),
+        ("flapd._load_dc_flapd_raw",         lambda: flapd._load_dc_flapd_raw(app_dir),
+                                             lambda: flapd.get_dc_flapd_raw(app_dir)),
+        ("flapd._prepare_gdf",               lambda: flapd._prepare_gdf(flapd._load_dc_flapd_raw(app_dir)),
+                                             lambda: flapd._get_prepared_gdf(app_dir)),
+        ("simulateurs.prepare_sim_data",     lambda: _shared.prepare_sim_data(app_dir),
+                                             lambda: _shared.load_data(app_dir)),
+    ]
+    cas = []
+    for nom, froid, chaud in chargeurs:
+        # Certains chargeurs lisent eux-mêmes d'autres entrées du cache : on le vide en entier
+        cas.append(Cas(f"chargeur {nom} [froid]", froid, avant=cache_clear))
+        # À chaud : le cas précédent a vidé le cache, on le remplit hors chronométrage
+        cas.append(Cas(f"chargeur {nom} [chaud]", chaud, avant=chaud))
+    return cas
+
+
+# =========================================================
+# Constructeurs de cartes et de figures, par variante
+# =========================================================
+def cas_constructeurs(app_dir: Path = APP_DIR) -> list[Cas]:
+    from server.donnees import gestionnaire
+    from server.energie import bilan, echanges, flapd, repartition
+
+    cas: list[Cas] = []
+    d_bilan = bilan._get_data(app_dir)
+    annee   = int(max(d_bilan["years"]))
+    df_year = d_bilan["ts"][d_bilan["ts"]["year"] == annee]
+    d_rep   = repartition._get_data(app_dir)
+    cube    = echanges._get_bundle(app_dir)["cube"]
+    gdf     = flapd._get_prepared_gdf(app_dir)
+    hubs    = sorted(h for h in gdf["city_hub_auto"].dropna().unique())
+
+    # Gestionnaire : ses données (frontières mondiales comprises) sont chargées
+    # par chaque cas, hors chronométrage ; s'il manque un fichier, ses cas
+    # apparaissent en échec sans empêcher les autres. Hubs : ceux du GeoJSON FLAP-D.
+    def gestion() -> dict:
+        return gestionnaire._get_prepared(app_dir)
+
+    hubs_gestion = [None] + sorted(flapd.get_dc_flapd_raw(app_dir)["city_hub"].dropna().unique())
+
+    for dark in (False, True):
+        theme = "sombre" if dark else "clair"
+        cas.append(Cas(
+            f"carte bilan.fr_map [{annee}, {theme}]",
+            lambda dark=dark: bilan._build_balance_choropleth_html_from_base(d_bilan["gjson_base"], df_year, dark),
+        ))
+        cas.append(Cas(
+            f"figure bilan.area_base [France, {theme}]",
+            lambda dark=dark: bilan._build_area_base(d_bilan, "France", dark),
+        ))
+        cas.append(Cas(
+            f"carte repartition.map [{theme}]",
+            lambda dark=dark: repartition._build_map_html(d_rep["gdf"], d_rep["gj_text"], dark),
+        ))
+        for an in cube.years.tolist():
+            for filiere in echanges.FILIERE_CHOICES:
+                cas.append(Cas(
+                    f"carte echanges.map_elec [{an}, {filiere}, {theme}]",
+                    lambda an=an, filiere=filiere, dark=dark: echanges._build_map_elec_html(cube, an, filiere, dark),
+                ))
+        cas.append(Cas(f"carte flapd.map_all [{theme}]", lambda dark=dark: flapd._build_map_all(gdf, dark)))
+        for hub in hubs:
+            df_hub = gdf[gdf["city_hub_auto"] == hub]
+            cas.append(Cas(
+                f"carte flapd.map_hub [{hub}, {theme}]",
+                lambda df_hub=df_hub, dark=dark: flapd._build_map_hub(df_hub, dark),
+            ))
+        for hub in hubs_gestion:
+            vue = hub or "global"
+            cas.append(Cas(
+                f"carte gestionnaire.map_hq [{vue}, {theme}]",
+                lambda hub=hub, dark=dark: gestionnaire._build_map_html(gestion(), hub, dark),
+                avant=gestion,
+            ))
+            cas.append(Cas(
+                f"figure gestionnaire.treemap_hq [{vue}, {theme}]",
+                lambda hub=hub, dark=dark: gestionnaire._build_treemap(gestion()["treemaps"], hub, dark),
+                avant=gestion,
+            ))
+        for nom, construire in constructeurs_figures(app_dir, dark).items():
+            cas.append(Cas(f"figure {nom} [{theme}]", construire))
+    return cas
+
+
+# =========================================================
+# Rendus : état du widget envoyé au navigateur
+# =========================================================
+def _etat_widget(fig: dict) -> str:
+    """
+    Reproduit l'ouverture d'un widget par shinywidgets : figure Plotly, conversion
+    de son état (tableaux en tampons binaires) et sérialisation JSON. Le FigureWidget
+    lui-même ne peut être créé que dans une session Shiny.
+    """
+    import plotly.graph_objects as go
+    from ipywidgets.widgets.widget import _remove_buffers
+    from plotly.serializers import _py_to_js
+    from shinywidgets._serialization import json_packer
+
+    f = go.Figure(data=[dict(t) for t in fig["data"]], layout=dict(fig["layout"]), _validate=False)
+    d = f.to_dict()
+    etat, chemins, tampons = _remove_buffers({
+        "_widget_data":   _py_to_js(d["data"], None),
+        "_widget_layout": _py_to_js(d["layout"], None),
+    })
+    return json_packer({"state": etat, "buffer_paths": chemins, "buffers": [b64encode(b).decode("ascii") for b in tampons]})
+
+
+def cas_rendus(app_dir: Path = APP_DIR) -> list[Cas]:
+    cas = []
+    for nom, construire in constructeurs_figures(app_dir).items():
+        fig = construire()
+        cas.append(Cas(f"rendu {nom}", lambda fig=fig: _etat_widget(fig)))
+    return cas
+
+
+def cas_pages() -> list[Cas]:
+    """Rendu HTML de chaque page : construction complète, puis depuis le cache de pages."""
+    from htmltools import TagList
+    from ui._common import page_en_cache
+    from ui.donnees import donnees_ui
+    from ui.energie import energie_ui
+    from ui.home_ui import home_ui
+
+    cas = []
+    for nom, construire in [("home", home_ui), ("energie", energie_ui), ("donnees", donnees_ui)]:
+        cas.append(Cas(f"page {nom} [construction]", lambda f=construire: TagList(f()).render()))
+        cas.append(Cas(
+            f"page {nom} [cache]",
+            lambda n=nom, f=construire: TagList(page_en_cache(n, f)).render(),
+            avant=lambda n=nom, f=construire: page_en_cache(n, f),
+        ))
+    return cas
+
+
+# =========================================================
+# Mesure
+# =========================================================
+def mesurer(cas: Cas, repetitions: int) -> dict:
+    temps = []
+    for _ in range(repetitions):
+        if cas.avant:
+            cas.avant()
+        t0 = time.perf_counter()
+        cas.fn()
+        temps.append((time.perf_counter() - t0) * 1000.0)
+
+    # Pic mémoire : un appel supplémentaire sous tracemalloc (qui ralentit l'exécution)
+    if cas.avant:
+        cas.avant()
+    tracemalloc.start()
+    try:
+        cas.fn()
+        _, pic = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ms":         min(temps),
+        "mediane_ms": statistics.median(temps),
+        "pic_mo":     pic / 1e6,
+    }
+
+
+def _commit() -> str | None:
+    try:
+        sortie = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=APP_DIR, capture_output=True, text=True, check=True,
+        )
+        return sortie.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# =========================================================
+# Historique et régressions
+# =========================================================
+def lire_historique(chemin: Path) -> list[dict]:
+    if not chemin.exists():
+        return []
+    with chemin.open(encoding="utf-8") as f:
+        return [json.loads(ligne) for ligne in f if ligne.strip()]
+
+
+def regressions(resultats: dict[str, dict], historique: list[dict], machine: str, seuil: float) -> dict[str, float]:
+    """Cas plus lents que leur référence (meilleur temps des exécutions précédentes) : nom → ratio."""
+    precedentes = [h for h in historique if h.get("machine") == machine][-FENETRE_REFERENCE:]
+    sortie = {}
+    for nom, r in resultats.items():
+        refs = [h["resultats"][nom]["ms"] for h in precedentes if "ms" in h["resultats"].get(nom, {})]
+        if not refs or "ms" not in r:
+            continue
+        ref = min(refs)
+        if r["ms"] > ref * seuil and r["ms"] - ref > ECART_MIN_MS:
+            sortie[nom] = r["ms"] / ref
+    return sortie
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks des chargeurs, constructeurs et rendus.")
+    parser.add_argument("-n", "--repetitions", type=int, default=5, help="répétitions par cas (défaut : 5)")
+    parser.add_argument("-k", "--filtre", default="", help="ne garder que les cas dont le nom contient ce texte")
+    parser.add_argument("--historique", type=Path, default=HISTORIQUE, help=f"fichier d'historique (défaut : {HISTORIQUE.name})")
+    parser.add_argument("--sans-historique", action="store_true", help="ne pas enregistrer cette exécution")
+    parser.add_argument("--seuil", type=float, default=1.3, help="ratio de ralentissement signalé (défaut : 1.3)")
+    parser.add_argument("--verifier", action="store_true", help="code de sortie 1 en cas de régression")
+    args = parser.parse_args(argv)
+
+    # Les constructeurs et rendus lisent les données déjà chargées
+    familles = [cas_chargeurs, cas_constructeurs, cas_rendus, cas_pages]
+    resultats: dict[str, dict] = {}
+    for famille in familles:
+        try:
+            liste = famille()
+        except Exception as e:          # ex. fichier de données absent
+            print(f"{famille.__name__} : ignorée ({type(e).__name__} : {e})")
+            continue
+        for cas in liste:
+            if args.filtre not in cas.nom:
+                continue
+            try:
+                r = mesurer(cas, args.repetitions)
+            except Exception as e:
+                r = {"erreur": f"{type(e).__name__} : {e}"}
+            resultats[cas.nom] = r
+            if "erreur" in r:
+                print(f"{cas.nom:<58} échec : {r['erreur']}")
+            else:
+                print(f"{cas.nom:<58} {r['ms']:>9.1f} ms  (médiane {r['mediane_ms']:>9.1f})  pic {r['pic_mo']:>7.1f} Mo")
+
+    machine = platform.node()
+    historique = lire_historique(args.historique)
+    lents = regressions(resultats, historique, machine, args.seuil)
+    if lents:
+        print(f"\nRégressions (> ×{args.seuil} par rapport aux {FENETRE_REFERENCE} exécutions précédentes) :")
+        for nom, ratio in sorted(lents.items(), key=lambda x: -x[1]):
+            print(f"  {nom:<58} ×{ratio:.2f}")
+    elif historique:
+        print("\nAucune régression.")
+
+    if not args.sans_historique:
+        entree = {
+            "date":        datetime.now().isoformat(timespec="seconds"),
+            "commit":      _commit(),
+            "machine":     machine,
+            "python":      platform.python_version(),
+            "repetitions": args.repetitions,
+            "resultats":   resultats,
+        }
+        with args.historique.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entree, ensure_ascii=False) + "\n")
+
+    return 1 if (args.verifier and lents) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
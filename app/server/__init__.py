@@ -69,17 +69,21 @@ def make_server(app_dir: Path):
 
             # Les imports sont à l'intérieur du if pour éviter les
             # imports circulaires et accélérer le démarrage.
+            # page_en_cache : la page n'est construite qu'une fois par processus,
+            # les navigations suivantes renvoient son HTML déjà rendu.
+            from ui._common import page_en_cache
+
             if page_name == "home":
                 from ui.home_ui import home_ui
-                return home_ui()
+                return page_en_cache("home", home_ui)
 
             if page_name == "energie":
                 from ui.energie import energie_ui
-                return energie_ui()
+                return page_en_cache("energie", energie_ui)
 
             if page_name == "donnees":
                 from ui.donnees import donnees_ui
-                return donnees_ui()
+                return page_en_cache("donnees", donnees_ui)
 
         # =========================================================
         # SERVEURS PAR GRAND MODULE (LAZY)
@@ -0,0 +1,361 @@
+# server/_bundle.py — données préconstruites partagées entre plusieurs processus
+#
+# Avec plusieurs workers uvicorn, chaque processus remplit son propre cache
+# cached() : GeoDataFrames, cartes Folium, tables d'échanges… sont lus et
+# construits autant de fois qu'il y a de workers, et occupent autant de mémoire.
+#
+# Ce fichier permet à un processus parent de tout construire une seule fois,
+# puis d'écrire le contenu du cache sur disque dans un format que les workers
+# relisent sans recalcul :
+#
+#   - tableaux NumPy et colonnes numériques/dates des DataFrames → fichiers .npy
+#     ouverts en mémoire partagée (np.load(mmap_mode="r")) : les pages sont
+#     celles du cache disque du système, communes à tous les workers
+#   - cartes Folium et autres longs textes HTML → fichiers .html, lus à la demande
+#   - petites valeurs et structures JSON (GeoJSON…) → JSON
+#   - géométries des GeoDataFrames → WKB, reconstruites à la lecture
+#     (les objets shapely ne peuvent pas vivre en mémoire partagée)
+#
+# Une entrée du cache qui contient un type non pris en charge n'est pas exportée :
+# les workers la construisent eux-mêmes, comme avant.
+#
+# Le bundle est périmé dès que ce dont il dépend change (signature()) : format
+# de index.json, code serveur (builders, champs des dataclasses), versions des
+# bibliothèques, contenu des fichiers de www/data. server/deploiement.py le
+# reconstruit alors, et un worker qui tomberait sur un bundle périmé l'ignore.
+#
+# Organisation du dossier :
+#   index.json          format, signature, et clé du cache → description de la valeur
+#   donnees/<n>.npy     tableaux
+#   donnees/<n>.html    textes longs
+#   donnees/<n>.json    structures JSON volumineuses
+#   donnees/<n>.wkb     géométries (+ <n>.npy : positions de chaque géométrie)
+#
+# Utilisation : server/deploiement.py construit le dossier puis lance les workers
+# avec SIMPY_BUNDLE_DIR ; cached() (server/_common.py) lit alors le dossier
+# avant d'appeler le loader.
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import importlib
+import json
+import logging
+import shutil
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = Path(__file__).resolve().parents[1]
+
+# Version du format de index.json : à incrémenter quand ecrire() ou _lire() changent
+FORMAT = 2
+
+# Bibliothèques dont dépend le contenu du bundle (types relus, HTML des cartes)
+BIBLIOTHEQUES = ("numpy", "pandas", "geopandas", "shapely", "folium", "plotly")
+
+# Taille à partir de laquelle un texte ou un JSON est écrit dans son propre fichier
+SEUIL_FICHIER = 4096
+
+# Marqueur renvoyé par lire() quand la clé n'est pas dans le bundle
+ABSENT = object()
+
+
+class NonExportable(TypeError):
+    """Valeur qu'on ne sait pas écrire dans le bundle (elle sera construite par chaque worker)."""
+
+
+# =====================================================================
+# Signature : ce dont dépend le contenu du bundle
+# =====================================================================
+def _empreinte(*chemins: Path) -> str:
+    h = hashlib.sha256()
+    for chemin in chemins:
+        h.update(chemin.read_bytes())
+    return h.hexdigest()[:16]
+
+
+def signature(app_dir: Path = APP_DIR) -> dict:
+    """
+    Format de index.json, empreinte du code serveur (server/**/*.py), versions
+    de BIBLIOTHEQUES et empreinte de chaque fichier de www/data.
+    Empreintes du contenu plutôt que dates : un git checkout change les dates.
+    """
+    from importlib import metadata
+
+    app_dir = Path(app_dir)
+    versions = {}
+    for nom in BIBLIOTHEQUES:
+        try:
+            versions[nom] = metadata.version(nom)
+        except metadata.PackageNotFoundError:
+            versions[nom] = None
+    data_dir = app_dir / "www" / "data"
+    return {
+        "format": FORMAT,
+        "code": _empreinte(*sorted((app_dir / "server").rglob("*.py"))),
+        "bibliotheques": versions,
+        "donnees": {
+            f.name: _empreinte(f) for f in sorted(data_dir.iterdir()) if f.is_file()
+        } if data_dir.is_dir() else {},
+    }
+
+
+def _ecarts(ancienne: dict | None, nouvelle: dict) -> str | None:
+    """Ce qui a changé entre deux signatures (texte), ou None si elles sont identiques."""
+    if not ancienne:
+        return "bundle absent"
+    if ancienne.get("format") != nouvelle["format"]:
+        return f"format {ancienne.get('format')} → {nouvelle['format']}"
+    if ancienne.get("code") != nouvelle["code"]:
+        return "code serveur modifié"
+    if ancienne.get("bibliotheques") != nouvelle["bibliotheques"]:
+        return "versions des bibliothèques modifiées"
+    avant, apres = ancienne.get("donnees", {}), nouvelle["donnees"]
+    modifies = sorted(f for f in avant.keys() | apres.keys() if avant.get(f) != apres.get(f))
+    if modifies:
+        return "données modifiées : " + ", ".join(modifies)
+    return None
+
+
+def _lire_index(dossier: Path) -> dict | None:
+    chemin = Path(dossier) / "index.json"
+    if not chemin.exists():
+        return None
+    return json.loads(chemin.read_text(encoding="utf-8"))
+
+
+def perime(dossier: Path, app_dir: Path = APP_DIR) -> str | None:
+    """Raison de reconstruire le bundle de dossier (absent, code ou données modifiés…), ou None s'il est à jour."""
+    index = _lire_index(dossier) or {}
+    return _ecarts(index.get("signature"), signature(app_dir))
+
+
+# =====================================================================
+# Écriture
+# =====================================================================
+def _json_strict(v: Any) -> bool:
+    """True si v fait l'aller-retour JSON à l'identique (clés textuelles, pas de tuple ni de NumPy)."""
+    if v is None or isinstance(v, (bool, int, float, str)):
+        return True
+    if isinstance(v, list):
+        return all(_json_strict(x) for x in v)
+    if isinstance(v, dict):
+        return all(isinstance(k, str) and _json_strict(x) for k, x in v.items())
+    return False
+
+
+class _Ecrivain:
+    """Écrit les fichiers d'une valeur et renvoie son manifeste (dict JSON)."""
+
+    def __init__(self, dossier: Path):
+        self.dossier = dossier
+        self.n = 0
+
+    def _fichier(self, suffixe: str) -> tuple[str, Path]:
+        self.n += 1
+        nom = f"donnees/{self.n}{suffixe}"
+        return nom, self.dossier / nom
+
+    def tableau(self, arr: np.ndarray) -> dict:
+        if arr.dtype.kind not in "biufcMmU" or arr.dtype.hasobject:
+            raise NonExportable(f"tableau de type {arr.dtype}")
+        nom, chemin = self._fichier(".npy")
+        np.save(chemin, np.ascontiguousarray(arr), allow_pickle=False)
+        return {"t": "npy", "f": nom}
+
+    def json(self, v: Any) -> dict:
+        texte = json.dumps(v, ensure_ascii=False, allow_nan=True)
+        if len(texte) < SEUIL_FICHIER:
+            return {"t": "json", "v": v}
+        nom, chemin = self._fichier(".json")
+        chemin.write_text(texte, encoding="utf-8")
+        return {"t": "json_f", "f": nom}
+
+    def texte(self, s: str) -> dict:
+        if len(s) < SEUIL_FICHIER:
+            return {"t": "json", "v": s}
+        nom, chemin = self._fichier(".html")
+        chemin.write_text(s, encoding="utf-8")
+        return {"t": "texte", "f": nom}
+
+    def colonne(self, serie: pd.Series) -> dict:
+        dtype = serie.dtype
+        if isinstance(dtype, pd.DatetimeTZDtype) or isinstance(dtype, pd.CategoricalDtype):
+            raise NonExportable(f"colonne {serie.name!r} de type {dtype}")
+        if dtype.kind in "biufcMm" and not isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            return {"dtype": str(dtype), **self.tableau(serie.to_numpy())}
+        # Textes et objets : valeurs JSON (None pour les manquants), dtype d'origine restauré
+        valeurs = [None if pd.isna(x) else x for x in serie.tolist()]
+        return {"dtype": str(dtype), **self.json(valeurs)}
+
+    def dataframe(self, df: pd.DataFrame) -> dict:
+        if isinstance(df.index, pd.MultiIndex) or isinstance(df.columns, pd.MultiIndex):
+            raise NonExportable("DataFrame à MultiIndex")
+        if not all(isinstance(c, str) for c in df.columns):
+            raise NonExportable("noms de colonnes non textuels")
+
+        man: dict[str, Any] = {"t": "df", "colonnes": []}
+        geometrie = None
+        try:
+            import geopandas as gpd
+            if isinstance(df, gpd.GeoDataFrame):
+                geometrie = df.geometry.name
+                man.update(
+                    t="gdf", geometrie=geometrie,
+                    crs=df.crs.to_json() if df.crs is not None else None,
+                )
+        except ImportError:
+            pass
+
+        for c in df.columns:
+            if c == geometrie:
+                man["colonnes"].append([c, self.geometries(df[c])])
+            else:
+                man["colonnes"].append([c, self.colonne(df[c])])
+
+        if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+            man["index"] = {"nom": df.index.name, **self.colonne(df.index.to_series())}
+        return man
+
+    def geometries(self, geo) -> dict:
+        wkb = [b"" if g is None else g.wkb for g in geo]
+        bornes = np.cumsum([0] + [len(b) for b in wkb]).astype(np.int64)
+        nom, chemin = self._fichier(".wkb")
+        chemin.write_bytes(b"".join(wkb))
+        return {"dtype": "geometry", "t": "wkb", "f": nom, "bornes": self.tableau(bornes)}
+
+    def valeur(self, v: Any) -> dict:
+        if v is None or isinstance(v, (bool, int, float)):
+            return {"t": "json", "v": v}
+        if isinstance(v, str):
+            return self.texte(v)
+        if isinstance(v, np.generic):
+            return {"t": "json", "v": v.item()}
+        if isinstance(v, np.ndarray):
+            return self.tableau(v)
+        if isinstance(v, pd.DataFrame):
+            return self.dataframe(v)
+        if dataclasses.is_dataclass(v) and not isinstance(v, type):
+            classe = type(v)
+            return {
+                "t": "dataclass",
+                "classe": f"{classe.__module__}:{classe.__qualname__}",
+                "champs": {f.name: self.valeur(getattr(v, f.name)) for f in dataclasses.fields(v)},
+            }
+        if isinstance(v, (dict, list, tuple)):
+            # Structure purement JSON (ex. GeoJSON) : un seul bloc
+            if _json_strict(v):
+                return self.json(v)
+            if isinstance(v, dict):
+                if not all(k is None or isinstance(k, (str, bool, int, float)) for k in v):
+                    raise NonExportable("clé de dict non JSON")
+                return {"t": "dict", "items": [[k, self.valeur(x)] for k, x in v.items()]}
+            return {"t": type(v).__name__, "items": [self.valeur(x) for x in v]}
+        raise NonExportable(type(v).__name__)
+
+
+def ecrire(cache: dict[str, Any], dossier: Path, app_dir: Path = APP_DIR) -> dict[str, str]:
+    """
+    Écrit toutes les entrées exportables de cache dans dossier (remplacé s'il existe),
+    avec la signature des sources de app_dir. Renvoie, pour chaque clé ignorée, la raison.
+    """
+    dossier = Path(dossier)
+    tmp = dossier.with_name(dossier.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    (tmp / "donnees").mkdir(parents=True)
+
+    sig = signature(app_dir)   # avant lecture du cache : une source modifiée pendant l'écriture périme le bundle
+    ecrivain = _Ecrivain(tmp)
+    index, ignorees = {}, {}
+    for key, v in list(cache.items()):
+        try:
+            index[key] = ecrivain.valeur(v)
+        except NonExportable as e:
+            ignorees[key] = str(e)
+    (tmp / "index.json").write_text(
+        json.dumps({"format": FORMAT, "signature": sig, "entrees": index}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+
+    # Remplacement en bloc : un worker ne voit jamais un dossier à moitié écrit
+    shutil.rmtree(dossier, ignore_errors=True)
+    tmp.rename(dossier)
+    _index.cache_clear()
+    return ignorees
+
+
+# =====================================================================
+# Lecture
+# =====================================================================
+@lru_cache(maxsize=None)
+def _index(dossier: str) -> dict:
+    """Entrées du bundle, ou {} s'il est absent ou périmé (chaque entrée est alors reconstruite)."""
+    index = _lire_index(Path(dossier))
+    if index is None:
+        return {}
+    raison = _ecarts(index.get("signature"), signature())
+    if raison is not None:
+        logger.warning("Bundle %s ignoré (%s) : données construites par ce worker", dossier, raison)
+        return {}
+    return index["entrees"]
+
+
+def _lire_colonne(dossier: Path, man: dict, n: int | None = None):
+    if man["t"] == "wkb":
+        import shapely
+        bornes = _lire(dossier, man["bornes"])
+        brut   = (dossier / man["f"]).read_bytes()
+        return [
+            None if a == b else shapely.from_wkb(brut[a:b])
+            for a, b in zip(bornes[:-1].tolist(), bornes[1:].tolist())
+        ]
+    if man["t"] == "npy":
+        return _lire(dossier, man)            # tableau en mémoire partagée, sans copie
+    return pd.array(_lire(dossier, man), dtype=man["dtype"])
+
+
+def _lire(dossier: Path, man: dict) -> Any:
+    t = man["t"]
+    if t == "json":
+        return man["v"]
+    if t == "json_f":
+        return json.loads((dossier / man["f"]).read_text(encoding="utf-8"))
+    if t == "texte":
+        return (dossier / man["f"]).read_text(encoding="utf-8")
+    if t == "npy":
+        return np.load(dossier / man["f"], mmap_mode="r", allow_pickle=False)
+    if t in ("df", "gdf"):
+        colonnes = {c: _lire_colonne(dossier, m) for c, m in man["colonnes"]}
+        index = None
+        if "index" in man:
+            index = pd.Index(_lire_colonne(dossier, man["index"]), name=man["index"]["nom"])
+        df = pd.DataFrame(colonnes, index=index, copy=False)
+        if t == "gdf":
+            import geopandas as gpd
+            df = gpd.GeoDataFrame(df, geometry=man["geometrie"], crs=man["crs"])
+        return df
+    if t == "dataclass":
+        module, nom = man["classe"].split(":")
+        classe = getattr(importlib.import_module(module), nom)
+        return classe(**{k: _lire(dossier, m) for k, m in man["champs"].items()})
+    if t == "dict":
+        return {k: _lire(dossier, m) for k, m in man["items"]}
+    if t == "list":
+        return [_lire(dossier, m) for m in man["items"]]
+    if t == "tuple":
+        return tuple(_lire(dossier, m) for m in man["items"])
+    raise ValueError(f"Type inconnu dans le bundle : {t}")
+
+
+def lire(dossier: str | Path, key: str) -> Any:
+    """Valeur de key relue depuis le bundle, ou ABSENT si elle n'y figure pas."""
+    man = _index(str(dossier)).get(key)
+    if man is None:
+        return ABSENT
+    return _lire(Path(dossier), man)
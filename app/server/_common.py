@@ -1,10 +1,20 @@
 # server/_common.py — utilitaires partagés par tous les modules serveur
 #
-# Ce fichier centralise quatre types de ressources :
+# Ce fichier centralise huit types de ressources :
 #
 #   1. CACHE GLOBAL — évite de recharger les mêmes fichiers de données
 #      à chaque interaction utilisateur. Un CSV chargé une fois reste
 #      en mémoire pour toute la durée de vie du processus.
+#      Avec plusieurs workers, ce cache peut être préconstruit une fois
+#      par un processus parent (server/_bundle.py, server/deploiement.py).
+#      LRUCache complète ce cache pour les résultats nombreux mais bornés
+#      (ex. une figure par position de curseurs) : les entrées les moins
+#      récemment utilisées sont évincées au-delà d'une taille maximale.
+#      Chaque lecture est signalée à server/_metrics.py (statut du cache
+#      d'un rendu, quand les métriques sont activées).
+#      cache_de_session() donne à une session un LRUCache borné (entrées et
+#      octets, configurables), vidé à la fin de la session ; memoire() estime
+#      les octets retenus par chaque cache et chaque session (/metrics).
 #
 #   2. MODE SOMBRE — détecte si l'utilisateur a activé le thème sombre
 #      pour adapter les couleurs des graphiques en conséquence.
@@ -13,13 +23,47 @@
 #      interactifs de l'application (Plotly est la bibliothèque qui
 #      produit les graphiques cliquables et survolables).
 #
-#   4. FILIÈRES ÉNERGÉTIQUES — liste unique des codes, libellés et
+#   4. ANTI-REBOND (debounce) — regroupe les valeurs intermédiaires d'un
+#      curseur que l'on fait glisser : seul l'état final déclenche un rendu.
+#      valeur_initiale() lit un input sans dépendance, pour les graphiques
+#      rendus une fois puis mis à jour par patch.
+#
+#   5. FILIÈRES ÉNERGÉTIQUES — liste unique des codes, libellés et
 #      couleurs par filière, pour que tous les modules utilisent
 #      exactement les mêmes valeurs sans copier-coller.
+#
+#   6. RENDUS EN ARRIÈRE-PLAN — les constructions lourdes (cartes Folium,
+#      chargements GeoPandas) s'exécutent dans un pool de threads borné,
+#      pour ne pas bloquer la boucle d'événements partagée par toutes
+#      les sessions du processus.
+#
+#   7. IMPORTS DIFFÉRÉS — GeoPandas, Shapely, Folium, Branca et Plotly Express
+#      représentent l'essentiel du temps de démarrage. lazy_import() les
+#      remplace par un substitut qui n'importe la bibliothèque qu'au premier
+#      usage, c'est-à-dire au premier rendu qui en a besoin
+#      (mesure : python -m benchmarks.demarrage).
+#
+#   8. CARTES FOLIUM — carte_html() produit le HTML d'une carte avec Leaflet
+#      servi par l'application (www/vendor/, cf. ui/vendor.py) plutôt que par
+#      les CDN, et sans les bibliothèques que Folium charge par défaut mais
+#      que nos cartes n'utilisent pas (jQuery, Bootstrap…).
 from __future__ import annotations
 
+import asyncio
+import dataclasses
 import hashlib
-from typing import Any, Callable
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+import itertools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable
+
+from server import _metrics
 
 
 # =====================================================================
@@ -28,14 +72,45 @@ from typing import Any, Callable
 
 _DATA_CACHE: dict[str, Any] = {}
 
+# Un verrou par clé : deux threads du pool de rendu qui demandent la même
+# valeur ne la construisent qu'une fois (le second attend le premier).
+_KEY_LOCKS: dict[str, threading.Lock] = {}
+_KEY_LOCKS_LOCK = threading.Lock()
+
 
 def cached(key: str, loader: Callable[[], Any]) -> Any:
-    """Charge la valeur via loader() une seule fois, puis la garde en mémoire."""
-    if key not in _DATA_CACHE:
-        _DATA_CACHE[key] = loader()
+    """
+    Charge la valeur via loader() une seule fois, puis la garde en mémoire.
+    En déploiement multi-workers (SIMPY_BUNDLE_DIR, cf. server/_bundle.py),
+    la valeur préconstruite par le processus parent est relue en priorité.
+    """
+    try:
+        valeur = _DATA_CACHE[key]
+    except KeyError:
+        pass
+    else:
+        _metrics.noter_cache(True)
+        return valeur
+    with _KEY_LOCKS_LOCK:
+        lock = _KEY_LOCKS.setdefault(key, threading.Lock())
+    with lock:
+        hit = key in _DATA_CACHE
+        if not hit:
+            _DATA_CACHE[key] = _depuis_bundle(key, loader)
+    _metrics.noter_cache(hit)
     return _DATA_CACHE[key]
 
 
+def _depuis_bundle(key: str, loader: Callable[[], Any]) -> Any:
+    dossier = os.environ.get("SIMPY_BUNDLE_DIR")
+    if dossier:
+        from server import _bundle
+        valeur = _bundle.lire(dossier, key)
+        if valeur is not _bundle.ABSENT:
+            return valeur
+    return loader()
+
+
 def cache_clear(prefix: str | None = None) -> None:
     """Vide le cache (entier, ou seulement les clés commençant par prefix)."""
     if prefix is None:
@@ -45,6 +120,172 @@ def cache_clear(prefix: str | None = None) -> None:
         _DATA_CACHE.pop(k, None)
 
 
+class LRUCache:
+    """
+    Cache borné : au-delà de maxsize entrées (ou de max_octets octets estimés),
+    les moins récemment utilisées sont supprimées. Les compteurs hits/misses
+    permettent de vérifier l'efficacité du cache. Un cache nommé est recensé
+    par memoire() (octets retenus, cf. /metrics).
+    """
+
+    def __init__(self, maxsize: int = 256, max_octets: int | None = None, nom: str | None = None):
+        self.maxsize    = maxsize
+        self.max_octets = max_octets
+        self.nom        = nom
+        self.hits       = 0
+        self.misses     = 0
+        self.evictions  = 0
+        self.octets     = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._tailles: dict[Hashable, int] = {}
+        self._lock      = threading.Lock()
+        if nom is not None:
+            _CACHES_NOMMES[nom] = self
+
+    def get_or_build(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Renvoie la valeur en cache, ou la construit via loader() et la mémorise."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                _metrics.noter_cache(True)
+                return self._data[key]
+            self.misses += 1
+        _metrics.noter_cache(False)
+
+        value = loader()
+        taille = taille_octets(value)
+
+        with self._lock:
+            self.octets += taille - self._tailles.get(key, 0)
+            self._data[key] = value
+            self._tailles[key] = taille
+            self._data.move_to_end(key)
+            while len(self._data) > 1 and (
+                len(self._data) > self.maxsize
+                or (self.max_octets is not None and self.octets > self.max_octets)
+            ):
+                ancienne, _ = self._data.popitem(last=False)
+                self.octets -= self._tailles.pop(ancienne)
+                self.evictions += 1
+        return value
+
+    def entrees(self) -> list[tuple[Hashable, int]]:
+        """(clé, octets estimés) de chaque entrée, de la plus ancienne à la plus récente."""
+        with self._lock:
+            return [(k, self._tailles[k]) for k in self._data]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._tailles.clear()
+            self.octets = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def taille_octets(v: Any, _vus: set[int] | None = None) -> int:
+    """
+    Estimation des octets retenus par v : tableaux NumPy, DataFrames (textes
+    compris), chaînes, conteneurs parcourus récursivement. Un objet partagé
+    n'est compté qu'une fois.
+    """
+    if _vus is None:
+        _vus = set()
+    if id(v) in _vus:
+        return 0
+    _vus.add(id(v))
+    if isinstance(v, (str, bytes, bytearray, int, float, bool)) or v is None:
+        return sys.getsizeof(v)
+    if hasattr(v, "memory_usage") and hasattr(v, "columns"):      # DataFrame
+        return int(v.memory_usage(deep=True).sum())
+    if hasattr(v, "memory_usage") and hasattr(v, "index"):        # Series
+        return int(v.memory_usage(deep=True))
+    if hasattr(v, "nbytes") and hasattr(v, "dtype"):              # tableau NumPy
+        return int(v.nbytes)
+    if isinstance(v, dict):
+        return sys.getsizeof(v) + sum(taille_octets(k, _vus) + taille_octets(x, _vus) for k, x in v.items())
+    if isinstance(v, (list, tuple, set, frozenset)):
+        return sys.getsizeof(v) + sum(taille_octets(x, _vus) for x in v)
+    if dataclasses.is_dataclass(v) and not isinstance(v, type):
+        return sys.getsizeof(v) + sum(taille_octets(getattr(v, f.name), _vus) for f in dataclasses.fields(v))
+    return sys.getsizeof(v)
+
+
+# =====================================================================
+# Caches de session
+# Un cache propre à une session (ex. les cartes déjà vues par un utilisateur)
+# grandissait tant que la session restait ouverte : un tableau de bord laissé
+# affiché des jours alourdissait le worker. cache_de_session() le borne et le
+# libère à la fin de la session.
+# =====================================================================
+# Bornes par défaut de chaque cache de session (entrées, mégaoctets estimés)
+SESSION_CACHE_MAX    = int(os.environ.get("SIMPY_SESSION_CACHE_MAX", "16"))
+SESSION_CACHE_MAX_MO = float(os.environ.get("SIMPY_SESSION_CACHE_MAX_MO", "32"))
+
+# LRUCache nommés (niveau processus) et caches de chaque session (id → nom → cache)
+_CACHES_NOMMES: dict[str, LRUCache] = {}
+_SESSIONS: dict[str, dict[str, LRUCache]] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def cache_de_session(session, nom: str, maxsize: int | None = None, max_mo: float | None = None) -> LRUCache:
+    """
+    LRUCache propre à la session, borné à maxsize entrées et max_mo Mo
+    (défauts : SIMPY_SESSION_CACHE_MAX, SIMPY_SESSION_CACHE_MAX_MO), vidé et
+    oublié à la fin de la session.
+    """
+    racine = session.root_scope()
+    cache = LRUCache(
+        maxsize=maxsize or SESSION_CACHE_MAX,
+        max_octets=int((max_mo or SESSION_CACHE_MAX_MO) * 1e6),
+    )
+    cache.nom = nom     # après coup : recensé avec sa session, pas parmi les caches du processus
+    with _SESSIONS_LOCK:
+        nouvelle = racine.id not in _SESSIONS
+        _SESSIONS.setdefault(racine.id, {})[nom] = cache
+    if nouvelle:
+        racine.on_ended(lambda: liberer_session(racine.id))
+    return cache
+
+
+def liberer_session(session_id: str) -> None:
+    """Vide et oublie les caches de la session (appelée à sa fin)."""
+    with _SESSIONS_LOCK:
+        caches = _SESSIONS.pop(session_id, {})
+    for cache in caches.values():
+        cache.clear()
+
+
+# Tailles des entrées de cached(), calculées une fois par valeur (clé → (id, octets))
+_TAILLES_CACHE: dict[str, tuple[int, int]] = {}
+
+
+def memoire() -> dict:
+    """
+    Octets estimés retenus par les caches du processus :
+      - "cached"   : entrées de cached(), regroupées par préfixe de clé (« bilan::map »…)
+      - "lru"      : LRUCache nommés (figures du simulateur…)
+      - "sessions" : id de session → nom du cache → octets
+    """
+    par_prefixe: dict[str, int] = {}
+    for key, valeur in list(_DATA_CACHE.items()):
+        connu = _TAILLES_CACHE.get(key)
+        if connu is None or connu[0] != id(valeur):
+            connu = _TAILLES_CACHE[key] = (id(valeur), taille_octets(valeur))
+        # « bilan::map::/chemin/app::2020::0 » → « bilan::map » (chemins et paramètres retirés)
+        prefixe = "::".join([p for p in key.split("::") if "/" not in p][:2])
+        par_prefixe[prefixe] = par_prefixe.get(prefixe, 0) + connu[1]
+    with _SESSIONS_LOCK:
+        sessions = {sid: {nom: c.octets for nom, c in caches.items()} for sid, caches in _SESSIONS.items()}
+    return {
+        "cached":   dict(sorted(par_prefixe.items(), key=lambda x: -x[1])),
+        "lru":      {nom: c.octets for nom, c in _CACHES_NOMMES.items()},
+        "sessions": sessions,
+    }
+
+
 # =====================================================================
 # Mode sombre — lu depuis l'input Shiny "darkmode" (une checkbox HTML)
 # =====================================================================
@@ -57,6 +298,82 @@ def is_dark(input) -> bool:
         return False
 
 
+# =====================================================================
+# Anti-rebond (debounce) des entrées réactives
+# Quand on fait glisser un curseur, le navigateur envoie une valeur à chaque
+# cran : sans anti-rebond, chaque valeur intermédiaire relance tous les
+# graphiques, alors qu'elle est déjà périmée au moment où le rendu se termine.
+# =====================================================================
+def debounce(delai_s: float):
+    """
+    Décorateur : transforme une fonction qui lit des inputs en reactive.calc
+    qui ne se met à jour qu'après delai_s secondes sans nouveau changement.
+
+    Les outputs qui en dépendent ne sont donc invalidés qu'une fois, avec la
+    valeur finale ; les valeurs intermédiaires ne sont jamais rendues.
+    À appeler à l'intérieur d'une fonction server() (crée des effets de session).
+    """
+    from shiny import reactive  # import local : garde ce module utilisable hors Shiny
+
+    def decorateur(fn: Callable[[], Any]):
+        echeance = reactive.Value(None)   # instant (time.monotonic) de publication prévu
+        publie   = reactive.Value(0)      # compteur incrémenté à chaque publication
+        premier  = [True]                 # la valeur initiale est publiée sans attendre
+
+        # Surveille les inputs lus par fn() et repousse l'échéance à chaque changement
+        @reactive.effect(priority=102)
+        def _surveiller():
+            try:
+                fn()
+            except Exception:
+                pass    # input pas encore disponible (req(), session en cours d'init…)
+            if premier[0]:
+                premier[0] = False
+                return
+            echeance.set(time.monotonic() + delai_s)
+
+        # Publie la valeur une fois l'échéance atteinte sans nouveau changement
+        @reactive.effect(priority=101)
+        def _minuterie():
+            fin = echeance()
+            if fin is None:
+                return
+            reste = fin - time.monotonic()
+            if reste > 0:
+                reactive.invalidate_later(reste)
+                return
+            with reactive.isolate():
+                echeance.set(None)
+                publie.set(publie() + 1)
+
+        @reactive.calc
+        def valeur():
+            publie()
+            with reactive.isolate():
+                return fn()
+
+        return valeur
+
+    return decorateur
+
+
+def valeur_initiale(fn: Callable[[], Any]) -> Any:
+    """
+    Lit fn() sans créer de dépendance réactive : sert aux graphiques rendus une
+    seule fois puis mis à jour par patch (la valeur ne compte qu'au premier rendu).
+    Si l'input n'est pas encore disponible, la dépendance est créée pour que le
+    rendu soit relancé à son arrivée.
+    """
+    from shiny import reactive
+    from shiny.types import SilentException
+
+    try:
+        with reactive.isolate():
+            return fn()
+    except SilentException:
+        return fn()
+
+
 # =====================================================================
 # Thème Plotly — couleurs adaptées clair/sombre
 # Retourne un dictionnaire de couleurs prêt à l'emploi dans fig.update_layout()
@@ -126,3 +443,261 @@ FILIERE_LABELS_FR: list[str] = [FILIERE_LABEL[c] for c in FILIERE_CODES]
 FILIERE_COLOR_BY_LABEL: dict[str, str] = {
     FILIERE_LABEL[c]: FILIERE_COLOR[c] for c in FILIERE_CODES
 }
+
+
+# =====================================================================
+# Rendus en arrière-plan — pool de threads borné
+# Une carte Folium froide prend plusieurs centaines de millisecondes : exécutée
+# directement dans une fonction de rendu, elle bloque la boucle d'événements,
+# donc toutes les autres sessions du même processus.
+#
+# Des threads plutôt que des processus : les résultats atterrissent dans le
+# cache cached() du processus, partagé par toutes les sessions, et les objets
+# (GeoDataFrame, HTML) n'ont pas à être sérialisés entre processus.
+#
+# Réglages (variables d'environnement) :
+#   SIMPY_RENDU_THREADS  nombre de threads du pool         (défaut : 4)
+#   SIMPY_RENDU_FILE     tâches en attente au maximum      (défaut : 32)
+# =====================================================================
+RENDU_THREADS = int(os.environ.get("SIMPY_RENDU_THREADS", "4"))
+RENDU_FILE    = int(os.environ.get("SIMPY_RENDU_FILE", "32"))
+# Délai avant un nouvel essai de chargement quand le pool est saturé (s)
+RELANCE_S = 1.0
+
+_POOL: ThreadPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+# Places disponibles : tâches en cours + tâches en attente
+_PLACES = threading.BoundedSemaphore(RENDU_THREADS + RENDU_FILE)
+
+
+# Identifiants des notifications de chargement (cf. apres_chargement)
+_NOTIFICATIONS = itertools.count(1)
+
+
+class FilePleine(RuntimeError):
+    """Levée quand le pool de rendu a déjà trop de tâches en attente."""
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=RENDU_THREADS, thread_name_prefix="rendu")
+        return _POOL
+
+
+async def en_arriere_plan(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Exécute fn(*args) dans le pool de rendu et attend le résultat sans bloquer
+    la boucle d'événements. Si l'attente est annulée (l'utilisateur a changé
+    d'avis), la tâche est retirée de la file si elle n'a pas encore démarré.
+    """
+    if not _PLACES.acquire(blocking=False):
+        raise FilePleine("Le serveur est très sollicité : nouvel essai dans un instant.")
+    try:
+        fut = _pool().submit(fn, *args)
+    except BaseException:
+        _PLACES.release()
+        raise
+    fut.add_done_callback(lambda _: _PLACES.release())
+    try:
+        return await asyncio.wrap_future(fut)
+    except asyncio.CancelledError:
+        fut.cancel()
+        raise
+
+
+def tache_de_rendu(parametres: Callable[[], tuple], construire: Callable[..., Any], *, sortie: str):
+    """
+    À appeler dans une fonction server(). parametres() lit les inputs (lecture
+    réactive) et renvoie les arguments de construire(*args), exécutée dans le pool.
+    sortie est l'id de l'output qui affiche le résultat.
+
+    Renvoie une fonction resultat() à lire dans la fonction de rendu. Pendant le
+    calcul, la sortie garde son contenu précédent en état « recalcul » (estompée,
+    cf. www/styles.css) ; si les inputs changent avant la fin, le calcul en cours
+    est annulé et remplacé par le nouveau.
+
+    Comme le rendu d'un output masqué, que Shiny suspend, le calcul n'est pas
+    lancé tant que la sortie est masquée (onglet inactif) : il l'est à son
+    affichage, avec les derniers arguments.
+    """
+    from shiny import reactive, req
+    from shiny.session import get_current_session
+    from shiny.types import SafeException
+
+    session = get_current_session()
+
+    # Calcul chronométré (server/_metrics.py) : sa durée compte dans celle du rendu
+    construire_mesure = _metrics.chronometrer(construire)
+
+    @reactive.extended_task
+    async def tache(*args):
+        try:
+            return await en_arriere_plan(construire_mesure, *args)
+        except FilePleine as e:
+            raise SafeException(str(e)) from e
+
+    lance: list[tuple] = []     # arguments du dernier calcul lancé
+
+    @reactive.effect
+    def _lancer():
+        args = parametres()
+        # None tant que le navigateur n'a pas signalé la sortie : on calcule
+        if session.clientdata.output_hidden(sortie):
+            return
+        with reactive.isolate():
+            if lance and lance[0] == args and tache.status() != "cancelled":
+                return      # sortie ré-affichée : résultat déjà calculé (ou en cours)
+            lance[:] = [args]
+            tache.cancel()
+            tache.invoke(*args)
+
+    def resultat():
+        if tache.status() == "cancelled":
+            # Calcul abandonné : le suivant est déjà en file, on garde l'affichage « en cours »
+            req(False, cancel_output="progress")
+        valeur, mesure = tache.result()
+        _metrics.joindre(mesure)
+        return valeur
+
+    return resultat
+
+
+def apres_chargement(charger: Callable[[], Any], enregistrer: Callable[[Any], None]) -> None:
+    """
+    À appeler dans une fonction server(). charger() (lecture des fichiers, GeoPandas…)
+    s'exécute dans le pool de rendu ; enregistrer(résultat) est appelée ensuite, sur
+    la boucle Shiny, pour déclarer les outputs qui dépendent de ces données.
+
+    Pool saturé : notification « chargement… » et nouvel essai après RELANCE_S.
+    Échec de charger() : notification d'erreur ; la session reste ouverte (une
+    erreur levée dans un effet la fermerait).
+    """
+    from shiny import reactive, ui
+    from shiny.types import SilentException
+
+    notification = f"chargement-{next(_NOTIFICATIONS)}"
+    relance: list[float] = []       # échéance du nouvel essai, pool saturé
+
+    @reactive.extended_task
+    async def _charger():
+        return await en_arriere_plan(charger)
+
+    _charger.invoke()
+
+    @reactive.effect
+    def _pret():
+        try:
+            resultat = _charger.result()   # interrompt silencieusement l'effet tant que le chargement tourne
+        except SilentException:
+            raise
+        except FilePleine as e:
+            if not relance:
+                relance.append(time.monotonic() + RELANCE_S)
+                ui.notification_show(f"Chargement… {e}", id=notification, duration=None)
+            reste = relance[0] - time.monotonic()
+            if reste > 0:
+                reactive.invalidate_later(reste)
+                return
+            relance.clear()
+            with reactive.isolate():
+                _charger.invoke()
+            return
+        except Exception:
+            logger.exception("chargement des données impossible")
+            ui.notification_show(
+                "Les données de cette page n'ont pas pu être chargées. Rechargez la page "
+                "dans un instant.",
+                id=notification, type="error", duration=None,
+            )
+            _pret.destroy()
+            return
+        ui.notification_remove(notification)
+        with reactive.isolate():
+            enregistrer(resultat)
+        _pret.destroy()
+
+
+# =====================================================================
+# Imports différés
+# Un module serveur écrit folium = lazy_import("folium") au lieu de
+# import folium : le nom existe dès l'import du module, mais la bibliothèque
+# n'est chargée qu'au premier accès à l'un de ses attributs (folium.Map…).
+# =====================================================================
+logger = logging.getLogger(__name__)
+
+# Durée de chaque import différé (ms), dans l'ordre où ils ont eu lieu
+_IMPORTS_DIFFERES: dict[str, float] = {}
+
+
+class _ModuleDiffere:
+    """Substitut d'un module : l'importe au premier accès à un attribut."""
+
+    def __init__(self, nom: str):
+        self._nom    = nom
+        self._module = None
+
+    def _charger(self):
+        t0 = time.perf_counter()
+        module = importlib.import_module(self._nom)
+        duree_ms = (time.perf_counter() - t0) * 1000.0
+        if self._nom not in _IMPORTS_DIFFERES:
+            # Module déjà importé ailleurs : durée quasi nulle
+            _IMPORTS_DIFFERES[self._nom] = duree_ms
+            logger.info("import différé de %s : %.1f ms", self._nom, duree_ms)
+        self._module = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        module = self._module or self._charger()
+        try:
+            return getattr(module, attr)
+        except AttributeError:
+            # Sous-module pas encore importé (ex. branca.colormap) : comme « import a.b »
+            try:
+                return importlib.import_module(f"{self._nom}.{attr}")
+            except ModuleNotFoundError:
+                raise AttributeError(f"module {self._nom!r} has no attribute {attr!r}") from None
+
+    def __repr__(self) -> str:
+        etat = "importé" if self._module is not None else "pas encore importé"
+        return f"<module {self._nom!r} ({etat})>"
+
+
+def lazy_import(nom: str) -> Any:
+    """
+    Renvoie un substitut du module nom, qui l'importera au premier accès à
+    l'un de ses attributs. Toujours un substitut, même si le module est déjà
+    importé : ses sous-modules (folium.plugins…) restent accessibles même
+    quand personne ne les a encore importés.
+    """
+    return _ModuleDiffere(nom)
+
+
+def imports_differes() -> dict[str, float]:
+    """Imports différés déjà effectués dans ce processus → durée en ms."""
+    return dict(_IMPORTS_DIFFERES)
+
+
+# =====================================================================
+# Cartes Folium
+# Chaque élément Folium (carte, plugin) déclare ses bibliothèques dans
+# default_js / default_css, ajoutées à l'en-tête au rendu : on les remplace,
+# sur l'instance, par les copies de www/vendor/.
+# =====================================================================
+def _elements_folium(element):
+    yield element
+    for enfant in element._children.values():
+        yield from _elements_folium(enfant)
+
+
+def carte_html(m) -> str:
+    """HTML (iframe) de la carte Folium m, bibliothèques servies depuis www/vendor/."""
+    from ui.vendor import ressources_folium
+
+    for element in _elements_folium(m):
+        if hasattr(element, "default_js"):
+            element.default_js  = ressources_folium(element.default_js)
+            element.default_css = ressources_folium(element.default_css)
+    return m._repr_html_()
@@ -0,0 +1,258 @@
+# server/_figures.py — construction et sérialisation rapides des figures Plotly
+#
+# Les graphiques étaient construits trace par trace avec go.Figure ou plotly.express.
+# À chaque appel, Plotly valide chaque propriété (couleurs, énumérations, tableaux…),
+# puis convertit les listes Python en JSON nombre par nombre.
+#
+# Ce fichier propose un chemin plus direct :
+#
+#   1. Les figures sont de simples dicts {"data": [...], "layout": {...}},
+#      écrits dans le format attendu par plotly.js.
+#   2. Les séries numériques sont des tableaux NumPy (tableau()) : le widget
+#      les transmet au navigateur en binaire au lieu d'une liste de nombres.
+#   3. widget() crée le FigureWidget sans revalider les propriétés (seulement
+#      si la version de Plotly est connue et qu'un auto-test vérifie que les
+#      patchs restent transmis — sinon construction validée classique). Quand
+#      www/vendor/plotly/widgetbundle.js existe (python -m ui.vendor), le widget
+#      charge plotly.js depuis cette URL, mise en cache par le navigateur, au
+#      lieu de l'embarquer (~5 Mo) dans l'état de chaque widget.
+#   4. dumps() sérialise une figure hors widget (benchmarks, export HTML) avec
+#      orjson si disponible, les tableaux étant encodés en "typed arrays" plotly.js
+#      ({"dtype": "f8", "bdata": "<base64>"}).
+#
+# Règle : les dicts renvoyés par les builders sont considérés comme figés
+# (ils peuvent être partagés entre sessions) — ne jamais les modifier en place.
+from __future__ import annotations
+
+import base64
+import json
+import logging
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+import plotly
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.colors import make_colorscale, sequential
+
+try:
+    import orjson
+except ImportError:  # orjson est facultatif : repli sur le module json standard
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+# Codes de types binaires compris par plotly.js
+_DTYPES_PLOTLYJS = {
+    "int8": "i1", "uint8": "u1", "int16": "i2", "uint16": "u2",
+    "int32": "i4", "uint32": "u4", "float32": "f4", "float64": "f8",
+}
+
+
+# =====================================================================
+# Construction
+# =====================================================================
+def tableau(values) -> np.ndarray:
+    """
+    Convertit une série (liste, Series pandas…) en tableau NumPy transmissible
+    en binaire : float64 pour les réels, int32 pour les entiers (plotly.js ne
+    lit pas l'int64). Les textes sont laissés tels quels.
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind in "iu":
+        return arr.astype(np.int32)
+    if arr.dtype.kind == "f":
+        return arr.astype(np.float64, copy=False)
+    if arr.dtype.kind == "M":
+        # Dates → chaînes ISO (format compris par plotly.js, sans ambiguïté de fuseau)
+        return np.datetime_as_string(arr, unit="D")
+    return arr
+
+
+def fusion(*dicts: dict) -> dict:
+    """Fusionne récursivement des dicts de layout (les derniers l'emportent)."""
+    out: dict = {}
+    for d in dicts:
+        for k, v in d.items():
+            if isinstance(v, dict) and isinstance(out.get(k), dict):
+                out[k] = fusion(out[k], v)
+            else:
+                out[k] = v
+    return out
+
+
+@lru_cache(maxsize=None)
+def _template(nom: str) -> dict:
+    """Template Plotly nommé, converti une fois en dict (plotly.js ne connaît pas les noms)."""
+    return pio.templates[nom].to_plotly_json()
+
+
+@lru_cache(maxsize=None)
+def echelle(nom: str) -> list:
+    """Échelle de couleurs nommée de plotly.express (ex. "Purples") au format plotly.js."""
+    return make_colorscale(getattr(sequential, nom))
+
+
+def figure(data: list[dict], layout: dict) -> dict:
+    """Assemble une figure brute ; un template donné par son nom est résolu en dict."""
+    if isinstance(layout.get("template"), str):
+        layout = {**layout, "template": _template(layout["template"])}
+    return {"data": data, "layout": layout}
+
+
+def _url_bundle() -> str | None:
+    """
+    URL absolue de www/vendor/plotly/widgetbundle.js vue par le navigateur de
+    la session en cours, ou None (fichier absent, hors session). anywidget ne
+    charge le code d'un widget depuis une URL que si elle commence par http(s).
+    """
+    from shiny import reactive
+    from shiny.session import get_current_session
+    from shiny.types import SilentException
+
+    from ui import _assets
+    from ui.vendor import PLOTLY_WIDGET
+
+    f = _assets.fichier(PLOTLY_WIDGET)
+    session = get_current_session()
+    if f is None or session is None:
+        return None
+    client = session.clientdata
+    try:
+        with reactive.isolate():
+            protocole, hote = client.url_protocol(), client.url_hostname()
+            port, chemin = client.url_port(), client.url_pathname()
+    except (SilentException, ValueError):
+        return None         # client qui n'a pas transmis son URL
+    port = f":{port}" if port else ""
+    return f"{protocole}//{hote}{port}{chemin.rsplit('/', 1)[0]}/{f.url}"
+
+
+@lru_cache(maxsize=None)
+def _classe_widget(url_esm: str | None) -> type[go.FigureWidget]:
+    """FigureWidget dont le code front-end est chargé depuis url_esm (classe d'origine si None)."""
+    if url_esm is None:
+        return go.FigureWidget
+    # Même module que go.FigureWidget : shinywidgets en déduit le paquet (plotly)
+    return type("FigureWidget", (go.FigureWidget,), {"_esm": url_esm, "__module__": go.FigureWidget.__module__})
+
+
+# Versions majeures de Plotly sur lesquelles la construction sans validation
+# a été vérifiée (elle s'appuie sur l'attribut privé _validate)
+_PLOTLY_TESTEES = ("6", "7")
+
+
+def _reactiver_validation(w: go.FigureWidget) -> None:
+    """
+    Réactive la validation après une construction avec _validate=False : sans
+    elle, les modifications ultérieures (patchs de courbes, de thème…) ne
+    seraient pas transmises au navigateur.
+    """
+    w._validate = True
+    w.layout._validate = True
+    for trace in w.data:
+        trace._validate = True
+
+
+@lru_cache(maxsize=None)
+def _construction_rapide() -> bool:
+    """
+    True si widget() peut construire sans validation : version de Plotly connue
+    et auto-test réussi (un widget construit ainsi émet bien les messages
+    restyle / relayout / update attendus pour des patchs de trace, de layout
+    imbriqué et groupés dans batch_update()). Évalué une fois par processus.
+    """
+    version = plotly.__version__
+    if version.split(".")[0] not in _PLOTLY_TESTEES:
+        logger.warning("Plotly %s non testé : figures construites avec validation", version)
+        return False
+
+    messages: list[tuple[str, dict]] = []
+    try:
+        w = go.FigureWidget(
+            data=[{"type": "scatter", "y": [1, 2], "marker": {"color": "red"}}],
+            layout={"xaxis": {"range": [0, 1]}},
+            _validate=False,
+        )
+        _reactiver_validation(w)
+        w._send_restyle_msg  = lambda restyle_data, **_: messages.append(("restyle", restyle_data))
+        w._send_relayout_msg = lambda layout_data, **_: messages.append(("relayout", layout_data))
+        w._send_update_msg   = lambda restyle_data, relayout_data, **_: messages.append(
+            ("update", {**restyle_data, **relayout_data})
+        )
+
+        w.data[0].y = [3, 4]
+        w.data[0].marker.color = "blue"
+        w.layout.xaxis.range = [0, 5]
+        with w.batch_update():
+            w.data[0].y = [5, 6]
+            w.layout.xaxis.range = [1, 2]
+    except Exception:
+        logger.warning("Auto-test de widget() en échec : figures construites avec validation", exc_info=True)
+        return False
+
+    attendus = [
+        ("restyle", "y"), ("restyle", "marker.color"), ("relayout", "xaxis.range"),
+        ("update", "y"), ("update", "xaxis.range"),
+    ]
+    recus = [(genre, cle) for genre, d in messages for cle in d]
+    if recus != attendus:
+        logger.warning(
+            "Plotly %s : patchs non transmis après construction sans validation (%s) — "
+            "figures construites avec validation", version, recus,
+        )
+        return False
+    return True
+
+
+def widget(fig: dict) -> go.FigureWidget:
+    """
+    FigureWidget construit directement depuis le dict, sans validation propriété
+    par propriété quand _construction_rapide() l'autorise. Plotly retouche les
+    dicts de traces reçus (clé "type") : on lui passe des copies de premier
+    niveau pour laisser fig intact.
+    """
+    rapide = _construction_rapide()
+    w = _classe_widget(_url_bundle())(
+        data=[dict(trace) for trace in fig["data"]],
+        layout=dict(fig["layout"]),
+        _validate=not rapide,
+    )
+    if rapide:
+        _reactiver_validation(w)
+    return w
+
+
+# =====================================================================
+# Sérialisation hors widget
+# =====================================================================
+def typed_arrays(obj: Any) -> Any:
+    """
+    Copie de obj où les tableaux NumPy numériques sont remplacés par le format
+    binaire de plotly.js, et les autres tableaux par des listes.
+    """
+    if isinstance(obj, dict):
+        return {k: typed_arrays(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [typed_arrays(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        code = _DTYPES_PLOTLYJS.get(str(obj.dtype))
+        if code is None:
+            return obj.tolist()
+        spec = {"dtype": code, "bdata": base64.b64encode(np.ascontiguousarray(obj)).decode("ascii")}
+        if obj.ndim > 1:
+            spec["shape"] = ", ".join(str(n) for n in obj.shape)
+        return spec
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+
+def dumps(fig: dict) -> bytes:
+    """Sérialise une figure brute en JSON (orjson si installé), tableaux en binaire."""
+    payload = typed_arrays(fig)
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,600 @@
+# server/_metrics.py — mesure du temps de rendu de chaque output Shiny
+#
+# Activé par la variable d'environnement SIMPY_METRICS=1 (cf. app.py) ;
+# sans elle, ce fichier n'a aucun effet sur l'application.
+#
+# Pour chaque rendu d'un output (fr_map, map_hq_flapd, comp_plot, treemap_hq…) :
+#
+#   - durée réelle (ms) : fonction de rendu + calcul en arrière-plan associé
+#     (tache_de_rendu, server/_common.py) s'il y en a un
+#   - temps CPU (ms)    : CPU du thread qui a exécuté ces calculs
+#   - taille (octets)   : valeur JSON envoyée pour l'output, plus les messages
+#                         des widgets (shinywidgets) créés pendant le rendu
+#   - cache             : "hit" si toutes les lectures cached()/LRUCache étaient
+#                         déjà en mémoire, "miss" si au moins une a été construite,
+#                         "aucun" si le rendu n'a pas lu de cache
+#
+# Les mesures sont regroupées en histogrammes par output, exposés :
+#
+#   - sur GET /metrics (format texte Prometheus), uniquement si un jeton est
+#     configuré (SIMPY_METRICS_JETON) et présenté dans l'en-tête
+#     « Authorization: Bearer <jeton> » ; sans jeton, ni /metrics ni
+#     /metrics/memoire ne sont montées. L'adresse du client ne suffit pas : derrière
+#     un proxy inverse local, toutes les requêtes viennent de 127.0.0.1.
+#     Avec plusieurs workers, chaque processus a ses propres compteurs (la
+#     requête arrive sur l'un d'eux)
+#   - dans le journal (logger "server._metrics", niveau INFO), toutes les
+#     SIMPY_METRICS_LOG_S secondes (défaut : 60), sur une ligne :
+#       rendus : fr_map n=12 p50=180 ms p95=740 ms 1.1 Mo (cache 83 %) | …
+#
+# Mémoire : octets estimés retenus par chaque cache (cached() par préfixe de
+# clé, LRUCache nommés, caches de chaque session — cf. memoire() dans
+# server/_common.py) et mémoire résidente du processus, en jauges sur /metrics.
+# GET /metrics/memoire en donne le détail en JSON : entrées de chaque cache,
+# caches de chaque session, et, si SIMPY_METRICS_MEMOIRE=1 (profilage
+# tracemalloc, qui ralentit les allocations), les lignes de code qui
+# retiennent le plus de mémoire.
+#
+# Le décorateur mesurer() peut s'appliquer à un output à la main, mais activer()
+# l'applique automatiquement à chaque output au moment de son enregistrement :
+# tous les modules de server/ sont couverts, y compris les outputs ajoutés plus tard.
+# Il s'accroche pour cela à des fonctions internes de Shiny et shinywidgets : sur
+# une version où elles ne sont plus celles attendues, les métriques restent
+# désactivées (avertissement au démarrage) plutôt que de gêner les outputs.
+from __future__ import annotations
+
+import contextvars
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable
+
+
+logger = logging.getLogger(__name__)
+
+METRICS_LOG_S = float(os.environ.get("SIMPY_METRICS_LOG_S", "60"))
+PROFIL_MEMOIRE = os.environ.get("SIMPY_METRICS_MEMOIRE") == "1"
+# Jeton exigé par /metrics et /metrics/memoire (vide : routes non montées)
+JETON = os.environ.get("SIMPY_METRICS_JETON", "")
+
+# Bornes supérieures des classes des histogrammes (la dernière classe est +Inf)
+BORNES_MS     = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+BORNES_OCTETS = (1_000, 10_000, 100_000, 300_000, 1_000_000, 3_000_000, 10_000_000)
+
+_ACTIF = False
+
+
+# =====================================================================
+# Mesure en cours — une par rendu (ou par calcul en arrière-plan)
+# Portée par une variable de contexte : les lectures du cache et les messages
+# de widgets émis pendant le rendu lui sont attribués.
+# =====================================================================
+class Mesure:
+    __slots__ = ("duree_ms", "cpu_ms", "octets", "hits", "misses", "jointe")
+
+    def __init__(self):
+        self.duree_ms = 0.0
+        self.cpu_ms   = 0.0
+        self.octets   = 0
+        self.hits     = 0
+        self.misses   = 0
+        self.jointe   = False
+
+    def ajouter(self, autre: "Mesure") -> None:
+        self.duree_ms += autre.duree_ms
+        self.cpu_ms   += autre.cpu_ms
+        self.octets   += autre.octets
+        self.hits     += autre.hits
+        self.misses   += autre.misses
+
+    @property
+    def cache(self) -> str:
+        if self.misses:
+            return "miss"
+        return "hit" if self.hits else "aucun"
+
+
+_MESURE: contextvars.ContextVar[Mesure | None] = contextvars.ContextVar("simpy_mesure", default=None)
+
+
+def noter_cache(hit: bool) -> None:
+    """Appelée par cached() et LRUCache : attribue la lecture au rendu en cours."""
+    m = _MESURE.get()
+    if m is not None:
+        if hit:
+            m.hits += 1
+        else:
+            m.misses += 1
+
+
+def chronometrer(fn: Callable[..., Any]) -> Callable[..., tuple[Any, Mesure | None]]:
+    """
+    Enveloppe un calcul exécuté hors de la fonction de rendu (pool de rendu) :
+    la fonction renvoyée rend (résultat, Mesure), ou (résultat, None) si les
+    métriques sont désactivées. La mesure est ensuite rattachée au rendu par joindre().
+    """
+    def mesure(*args):
+        if not _ACTIF:
+            return fn(*args), None
+        m = Mesure()
+        jeton = _MESURE.set(m)
+        t0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            return fn(*args), m
+        finally:
+            m.duree_ms = (time.perf_counter() - t0) * 1000.0
+            m.cpu_ms   = (time.thread_time() - c0) * 1000.0
+            _MESURE.reset(jeton)
+
+    return mesure
+
+
+def joindre(m: Mesure | None) -> None:
+    """Ajoute au rendu en cours un calcul mesuré par chronometrer() (une seule fois)."""
+    rendu = _MESURE.get()
+    if m is None or rendu is None or m.jointe:
+        return
+    m.jointe = True
+    rendu.ajouter(m)
+
+
+# =====================================================================
+# Histogrammes par output
+# =====================================================================
+class Histogramme:
+    def __init__(self, bornes: tuple[float, ...]):
+        self.bornes   = bornes
+        self.comptes  = [0] * (len(bornes) + 1)
+        self.somme    = 0.0
+        self.n        = 0
+        self.maximum  = 0.0
+
+    def ajouter(self, v: float) -> None:
+        i = 0
+        while i < len(self.bornes) and v > self.bornes[i]:
+            i += 1
+        self.comptes[i] += 1
+        self.somme += v
+        self.n += 1
+        self.maximum = max(self.maximum, v)
+
+    def quantile(self, q: float) -> float:
+        """Estimation par interpolation linéaire dans la classe qui contient le quantile."""
+        if self.n == 0:
+            return 0.0
+        rang, cumul = q * self.n, 0
+        for i, c in enumerate(self.comptes):
+            if c and cumul + c >= rang:
+                bas  = self.bornes[i - 1] if i > 0 else 0.0
+                haut = self.bornes[i] if i < len(self.bornes) else self.maximum
+                return min(bas + (haut - bas) * (rang - cumul) / c, self.maximum)
+            cumul += c
+        return self.maximum
+
+
+class _StatsOutput:
+    def __init__(self):
+        self.duree   = Histogramme(BORNES_MS)
+        self.cpu     = Histogramme(BORNES_MS)
+        self.octets  = Histogramme(BORNES_OCTETS)
+        self.cache   = {"hit": 0, "miss": 0, "aucun": 0}
+        self.erreurs = 0
+
+
+_STATS: dict[str, _StatsOutput] = {}
+_STATS_LOCK = threading.Lock()
+
+
+def _enregistrer(output_id: str, m: Mesure | None, erreur: bool = False) -> None:
+    with _STATS_LOCK:
+        s = _STATS.get(output_id)
+        if s is None:
+            s = _STATS[output_id] = _StatsOutput()
+        if erreur:
+            s.erreurs += 1
+            return
+        s.duree.ajouter(m.duree_ms)
+        s.cpu.ajouter(m.cpu_ms)
+        s.octets.ajouter(m.octets)
+        s.cache[m.cache] += 1
+
+
+def reinitialiser() -> None:
+    with _STATS_LOCK:
+        _STATS.clear()
+
+
+# =====================================================================
+# Décorateur d'output
+# =====================================================================
+def _taille_json(valeur: Any) -> int:
+    try:
+        return len(json.dumps(valeur, default=str, ensure_ascii=False).encode("utf-8"))
+    except (TypeError, ValueError):
+        return 0
+
+
+def mesurer(renderer):
+    """
+    Décorateur d'output (à placer au-dessus de @render.xxx) : chaque rendu est
+    mesuré et ajouté aux histogrammes de l'output. Sans effet si déjà appliqué.
+    """
+    if getattr(renderer, "_simpy_mesure", False):
+        return renderer
+    from shiny.types import SilentException
+
+    rendre = renderer.render
+
+    async def render():
+        m = Mesure()
+        jeton = _MESURE.set(m)
+        t0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            valeur = await rendre()
+        except SilentException:
+            raise       # req() non satisfait, rendu annulé : pas une mesure
+        except Exception:
+            _enregistrer(renderer.output_id, None, erreur=True)
+            raise
+        finally:
+            _MESURE.reset(jeton)
+        m.duree_ms += (time.perf_counter() - t0) * 1000.0
+        m.cpu_ms   += (time.thread_time() - c0) * 1000.0
+        m.octets   += _taille_json(valeur)
+        if not _suivre_widget(renderer, valeur, m):
+            _enregistrer(renderer.output_id, m)
+        return valeur
+
+    renderer.render = render
+    renderer._simpy_mesure = True
+    return renderer
+
+
+# Widgets (shinywidgets) : l'état initial du widget (données et layout d'une
+# figure Plotly, par ex.) n'est pas sérialisé pendant le rendu mais juste après,
+# par un effet de shinywidgets qui ouvre le canal de communication du widget.
+# Ce travail est rattaché au rendu qui a créé le widget, et la mesure n'est
+# enregistrée qu'à la fin de l'envoi (session.on_flushed).
+_WIDGETS_EN_COURS: dict[str, Mesure] = {}   # id du widget → mesure de son rendu
+
+
+def _suivre_widget(renderer, valeur: Any, m: Mesure) -> bool:
+    if not isinstance(valeur, dict) or "model_id" not in valeur:
+        return False
+    from shiny.session import get_current_session
+
+    session = get_current_session()
+    widget  = getattr(renderer, "_widget", None)
+    if session is None or widget is None:
+        return False
+    model_id = valeur["model_id"]
+    _WIDGETS_EN_COURS[model_id] = m
+
+    def chronometre(fn):
+        def f(*args, **kwargs):
+            if _WIDGETS_EN_COURS.get(model_id) is not m:
+                return fn(*args, **kwargs)
+            t0, c0 = time.perf_counter(), time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                m.duree_ms += (time.perf_counter() - t0) * 1000.0
+                m.cpu_ms   += (time.thread_time() - c0) * 1000.0
+        return f
+
+    # Préparation de l'état par shinywidgets avant l'envoi
+    for nom in ("_repr_mimebundle_", "get_state"):
+        if callable(getattr(widget, nom, None)):
+            setattr(widget, nom, chronometre(getattr(widget, nom)))
+
+    def fin():
+        if _WIDGETS_EN_COURS.get(model_id) is m:
+            del _WIDGETS_EN_COURS[model_id]
+            _enregistrer(renderer.output_id, m)
+
+    session.on_flushed(fin, once=True)
+    return True
+
+
+def _packer_mesure(json_packer: Callable[[Any], str]) -> Callable[[Any], str]:
+    """Sérialiseur des messages de widgets qui attribue leur taille (et leur coût) au rendu."""
+    def packer(obj):
+        t0, c0 = time.perf_counter(), time.thread_time()
+        texte = json_packer(obj)
+        m = _MESURE.get()
+        if m is None:
+            try:
+                m = _WIDGETS_EN_COURS.get(obj["content"]["comm_id"])
+            except (KeyError, TypeError):
+                m = None
+            if m is not None:
+                m.duree_ms += (time.perf_counter() - t0) * 1000.0
+                m.cpu_ms   += (time.thread_time() - c0) * 1000.0
+        if m is not None:
+            m.octets += len(texte)
+        return texte
+
+    return packer
+
+
+# =====================================================================
+# Exposition : /metrics et ligne de journal périodique
+# =====================================================================
+def _etiquette(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def texte_prometheus() -> str:
+    lignes: list[str] = []
+    with _STATS_LOCK:
+        stats = sorted(_STATS.items())
+        for nom, attr, aide in (
+            ("simpy_rendu_duree_ms",  "duree",  "Durée réelle du rendu (ms)"),
+            ("simpy_rendu_cpu_ms",    "cpu",    "Temps CPU du rendu (ms)"),
+            ("simpy_rendu_octets",    "octets", "Taille envoyée au navigateur (octets)"),
+        ):
+            lignes += [f"# HELP {nom} {aide}", f"# TYPE {nom} histogram"]
+            for output_id, s in stats:
+                h, o = getattr(s, attr), _etiquette(output_id)
+                cumul = 0
+                for borne, c in zip(list(h.bornes) + ["+Inf"], h.comptes):
+                    cumul += c
+                    lignes.append(f'{nom}_bucket{{output="{o}",le="{borne}"}} {cumul}')
+                lignes.append(f'{nom}_sum{{output="{o}"}} {h.somme:.3f}')
+                lignes.append(f'{nom}_count{{output="{o}"}} {h.n}')
+
+        lignes += ["# HELP simpy_rendu_cache_total Rendus par statut du cache",
+                   "# TYPE simpy_rendu_cache_total counter"]
+        for output_id, s in stats:
+            for statut, n in s.cache.items():
+                lignes.append(f'simpy_rendu_cache_total{{output="{_etiquette(output_id)}",statut="{statut}"}} {n}')
+
+        lignes += ["# HELP simpy_rendu_erreurs_total Rendus terminés par une erreur",
+                   "# TYPE simpy_rendu_erreurs_total counter"]
+        for output_id, s in stats:
+            lignes.append(f'simpy_rendu_erreurs_total{{output="{_etiquette(output_id)}"}} {s.erreurs}')
+    lignes += _lignes_memoire()
+    return "\n".join(lignes) + "\n"
+
+
+# =====================================================================
+# Mémoire : processus, caches, sessions
+# =====================================================================
+def rss_octets() -> int:
+    """Mémoire résidente du processus (octets ; 0 si /proc n'est pas disponible)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _lignes_memoire() -> list[str]:
+    from server._common import _CACHES_NOMMES, memoire
+
+    m = memoire()
+    lignes = [
+        "# HELP simpy_memoire_rss_octets Mémoire résidente du processus",
+        "# TYPE simpy_memoire_rss_octets gauge",
+        f"simpy_memoire_rss_octets {rss_octets()}",
+        "# HELP simpy_cache_octets Octets estimés retenus par cache (processus)",
+        "# TYPE simpy_cache_octets gauge",
+    ]
+    lignes += [f'simpy_cache_octets{{cache="cached:{_etiquette(k)}"}} {v}' for k, v in m["cached"].items()]
+    lignes += [f'simpy_cache_octets{{cache="lru:{_etiquette(k)}"}} {v}' for k, v in m["lru"].items()]
+    lignes += ["# HELP simpy_cache_evictions_total Entrées évincées des LRUCache nommés",
+               "# TYPE simpy_cache_evictions_total counter"]
+    lignes += [f'simpy_cache_evictions_total{{cache="lru:{_etiquette(k)}"}} {c.evictions}'
+               for k, c in list(_CACHES_NOMMES.items())]
+    lignes += [
+        "# HELP simpy_sessions Sessions ouvertes ayant au moins un cache de session",
+        "# TYPE simpy_sessions gauge",
+        f"simpy_sessions {len(m['sessions'])}",
+        "# HELP simpy_session_cache_octets Octets estimés retenus par les caches de chaque session",
+        "# TYPE simpy_session_cache_octets gauge",
+    ]
+    for sid, caches in m["sessions"].items():
+        for nom, octets in caches.items():
+            lignes.append(f'simpy_session_cache_octets{{session="{_etiquette(sid)}",cache="{_etiquette(nom)}"}} {octets}')
+    return lignes
+
+
+def detail_memoire(max_entrees: int = 20) -> dict:
+    """Détail JSON de /metrics/memoire : totaux, plus grosses entrées de chaque cache, allocations."""
+    from server._common import _CACHES_NOMMES, _SESSIONS, _SESSIONS_LOCK, memoire
+
+    def entrees(cache) -> list:
+        plus_grosses = sorted(cache.entrees(), key=lambda x: -x[1])[:max_entrees]
+        return [{"cle": repr(k)[:200], "octets": n} for k, n in plus_grosses]
+
+    detail = {
+        "rss_octets": rss_octets(),
+        **memoire(),
+        "entrees_lru": {nom: entrees(c) for nom, c in list(_CACHES_NOMMES.items())},
+    }
+    with _SESSIONS_LOCK:
+        sessions = {sid: dict(caches) for sid, caches in _SESSIONS.items()}
+    detail["entrees_sessions"] = {
+        sid: {nom: entrees(c) for nom, c in caches.items()} for sid, caches in sessions.items()
+    }
+    if PROFIL_MEMOIRE:
+        import tracemalloc
+
+        if tracemalloc.is_tracing():
+            stats = tracemalloc.take_snapshot().statistics("lineno")[:max_entrees]
+            detail["allocations"] = [
+                {"ligne": str(st.traceback[0]), "octets": st.size, "blocs": st.count} for st in stats
+            ]
+    return detail
+
+
+def ligne_resume(max_outputs: int = 12) -> str:
+    """Résumé des outputs les plus lents (p95), depuis le démarrage du processus."""
+    with _STATS_LOCK:
+        stats = [(o, s) for o, s in _STATS.items() if s.duree.n]
+        stats.sort(key=lambda x: x[1].duree.quantile(0.95), reverse=True)
+        morceaux = []
+        for output_id, s in stats[:max_outputs]:
+            mesures = s.cache["hit"] + s.cache["miss"]
+            cache = f" (cache {100 * s.cache['hit'] // mesures} %)" if mesures else ""
+            morceaux.append(
+                f"{output_id} n={s.duree.n} p50={s.duree.quantile(0.5):.0f} ms "
+                f"p95={s.duree.quantile(0.95):.0f} ms "
+                f"{s.octets.somme / s.duree.n / 1e6:.2f} Mo{cache}"
+            )
+    return " | ".join(morceaux)
+
+
+def ligne_memoire(max_caches: int = 5) -> str:
+    """Résumé mémoire : RSS, plus gros caches du processus, total des caches de session."""
+    from server._common import memoire
+
+    m = memoire()
+    caches = {f"lru:{k}": v for k, v in m["lru"].items()}
+    caches.update(m["cached"])
+    gros = sorted(caches.items(), key=lambda x: -x[1])[:max_caches]
+    sessions = sum(sum(c.values()) for c in m["sessions"].values())
+    return (
+        f"RSS {rss_octets() / 1e6:.0f} Mo | caches {sum(caches.values()) / 1e6:.1f} Mo ("
+        + ", ".join(f"{k} {v / 1e6:.1f} Mo" for k, v in gros)
+        + f") | {len(m['sessions'])} sessions {sessions / 1e6:.1f} Mo"
+    )
+
+
+def _journal_periodique() -> None:
+    dernier = None
+    while True:
+        time.sleep(METRICS_LOG_S)
+        ligne = ligne_resume()
+        if ligne and ligne != dernier:
+            logger.info("rendus : %s", ligne)
+            dernier = ligne
+        logger.info("mémoire : %s", ligne_memoire())
+
+
+def _autorisee(request) -> bool:
+    # Jeton comparé en temps constant ; /metrics/memoire liste les id de session
+    schema, _, jeton = request.headers.get("authorization", "").partition(" ")
+    return bool(JETON) and schema.lower() == "bearer" and hmac.compare_digest(
+        jeton.strip().encode(), JETON.encode()
+    )
+
+
+async def _route_metrics(request):
+    from starlette.responses import PlainTextResponse
+
+    if not _autorisee(request):
+        return PlainTextResponse("Not Found", status_code=404)
+    return PlainTextResponse(texte_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+async def _route_memoire(request):
+    from starlette.responses import JSONResponse, PlainTextResponse
+
+    if not _autorisee(request):
+        return PlainTextResponse("Not Found", status_code=404)
+    return JSONResponse(detail_memoire())
+
+
+# activer() remplace deux fonctions internes (non publiques) : Renderer._on_register
+# de Shiny et shinywidgets._comm.json_packer. Versions majeures sur lesquelles ces
+# points d'accroche ont été vérifiés ; ailleurs, leur forme est contrôlée avant tout
+# remplacement (_crochets_incompatibles()).
+VERSIONS_TESTEES = {"shiny": "1", "shinywidgets": "0"}
+
+
+def _parametres(fn) -> list[str] | None:
+    import inspect
+    try:
+        return list(inspect.signature(fn).parameters)
+    except (TypeError, ValueError):
+        return None
+
+
+def _crochets_incompatibles() -> str | None:
+    """
+    Raison pour laquelle activer() ne peut pas s'accrocher à cette version de
+    Shiny / shinywidgets (version non testée, fonction absente ou de signature
+    différente), ou None si tout est en place.
+    """
+    import inspect
+    from importlib import metadata
+
+    for paquet, majeure in VERSIONS_TESTEES.items():
+        try:
+            version = metadata.version(paquet)
+        except metadata.PackageNotFoundError:
+            continue
+        if version.split(".")[0] != majeure:
+            return f"{paquet} {version} non testé (attendu {majeure}.x)"
+
+    from shiny.render.renderer import Renderer
+    if _parametres(getattr(Renderer, "_on_register", None)) != ["self"]:
+        return "shiny : Renderer._on_register(self) absent ou modifié"
+    if not inspect.iscoroutinefunction(getattr(Renderer, "render", None)):
+        return "shiny : Renderer.render n'est plus une coroutine"
+
+    try:
+        from shinywidgets import _comm
+    except ImportError:
+        return None
+    if _parametres(getattr(_comm, "json_packer", None)) != ["obj"]:
+        return "shinywidgets : _comm.json_packer(obj) absent ou modifié"
+    return None
+
+
+def activer(app) -> None:
+    """
+    Active les mesures pour toute l'application : mesurer() est appliqué à chaque
+    output enregistré, les routes /metrics sont ajoutées (si SIMPY_METRICS_JETON est
+    défini) et le journal périodique démarre.
+    Si les fonctions internes de Shiny à remplacer ne sont pas celles attendues,
+    les mesures restent désactivées (avertissement dans le journal).
+    """
+    global _ACTIF
+    if _ACTIF:
+        return
+    raison = _crochets_incompatibles()
+    if raison is not None:
+        logger.warning("Métriques désactivées : %s", raison)
+        return
+    _ACTIF = True
+
+    from shiny.render.renderer import Renderer
+    from starlette.routing import Route
+
+    # Chaque output passe par _on_register() quand il est déclaré dans une session
+    on_register = Renderer._on_register
+
+    def _on_register(self):
+        on_register(self)
+        mesurer(self)
+
+    Renderer._on_register = _on_register
+
+    # Messages des widgets (shinywidgets) : leur taille est attribuée au rendu
+    try:
+        from shinywidgets import _comm
+        _comm.json_packer = _packer_mesure(_comm.json_packer)
+    except ImportError:
+        pass
+
+    if PROFIL_MEMOIRE:
+        import tracemalloc
+        tracemalloc.start()
+
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=logging.INFO)
+    logger.setLevel(logging.INFO)
+
+    if JETON:
+        app.starlette_app.router.routes.insert(0, Route("/metrics", _route_metrics, methods=["GET"]))
+        app.starlette_app.router.routes.insert(0, Route("/metrics/memoire", _route_memoire, methods=["GET"]))
+    else:
+        logger.info("SIMPY_METRICS_JETON absent : /metrics non servi, métriques dans le journal seulement")
+
+    if METRICS_LOG_S > 0:
+        threading.Thread(target=_journal_periodique, name="metrics", daemon=True).start()
@@ -0,0 +1,149 @@
+# server/deploiement.py — lancement multi-workers avec données partagées
+#
+# uvicorn --workers N démarre N processus indépendants : sans précaution, chacun
+# relit les CSV/GeoJSON et reconstruit les cartes Folium dans son propre cache.
+#
+# Ce lanceur :
+#   1. construit une fois, dans le processus parent, toutes les données et
+#      variantes de cartes connues (fonctions prechauffer_* des modules) ;
+#   2. les écrit dans un dossier de bundle (server/_bundle.py) : tableaux en
+#      .npy partagés en mémoire entre workers, cartes HTML préconstruites ;
+#   3. vérifie que les bibliothèques front-end versionnées sont présentes
+#      (www/vendor/, cf. ui/vendor.py), puis prépare les fichiers statiques
+#      (empreintes, variantes compressées, cf. ui/_assets.py) ;
+#   4. vide son propre cache puis démarre les workers uvicorn avec
+#      SIMPY_BUNDLE_DIR, que cached() consulte avant tout chargement.
+#
+# Un worker supplémentaire ne coûte alors que ses propres objets Python
+# (sessions, textes, géométries) : les colonnes numériques restent communes.
+#
+# Exemple (depuis le dossier app/) :
+#   python -m server.deploiement --workers 4 --port 8000
+#   python -m server.deploiement --workers 4 --bundle /var/cache/sim-py --reconstruire
+#
+# Le bundle est reconstruit automatiquement quand il est périmé : code serveur,
+# bibliothèques ou fichiers de www/data modifiés depuis sa construction
+# (cf. server/_bundle.py, signature()).
+#
+# Pour construire le bundle sans lancer le serveur (ex. dans une image Docker) :
+#   python -m server.deploiement --construire-seulement --bundle /var/cache/sim-py
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+
+APP_DIR = Path(__file__).resolve().parents[1]
+
+
+def _etapes(app_dir: Path):
+    """Chargements et préconstructions exécutés par le parent (nom, fonction)."""
+    from server.energie import bilan, echanges, flapd, repartition
+    from server.energie.simulateurs import _shared
+    from server.donnees import frontieres, gestionnaire
+
+    return [
+        ("répartition",            lambda: repartition._get_data(app_dir)),
+        ("FLAP-D",                 lambda: flapd._get_prepared_gdf(app_dir)),
+        ("bilan — cartes",         lambda: bilan.prechauffer_fr_map(app_dir)),
+        ("bilan — graphiques",     lambda: bilan.prechauffer_area(app_dir)),
+        ("échanges — cartes",      lambda: echanges.prechauffer_map_elec(app_dir)),
+        ("simulateurs",            lambda: _shared.load_data(app_dir)),
+        ("frontières (.derives)",  lambda: frontieres.frontieres_hq(app_dir)),
+        ("gestionnaire",           lambda: gestionnaire._get_prepared(app_dir)),
+        ("gestionnaire — cartes",  lambda: gestionnaire.prechauffer_map(app_dir)),
+    ]
+
+
+def construire_bundle(dossier: Path, app_dir: Path = APP_DIR) -> None:
+    """Remplit le cache du processus puis l'écrit dans dossier."""
+    from server import _bundle
+    from server._common import _DATA_CACHE
+
+    for nom, etape in _etapes(app_dir):
+        t0 = time.perf_counter()
+        try:
+            etape()
+        except Exception as e:   # une donnée manquante ne doit pas empêcher le reste
+            print(f"  {nom:<22} ignoré : {e}")
+            continue
+        print(f"  {nom:<22} {time.perf_counter() - t0:6.2f} s")
+
+    ignorees = _bundle.ecrire(_DATA_CACHE, dossier, app_dir)
+    for key, raison in ignorees.items():
+        print(f"  non exporté : {key} ({raison}) — construit par chaque worker")
+    print(f"Bundle écrit dans {dossier} ({len(_DATA_CACHE) - len(ignorees)} entrées)")
+
+
+def enregistrer_dependances(app) -> None:
+    """
+    Déclare dans ce worker les dépendances web (JS/CSS) de toutes les pages.
+
+    Les pages sont rendues dynamiquement dans la session (render.ui), et Shiny
+    n'ouvre la route /lib/... d'une dépendance que dans le processus qui a rendu
+    la page. Avec plusieurs workers, le navigateur peut demander ce fichier à un
+    autre worker : on les déclare donc tous au démarrage.
+    Les pages rendues pour cela restent dans le cache de pages (ui/_common.py).
+    """
+    from htmltools import TagList
+    from ui._common import page_en_cache
+    from ui.donnees import donnees_ui
+    from ui.energie import energie_ui
+    from ui.home_ui import home_ui
+
+    pages = TagList(
+        page_en_cache("home", home_ui),
+        page_en_cache("energie", energie_ui),
+        page_en_cache("donnees", donnees_ui),
+    )
+    app._ensure_web_dependencies(pages.get_dependencies())
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Lance l'application sur plusieurs workers uvicorn.")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="nombre de workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--bundle", type=Path, default=APP_DIR / ".bundle", help="dossier du bundle")
+    parser.add_argument("--reconstruire", action="store_true", help="reconstruit le bundle même s'il est à jour")
+    parser.add_argument("--construire-seulement", action="store_true", help="construit le bundle sans lancer le serveur")
+    args = parser.parse_args(argv)
+
+    from server import _bundle
+    from ui import _assets, vendor
+
+    # Polices, icônes et Leaflet sont versionnés dans www/vendor/ : sans eux, la
+    # page et les cartes dépendraient de CDN (cf. ui/vendor.py) — on s'arrête.
+    try:
+        vendor.verifier()
+    except FileNotFoundError as e:
+        parser.error(str(e))
+
+    dossier = args.bundle.resolve()
+    raison = "demandé" if args.reconstruire or args.construire_seulement else _bundle.perime(dossier)
+    if raison is not None:
+        print(f"Construction du bundle ({dossier}, {raison})…")
+        construire_bundle(dossier)
+
+    # Empreintes et variantes gzip/brotli des fichiers statiques, écrites une
+    # fois avant que les workers ne démarrent (cf. ui/_assets.py). plotly.js est
+    # copié depuis le paquet installé (cf. ui/vendor.py).
+    vendor.copier_plotly()
+    print(f"Fichiers statiques : {_assets.preparer_tout()} prêts ({_assets.ASSETS_DIR})")
+    if args.construire_seulement:
+        return
+
+    # Le parent ne sert aucune requête : il libère ce qu'il a construit
+    from server._common import cache_clear
+    cache_clear()
+
+    import uvicorn
+    os.environ["SIMPY_BUNDLE_DIR"] = str(dossier)
+    os.chdir(APP_DIR)
+    uvicorn.run("app:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,27 @@
 #
 # Ce module délègue intégralement au gestionnaire,
 # qui analyse les sièges sociaux des opérateurs de data centers FLAP-D.
+# Les données (GeoJSON, frontières mondiales) sont préparées dans le pool
+# de rendu ; les outputs sont déclarés une fois ces données prêtes.
+#
+# Le gestionnaire est importé à la première ouverture du module (dans le pool
+# de rendu, comme les sous-modules Énergie) : ses imports ne pèsent pas sur
+# le démarrage de l'application.
+import importlib
 from pathlib import Path
-from . import gestionnaire
+
+from server._common import apres_chargement
+
+
+def _charger(app_dir: Path):
+    """Importe le gestionnaire et prépare ses données (exécuté dans le pool de rendu)."""
+    gestionnaire = importlib.import_module(".gestionnaire", __name__)
+    gestionnaire._get_prepared(app_dir)
+    return gestionnaire
 
 
 def server(input, output, session, app_dir: Path):
-    gestionnaire.server(input, output, session, app_dir)
+    apres_chargement(
+        lambda: _charger(app_dir),
+        lambda gestionnaire: gestionnaire.server(input, output, session, app_dir),
+    )
@@ -0,0 +1,224 @@
+# server/donnees/frontieres.py — frontières mondiales allégées pour la carte des sièges
+#
+# La carte des pays sièges (server/donnees/gestionnaire.py) colore les pays
+# d'où viennent les opérateurs d'un hub. Elle lisait pour cela
+# www/data/world-administrative-boundaries.geojson en pleine résolution :
+# plus de 250 pays, des polygones au mètre près, des centroïdes recalculés à
+# chaque démarrage à froid, et des contours bien plus fins que ce qu'une carte
+# affichée au zoom 3 ou 4 peut montrer, embarqués tels quels dans chaque carte.
+#
+# Ce fichier prépare une fois .derives/world_hq.geojson (dossier app/.derives/,
+# non versionné : fichiers dérivés de www/data, reproductibles) :
+#
+#   - seulement les pays qui apparaissent comme pays siège dans DC_FLAP_D.geojson
+#   - des contours simplifiés à un pixel près au zoom le plus fin utilisé
+#     (max(ZOOMS)), coordonnées arrondies
+#   - le point de départ des flux de chaque pays (hq_lon, hq_lat) : centroïde,
+#     sauf corrections manuelles (POINTS_MANUELS)
+#
+# Le fichier est régénéré automatiquement (frontieres_hq()) quand l'une de ses
+# sources ou l'un des paramètres ci-dessous (COUNTRY_FIX, POINTS_MANUELS, ZOOMS,
+# GRILLE_DEGRES, VERSION) a changé : leur signature est enregistrée à côté, dans
+# world_hq.json. server/deploiement.py le prépare avant de lancer les workers ;
+# sans déploiement, il l'est au premier chargement.
+#
+# Au chargement, par_zoom() en dérive une version par niveau de zoom, et chaque
+# carte de hub utilise celle qui correspond au zoom où elle s'affiche
+# (zoom_estime()).
+#
+# Usage (depuis le dossier app/) :
+#   python -m server.donnees.frontieres      # (re)génère .derives/world_hq.geojson
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+import sys
+from pathlib import Path
+
+from server._common import lazy_import
+
+# Bibliothèques lourdes importées au premier usage (cf. server/_common.py)
+gpd     = lazy_import("geopandas")
+shapely = lazy_import("shapely")
+
+logger = logging.getLogger(__name__)
+
+
+SOURCE = "world-administrative-boundaries.geojson"
+SOURCE_DC = "DC_FLAP_D.geojson"
+DERIVES = ".derives"
+DERIVE = "world_hq.geojson"
+SIGNATURE = "world_hq.json"
+
+# Version de preparer() : à incrémenter quand le calcul change
+VERSION = 1
+
+# Harmonisation des noms de pays (orthographes différentes dans les sources)
+COUNTRY_FIX = {
+    "USA": "United States of America",
+    "UK":  "U.K. of Great Britain and Northern Ireland",
+}
+
+# Points de départ des flux corrigés à la main (lon, lat) : centroïde tombant dans la mer
+POINTS_MANUELS = {
+    "Norway": (10.75, 59.91),
+}
+
+# Niveaux de zoom auxquels s'affichent les cartes des hubs (fit_bounds sur les flux)
+ZOOMS = range(2, 7)
+
+# Précision des coordonnées conservées (degrés, ≈ 100 m)
+GRILLE_DEGRES = 1e-3
+
+# Taille approximative de la carte dans la page (pixels), pour estimer son zoom
+LARGEUR_CARTE, HAUTEUR_CARTE = 800, 500
+
+
+def tolerance(zoom: int) -> float:
+    """Taille d'un pixel (mètres, EPSG:3857, à l'équateur) au niveau de zoom donné."""
+    return 2 * math.pi * 6_378_137 / 256 / 2 ** zoom
+
+
+# =====================================================================
+# Préparation de world_hq.geojson
+# =====================================================================
+def pays_sieges(app_dir: Path) -> set[str]:
+    """Pays sièges cités dans DC_FLAP_D.geojson, aux noms du fichier des frontières."""
+    from server.energie.flapd import get_dc_flapd_raw
+
+    return set(get_dc_flapd_raw(app_dir)["country_hq"].replace(COUNTRY_FIX).dropna())
+
+
+def preparer(app_dir: Path):
+    """Frontières réduites aux pays sièges, simplifiées, avec leur point de départ des flux."""
+    source = Path(app_dir) / "www" / "data" / SOURCE
+    if not source.exists():
+        raise FileNotFoundError(f"Fichier manquant : {source}")
+
+    world = gpd.read_file(source).to_crs(3857)
+    world = world.loc[world["name"].isin(pays_sieges(app_dir)), ["name", "geometry"]].reset_index(drop=True)
+
+    # Point de départ des flux : centroïde calculé en projection métrique
+    centres = world.geometry.centroid.to_crs(4326)
+    world["hq_lon"] = centres.x.to_numpy()
+    world["hq_lat"] = centres.y.to_numpy()
+    for nom, (lon, lat) in POINTS_MANUELS.items():
+        world.loc[world["name"] == nom, ["hq_lon", "hq_lat"]] = [lon, lat]
+
+    world["geometry"] = world.geometry.simplify(tolerance(max(ZOOMS)), preserve_topology=True)
+    world = world.to_crs(4326)
+    return world.set_geometry(gpd.GeoSeries(
+        shapely.set_precision(world.geometry.to_numpy(), GRILLE_DEGRES), index=world.index, crs=4326,
+    ))
+
+
+def signature(app_dir: Path) -> dict:
+    """Paramètres de preparer() et empreinte du contenu de ses sources."""
+    data_dir = Path(app_dir) / "www" / "data"
+    sources = {}
+    for nom in (SOURCE, SOURCE_DC):
+        chemin = data_dir / nom
+        sources[nom] = hashlib.sha256(chemin.read_bytes()).hexdigest()[:16] if chemin.exists() else None
+    return {
+        "version":        VERSION,
+        "country_fix":    COUNTRY_FIX,
+        "points_manuels": {nom: list(pt) for nom, pt in POINTS_MANUELS.items()},
+        "zooms":          list(ZOOMS),
+        "grille_degres":  GRILLE_DEGRES,
+        "sources":        sources,
+    }
+
+
+def _a_jour(dossier: Path, sig: dict) -> bool:
+    try:
+        enregistree = json.loads((dossier / SIGNATURE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    return enregistree == sig and (dossier / DERIVE).exists()
+
+
+def ecrire(world, dossier: Path, sig: dict) -> None:
+    """Écrit world et sa signature dans dossier (écriture atomique, sans fichier temporaire laissé)."""
+    dossier.mkdir(parents=True, exist_ok=True)
+    # Plusieurs workers peuvent préparer le fichier en même temps : nom propre au processus
+    tmp = dossier / f"{Path(DERIVE).stem}.{os.getpid()}.tmp.geojson"
+    try:
+        world.to_file(tmp, driver="GeoJSON")
+        os.replace(tmp, dossier / DERIVE)
+        # Signature écrite en dernier : un fichier sans signature à jour est régénéré
+        (dossier / SIGNATURE).write_text(json.dumps(sig, ensure_ascii=False), encoding="utf-8")
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def frontieres_hq(app_dir: Path):
+    """
+    Contenu de .derives/world_hq.geojson, régénéré si ses sources ou les
+    paramètres de preparer() ont changé. Colonnes : name, hq_lon, hq_lat,
+    geometry (EPSG:4326).
+    """
+    dossier = Path(app_dir) / DERIVES
+    sig = signature(app_dir)
+    if _a_jour(dossier, sig):
+        return gpd.read_file(dossier / DERIVE)
+
+    world = preparer(app_dir)
+    try:
+        ecrire(world, dossier, sig)
+    except Exception as e:   # dossier en lecture seule… : la version en mémoire suffit
+        logger.warning("%s non écrit : %s", dossier / DERIVE, e)
+    return world
+
+
+# =====================================================================
+# Utilisation par les cartes
+# =====================================================================
+def par_zoom(world) -> dict:
+    """Une version de world par niveau de ZOOMS, contours simplifiés à un pixel près."""
+    merc = world.to_crs(3857)
+    versions = {}
+    for zoom in ZOOMS:
+        geom = merc.geometry.simplify(tolerance(zoom), preserve_topology=True).to_crs(4326)
+        geom = gpd.GeoSeries(shapely.set_precision(geom.to_numpy(), GRILLE_DEGRES), index=world.index, crs=4326)
+        versions[zoom] = world.set_geometry(geom)
+    return versions
+
+
+def zoom_estime(bornes: list[list[float]]) -> int:
+    """
+    Zoom auquel Leaflet affichera fit_bounds(bornes) ([[lat_min, lon_min],
+    [lat_max, lon_max]]) sur une carte de LARGEUR_CARTE × HAUTEUR_CARTE pixels,
+    ramené à ZOOMS.
+    """
+    (lat0, lon0), (lat1, lon1) = bornes
+
+    def y(lat: float) -> float:   # ordonnée Mercator (radians)
+        lat = max(min(lat, 85.0), -85.0)
+        return math.log(math.tan(math.pi / 4 + math.radians(lat) / 2))
+
+    largeur = max(abs(lon1 - lon0) / 360.0, 1e-9)
+    hauteur = max(abs(y(lat1) - y(lat0)) / (2 * math.pi), 1e-9)
+    zoom = math.floor(min(math.log2(LARGEUR_CARTE / 256 / largeur), math.log2(HAUTEUR_CARTE / 256 / hauteur)))
+    return min(max(zoom, min(ZOOMS)), max(ZOOMS))
+
+
+def main(argv: list[str] | None = None) -> int:
+    app_dir = Path(__file__).resolve().parents[2]
+    dossier = app_dir / DERIVES
+    try:
+        world = preparer(app_dir)
+    except FileNotFoundError as e:
+        print(e)
+        return 1
+    ecrire(world, dossier, signature(app_dir))
+    avant = (app_dir / "www" / "data" / SOURCE).stat().st_size / 1e6
+    apres = (dossier / DERIVE).stat().st_size / 1e6
+    print(f"{DERIVE} : {len(world)} pays sièges, {avant:.1f} Mo → {apres:.2f} Mo")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
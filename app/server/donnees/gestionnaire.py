@@ -19,23 +19,33 @@
 #   sur un marqueur de la carte Folium. Dans ce dernier cas, la carte envoie un
 #   message JavaScript (postMessage) que Shiny intercepte via input.hub_click.
 #
-# Folium génère le HTML de la carte ; Plotly génère le treemap.
-# Les données viennent de www/data/DC_FLAP_D.geojson et
-# www/data/world-administrative-boundaries.geojson.
+# Folium génère le HTML de la carte ; le treemap est un widget Plotly rendu une
+# fois, puis mis à jour par patch au changement de hub (données précalculées par
+# hub dans _load_prepared).
+# Les données viennent de www/data/DC_FLAP_D.geojson et de
+# www/data/world-administrative-boundaries.geojson, allégé en
+# .derives/world_hq.geojson (cf. server/donnees/frontieres.py).
 from __future__ import annotations
 
+import json
 from shiny import reactive, render, ui
-import geopandas as gpd
+import numpy as np
 import pandas as pd
-from shapely.geometry import LineString
-import folium
-from branca.colormap import linear
-import plotly.express as px
 from pathlib import Path
 
-from server._common import cached, is_dark
+import shinywidgets as sw
+
+from server._common import cached, is_dark, lazy_import, tache_de_rendu, carte_html, valeur_initiale
+from server._figures import echelle, figure, tableau, widget
+from server.donnees import frontieres
 from server.energie.flapd import get_dc_flapd_raw
 
+# Bibliothèques lourdes importées au premier rendu (cf. server/_common.py)
+gpd     = lazy_import("geopandas")
+shapely = lazy_import("shapely")
+folium  = lazy_import("folium")
+branca  = lazy_import("branca")
+
 
 # =====================================================================
 # Chargement et préparation (une seule fois, mis en cache)
@@ -45,17 +55,16 @@ def _load_prepared(app_dir: Path) -> dict:
     Charge les deux GeoJSON et calcule :
     - la part de chaque pays dans chaque hub (hq_by_hub)
     - les statistiques par entreprise (entreprise_stats)
-    - les flux géographiques pays_siège → hub (flows_gdf)
+    - les flux géographiques pays_siège → hub (flows_gdf), avec par hub leurs
+      points de départ (flow_starts) et leur emprise (flow_bounds)
     - les centroïdes des hubs pour positionner les marqueurs (HUB_VIEWS)
+    - les frontières des pays sièges, simplifiées pour chaque niveau de zoom
+      (world_par_zoom), et le zoom de la carte de chaque hub (hub_zoom),
+      cf. server/donnees/frontieres.py
     """
-    data_dir  = app_dir / "www" / "data"
-    PATH_WORLD = data_dir / "world-administrative-boundaries.geojson"
-
-    if not PATH_WORLD.exists():
-        raise FileNotFoundError(f"Fichier manquant : {PATH_WORLD}")
-
     dc_flapd = get_dc_flapd_raw(app_dir).copy()
-    world    = gpd.read_file(PATH_WORLD).to_crs("EPSG:4326")
+    # Frontières réduites aux pays sièges, simplifiées, points de départ précalculés
+    world    = frontieres.frontieres_hq(app_dir)
 
     # Score de complétude des données (0–100) : surface, capacité, PUE
     cols_score = ["area_m2", "capacity_e", "PUE"]
@@ -63,11 +72,7 @@ def _load_prepared(app_dir: Path) -> dict:
     dc_flapd["share_info"] = (present / len(cols_score)) * 100
 
     # Harmonisation des noms de pays (orthographes différentes dans les sources)
-    COUNTRY_FIX = {
-        "USA": "United States of America",
-        "UK":  "U.K. of Great Britain and Northern Ireland",
-    }
-    dc_flapd["country_hq"] = dc_flapd["country_hq"].replace(COUNTRY_FIX)
+    dc_flapd["country_hq"] = dc_flapd["country_hq"].replace(frontieres.COUNTRY_FIX)
 
     # Agrégat : pour chaque couple (hub, pays_siège), nombre de DC et % du hub
     hq_by_hub = (
@@ -96,42 +101,40 @@ def _load_prepared(app_dir: Path) -> dict:
     hubs_geom = dc_flapd[["city_hub", "geometry"]].dissolve(by="city_hub", as_index=False)
     hubs_geom["hub_centroid"] = hubs_geom.geometry.to_crs(3857).centroid.to_crs(4326)
 
-    world_centroids             = world.copy()
-    world_centroids["country_hq"]  = world_centroids["name"]
-    world_centroids["hq_centroid"] = world_centroids.geometry.to_crs(3857).centroid.to_crs(4326)
-
-    # Correction manuelle de la Norvège (centroïde naturel tombant dans la mer)
-    mask = world_centroids["country_hq"] == "Norway"
-    if mask.any():
-        world_centroids.loc[mask, "hq_centroid"] = gpd.points_from_xy(
-            [10.75], [59.91], crs="EPSG:4326"
-        )
+    # Lignes de flux : chaque ligne relie le centroïde du pays_siège au centroïde du hub.
+    # Jointures sur index (pays, hub) puis construction de toutes les lignes d'un coup
+    # (shapely.linestrings) : pas de filtre de world / hubs_geom par couple.
+    hq_pts  = world.drop_duplicates("name").set_index("name")
+    hub_pts = gpd.GeoSeries(hubs_geom.set_index("city_hub")["hub_centroid"])
+    flows = (
+        hq_by_hub[["city_hub", "country_hq", "n_dc"]]
+        .join(pd.DataFrame({"hq_x": hq_pts["hq_lon"], "hq_y": hq_pts["hq_lat"]}), on="country_hq", how="inner")
+        .join(pd.DataFrame({"hub_x": hub_pts.x, "hub_y": hub_pts.y}), on="city_hub", how="inner")
+        .reset_index(drop=True)
+    )
+    coords = np.stack([flows[["hq_x", "hq_y"]].to_numpy(), flows[["hub_x", "hub_y"]].to_numpy()], axis=1)
+    flows_gdf = gpd.GeoDataFrame(
+        flows[["city_hub", "country_hq", "n_dc"]],
+        geometry=shapely.linestrings(coords.reshape(-1, 2, 2)),
+        crs="EPSG:4326",
+    )
 
-    # Lignes de flux : chaque ligne relie le centroïde du pays_siège au centroïde du hub
-    flows_records = []
-    for _, row in hq_by_hub.iterrows():
-        city    = row["city_hub"]
-        country = row["country_hq"]
-        hq_row  = world_centroids[world_centroids["country_hq"] == country]
-        hub_row = hubs_geom[hubs_geom["city_hub"] == city]
-        if hq_row.empty or hub_row.empty:
-            continue
-        hq_pt  = hq_row["hq_centroid"].iloc[0]
-        hub_pt = hub_row["hub_centroid"].iloc[0]
-        flows_records.append({
-            "city_hub":   city,
-            "country_hq": country,
-            "n_dc":       row["n_dc"],
-            "geometry":   LineString([(hq_pt.x, hq_pt.y), (hub_pt.x, hub_pt.y)]),
-        })
-    flows_gdf = gpd.GeoDataFrame(flows_records, crs="EPSG:4326")
+    # Par hub : points de départ des flux [lat, lon] et emprise des flux pour fit_bounds
+    par_hub = flows.groupby("city_hub", sort=False)
+    flow_starts = {hub: df[["hq_y", "hq_x"]].values.tolist() for hub, df in par_hub}
+    bornes = pd.DataFrame({
+        "lat_min": par_hub[["hq_y", "hub_y"]].min().min(axis=1),
+        "lon_min": par_hub[["hq_x", "hub_x"]].min().min(axis=1),
+        "lat_max": par_hub[["hq_y", "hub_y"]].max().max(axis=1),
+        "lon_max": par_hub[["hq_x", "hub_x"]].max().max(axis=1),
+    })
+    flow_bounds = {
+        r.Index: [[r.lat_min, r.lon_min], [r.lat_max, r.lon_max]] for r in bornes.itertuples()
+    }
 
     HUB_VIEWS = {
-        row["city_hub"]: {
-            "location": [row["hub_centroid"].y, row["hub_centroid"].x],
-            "zoom": 4,
-        }
-        for _, row in hubs_geom.iterrows()
+        hub: {"location": [float(pt.y), float(pt.x)], "zoom": 4}
+        for hub, pt in hub_pts.items()
     }
 
     return {
@@ -140,9 +143,13 @@ def _load_prepared(app_dir: Path) -> dict:
         "hq_by_hub":       hq_by_hub,
         "entreprise_stats": entreprise_stats,
         "hubs_geom":       hubs_geom,
-        "world_centroids": world_centroids,
+        "world_par_zoom":  frontieres.par_zoom(world),
+        "hub_zoom":        {hub: frontieres.zoom_estime(b) for hub, b in flow_bounds.items()},
         "flows_gdf":       flows_gdf,
+        "flow_starts":     flow_starts,
+        "flow_bounds":     flow_bounds,
         "HUB_VIEWS":       HUB_VIEWS,
+        "treemaps":        _build_treemaps(hq_by_hub),
     }
 
 
@@ -151,237 +158,323 @@ def _get_prepared(app_dir: Path) -> dict:
 
 
 # =====================================================================
-# Fonctions serveur Shiny
+# Treemap de la répartition par pays (widget Plotly, cf. server/_figures.py)
 # =====================================================================
-def server(input, output, session, app_dir: Path):
+def _build_treemaps(hq_by_hub: pd.DataFrame) -> dict:
+    """
+    Données du treemap de chaque hub : étiquettes « Pays (xx.x%) », parts (%)
+    et customdata (pays, nombre de DC). Les hubs sans part connue sont absents.
+    """
+    treemaps = {}
+    for hub, df in hq_by_hub[hq_by_hub["pct"].notna()].groupby("city_hub", sort=False):
+        pct = df["pct"].round(1)
+        treemaps[hub] = {
+            "labels":     (df["country_hq"] + " (" + pct.astype(str) + "%)").tolist(),
+            "values":     tableau(pct),
+            "customdata": df[["country_hq", "n_dc"]].values.tolist(),
+        }
+    return treemaps
+
+
+def _treemap_titre(treemaps: dict, hub: str | None) -> str:
+    if hub is None:
+        return "Cliquer sur un hub sur la carte pour afficher le treemap."
+    if hub not in treemaps:
+        return f"Aucune donnée exploitable pour le hub de {hub}."
+    return f"Répartition des entreprises (% par pays) — {hub}"
+
+
+def _treemap_valeurs(treemaps: dict, hub: str | None) -> dict:
+    """Propriétés de la trace qui changent d'un hub à l'autre (vides sans hub)."""
+    t = treemaps.get(hub) or {"labels": [], "values": tableau([]), "customdata": []}
+    return dict(
+        labels=t["labels"],
+        parents=[""] * len(t["labels"]),
+        values=t["values"],
+        customdata=t["customdata"],
+        marker=dict(colors=t["values"]),
+    )
+
+
+def _treemap_couleurs(dark: bool) -> dict:
+    font_color = "#F8FAFC" if dark else "#0B162C"
+    return dict(font=dict(color=font_color), title=dict(font=dict(color=font_color)))
+
+
+def _build_treemap(treemaps: dict, hub: str | None, dark: bool) -> dict:
+    """Treemap : une cellule par pays, proportionnelle à sa part (%) dans le hub."""
+    valeurs = _treemap_valeurs(treemaps, hub)
+    valeurs["marker"].update(colorscale=echelle("Blues"), showscale=False)
+    data = [dict(
+        type="treemap",
+        **valeurs,
+        branchvalues="total",
+        texttemplate="%{label}",
+        textfont=dict(size=14),
+        hovertemplate=(
+            "<b>%{customdata[0]}</b><br>"
+            "Part du hub : %{value:.1f}%<br>"
+            "Nombre de DC : %{customdata[1]}<extra></extra>"
+        ),
+    )]
+    couleurs = _treemap_couleurs(dark)
+    layout = dict(
+        height=420,
+        margin=dict(l=10, r=10, t=40, b=10),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font=dict(**couleurs["font"], family="Poppins, Arial, sans-serif"),
+        title=dict(text=_treemap_titre(treemaps, hub), **couleurs["title"]),
+    )
+    return figure(data, layout)
 
-    bundle          = _get_prepared(app_dir)
-    dc_flapd        = bundle["dc_flapd"]
-    world           = bundle["world"]
-    hq_by_hub       = bundle["hq_by_hub"]
-    entreprise_stats = bundle["entreprise_stats"]
-    hubs_geom       = bundle["hubs_geom"]
-    flows_gdf       = bundle["flows_gdf"]
-    HUB_VIEWS       = bundle["HUB_VIEWS"]
+
+# =====================================================================
+# Carte Folium des pays sièges
+# Vue globale et une vue par hub, dans les deux thèmes : chaque carte est
+# construite une fois par processus (ou d'avance, cf. prechauffer_map) puis
+# partagée entre sessions. Un clic sur un hub ne fait que lire la carte déjà construite.
+# =====================================================================
+def _build_map_html(d: dict, hub: str | None, dark: bool) -> str:
+    """
+    Deux modes :
+    - Vue globale (hub=None) : tous les marqueurs de hub, légende simple
+    - Vue hub (hub='Paris'…) : choroplèthe pays + flux + points départ
+    """
+    hubs_geom, hq_by_hub, flows_gdf = d["hubs_geom"], d["hq_by_hub"], d["flows_gdf"]
 
     # Gamme de couleur bleue pour le choroplèthe de parts (0–100 %)
-    COLORMAP = linear.Blues_09.scale(0, 100)
+    COLORMAP = branca.colormap.linear.Blues_09.scale(0, 100)
     COLORMAP.caption = "Part (%) des entreprises du hub"
 
-    # =========================================================
-    # Construction de la carte Folium
-    # =========================================================
-    def make_map(hub: str | None, dark: bool = False) -> ui.HTML:
+    hubs_lat = hubs_geom["hub_centroid"].y
+    hubs_lon = hubs_geom["hub_centroid"].x
+
+    tiles         = "cartodbdark_matter" if dark else "CartoDB positron"
+    legend_bg     = "rgba(20,20,20,0.85)"  if dark else "rgba(255,255,255,0.50)"
+    legend_border = "rgba(255,255,255,0.15)" if dark else "rgba(0,0,0,0.15)"
+    legend_text   = "#F8FAFC" if dark else "#0B162C"
+    country_border = "#CBD5E1" if dark else "#555"
+    hq_dot_color  = "#CBD5E1" if dark else "#666"
+
+    m = folium.Map(
+        location=[float(hubs_lat.mean()), float(hubs_lon.mean())],
+        zoom_start=3,
+        tiles=tiles,
+    )
+
+    def _bind_clicks(marqueurs: dict[str, str]) -> str:
         """
-        Deux modes :
-        - Vue globale (hub=None) : tous les marqueurs de hub, légende simple
-        - Vue hub (hub='Paris'…) : choroplèthe pays + flux + points départ
+        Injecte du JavaScript dans la carte pour qu'un clic sur un marqueur de hub
+        envoie un message postMessage au parent (la page Shiny) : un seul script
+        pour tous les marqueurs ({nom JS du marqueur: hub}).
+        Shiny intercepte ce message via input.hub_click.
         """
-        hubs_lat = hubs_geom["hub_centroid"].y
-        hubs_lon = hubs_geom["hub_centroid"].x
-
-        tiles         = "cartodbdark_matter" if dark else "CartoDB positron"
-        legend_bg     = "rgba(20,20,20,0.85)"  if dark else "rgba(255,255,255,0.50)"
-        legend_border = "rgba(255,255,255,0.15)" if dark else "rgba(0,0,0,0.15)"
-        legend_text   = "#F8FAFC" if dark else "#0B162C"
-        country_border = "#CBD5E1" if dark else "#555"
-        hq_dot_color  = "#CBD5E1" if dark else "#666"
-
-        m = folium.Map(
-            location=[float(hubs_lat.mean()), float(hubs_lon.mean())],
-            zoom_start=3,
-            tiles=tiles,
-        )
-
-        def _bind_click(marker_name: str, hub_name: str) -> str:
-            """
-            Injecte du JavaScript dans la carte pour qu'un clic sur un marqueur
-            envoie un message postMessage au parent (la page Shiny).
-            Shiny intercepte ce message via input.hub_click.
-            """
-            hub_name_js = hub_name.replace("\\", "\\\\").replace("'", "\\'")
-            return f"""
-            <script>
-            (function() {{
-                function bind() {{
-                    try {{
-                        var mk = {marker_name};
-                        if (!mk || !mk.on) {{
-                            setTimeout(bind, 50);
-                            return;
-                        }}
-                        mk.on('click', function() {{
-                            if (window.parent && window.parent.postMessage) {{
-                                window.parent.postMessage({{ type: 'hub_click', hub: '{hub_name_js}' }}, '*');
-                            }}
-                        }});
-                    }} catch(e) {{
+        cibles = json.dumps(marqueurs)
+        return f"""
+        <script>
+        (function() {{
+            var cibles = {cibles};
+            function bind() {{
+                for (var nom in cibles) {{
+                    var mk = window[nom];
+                    if (!mk || !mk.on) {{
                         setTimeout(bind, 50);
+                        return;
                     }}
                 }}
-                bind();
-            }})();
-            </script>
-            """
+                Object.keys(cibles).forEach(function(nom) {{
+                    window[nom].on('click', function() {{
+                        if (window.parent && window.parent.postMessage) {{
+                            window.parent.postMessage({{ type: 'hub_click', hub: cibles[nom] }}, '*');
+                        }}
+                    }});
+                }});
+            }}
+            bind();
+        }})();
+        </script>
+        """
 
-        def add_legend(map_obj: folium.Map, mode: str, hub_name: str | None = None):
-            """Injecte une légende HTML dans la carte selon le mode affiché."""
-            common_box = (
-                f"position: fixed; bottom: 18px; left: 18px; z-index: 9999;"
-                f"background: {legend_bg};"
-                f"border: 1px solid {legend_border};"
-                f"color: {legend_text};"
-                f"border-radius: 10px; padding: 10px 12px;"
-                f"box-shadow: 0 6px 18px rgba(0,0,0,0.18);"
-                f"font-size: 13px; line-height: 1.35;"
-            )
-            if mode == "global":
-                legend_html = f"""
-                <div style="{common_box}">
-                  <div style="font-weight:700; margin-bottom:6px;">Légende</div>
-                  <div style="display:flex;align-items:center;gap:8px;margin:4px 0;">
-                    <span style="width:10px;height:10px;border-radius:50%;
-                      display:inline-block;background:rgba(220,0,0,0.35);
-                      border:2px solid rgba(220,0,0,0.9);"></span>
-                    Hubs FLAP-D
-                  </div>
-                </div>
-                """
-            else:
-                hub_label = f" ({hub_name})" if hub_name else ""
-                legend_html = f"""
-                <div style="{common_box}">
-                  <div style="font-weight:700; margin-bottom:6px;">Légende</div>
-                  <div style="display:flex;align-items:center;gap:8px;margin:4px 0;">
-                    <span style="width:12px;height:12px;border-radius:50%;
-                      display:inline-block;background:rgba(220,0,0,0.95);
-                      border:2px solid rgba(220,0,0,1);"></span>
-                    Hub sélectionné{hub_label}
-                  </div>
-                  <div style="display:flex;align-items:center;gap:8px;margin:4px 0;">
-                    <span style="width:10px;height:10px;border-radius:50%;
-                      display:inline-block;background:rgba(220,0,0,0.35);
-                      border:2px solid rgba(220,0,0,0.9);"></span>
-                    Autres hubs
-                  </div>
-                  <div style="display:flex;align-items:center;gap:8px;margin:4px 0;">
-                    <span style="width:10px;height:10px;border-radius:50%;
-                      display:inline-block;background:rgba(102,102,102,0.9);
-                      border:2px solid rgba(102,102,102,1);"></span>
-                    Pays sièges
-                  </div>
-                </div>
-                """
-            map_obj.get_root().html.add_child(folium.Element(legend_html))
-
-        def add_hubs_on_top(map_obj: folium.Map, selected_hub: str | None):
+    def add_legend(map_obj: folium.Map, mode: str, hub_name: str | None = None):
+        """Injecte une légende HTML dans la carte selon le mode affiché."""
+        common_box = (
+            f"position: fixed; bottom: 18px; left: 18px; z-index: 9999;"
+            f"background: {legend_bg};"
+            f"border: 1px solid {legend_border};"
+            f"color: {legend_text};"
+            f"border-radius: 10px; padding: 10px 12px;"
+            f"box-shadow: 0 6px 18px rgba(0,0,0,0.18);"
+            f"font-size: 13px; line-height: 1.35;"
+        )
+        if mode == "global":
+            legend_html = f"""
+            <div style="{common_box}">
+              <div style="font-weight:700; margin-bottom:6px;">Légende</div>
+              <div style="display:flex;align-items:center;gap:8px;margin:4px 0;">
+                <span style="width:10px;height:10px;border-radius:50%;
+                  display:inline-block;background:rgba(220,0,0,0.35);
+                  border:2px solid rgba(220,0,0,0.9);"></span>
+                Hubs FLAP-D
+              </div>
+            </div>
             """
-            Ajoute les marqueurs de hub au-dessus de toutes les autres couches.
-            Le hub sélectionné est plus grand et plus opaque que les autres.
+        else:
+            hub_label = f" ({hub_name})" if hub_name else ""
+            legend_html = f"""
+            <div style="{common_box}">
+              <div style="font-weight:700; margin-bottom:6px;">Légende</div>
+              <div style="display:flex;align-items:center;gap:8px;margin:4px 0;">
+                <span style="width:12px;height:12px;border-radius:50%;
+                  display:inline-block;background:rgba(220,0,0,0.95);
+                  border:2px solid rgba(220,0,0,1);"></span>
+                Hub sélectionné{hub_label}
+              </div>
+              <div style="display:flex;align-items:center;gap:8px;margin:4px 0;">
+                <span style="width:10px;height:10px;border-radius:50%;
+                  display:inline-block;background:rgba(220,0,0,0.35);
+                  border:2px solid rgba(220,0,0,0.9);"></span>
+                Autres hubs
+              </div>
+              <div style="display:flex;align-items:center;gap:8px;margin:4px 0;">
+                <span style="width:10px;height:10px;border-radius:50%;
+                  display:inline-block;background:rgba(102,102,102,0.9);
+                  border:2px solid rgba(102,102,102,1);"></span>
+                Pays sièges
+              </div>
+            </div>
             """
-            for _, r in hubs_geom.iterrows():
-                hub_name    = r["city_hub"]
-                pt          = r["hub_centroid"]
-                is_selected = (selected_hub is not None and hub_name == selected_hub)
-                marker = folium.CircleMarker(
-                    location=[pt.y, pt.x],
-                    radius=11 if is_selected else 8,
-                    color="rgba(220,0,0,1)"   if is_selected else "rgba(220,0,0,0.9)",
-                    fill=True,
-                    fill_color="rgba(220,0,0,1)" if is_selected else "rgba(220,0,0,0.9)",
-                    fill_opacity=0.95 if is_selected else 0.35,
-                    opacity=1.0 if is_selected else 0.9,
-                    tooltip=f"Hub : {hub_name} (cliquer)",
-                )
-                marker.add_to(map_obj)
-                # Script de clic injecté après l'ajout du marqueur
-                map_obj.get_root().html.add_child(
-                    folium.Element(_bind_click(marker.get_name(), hub_name))
-                )
-
-        # Vue globale — tous les hubs, sans sélection
-        if hub is None or hub == "":
-            min_lat, max_lat = float(hubs_lat.min()), float(hubs_lat.max())
-            min_lon, max_lon = float(hubs_lon.min()), float(hubs_lon.max())
-            m.fit_bounds([[min_lat, min_lon], [max_lat, max_lon]])
+        map_obj.get_root().html.add_child(folium.Element(legend_html))
 
-            add_hubs_on_top(m, selected_hub=None)
-            add_legend(m, mode="global")
-
-            html = m._repr_html_().replace(
-                "width:100.0%;height:100.0%;",
-                "width:100%;height:100%;"
+    def add_hubs_on_top(map_obj: folium.Map, selected_hub: str | None):
+        """
+        Ajoute les marqueurs de hub au-dessus de toutes les autres couches.
+        Le hub sélectionné est plus grand et plus opaque que les autres.
+        """
+        marqueurs = {}
+        for _, r in hubs_geom.iterrows():
+            hub_name    = r["city_hub"]
+            pt          = r["hub_centroid"]
+            is_selected = (selected_hub is not None and hub_name == selected_hub)
+            marker = folium.CircleMarker(
+                location=[pt.y, pt.x],
+                radius=11 if is_selected else 8,
+                color="rgba(220,0,0,1)"   if is_selected else "rgba(220,0,0,0.9)",
+                fill=True,
+                fill_color="rgba(220,0,0,1)" if is_selected else "rgba(220,0,0,0.9)",
+                fill_opacity=0.95 if is_selected else 0.35,
+                opacity=1.0 if is_selected else 0.9,
+                tooltip=f"Hub : {hub_name} (cliquer)",
             )
-            return ui.HTML(html)
-
-        # Vue hub sélectionné — choroplèthe + flux
-        data_hq    = hq_by_hub[hq_by_hub["city_hub"] == hub].copy()
-        data_flows = flows_gdf[flows_gdf["city_hub"] == hub].copy()
-
-        world_merged  = world.merge(data_hq, left_on="name", right_on="country_hq", how="left")
-        world_tooltip = world_merged[world_merged["pct"].notnull()]
-
-        def style(f):
-            pct = f["properties"].get("pct", None)
-            if pct is None:
-                return {"fillOpacity": 0, "color": country_border, "weight": 0.5}
-            return {
-                "fillColor":   COLORMAP(pct),
-                "fillOpacity": 0.85,
-                "color":       country_border,
-                "weight":      0.6,
-            }
-
-        # Couche choroplèthe des pays d'origine
-        folium.GeoJson(
-            world_tooltip,
-            style_function=style,
-            tooltip=folium.GeoJsonTooltip(
-                fields=["name", "pct", "n_dc"],
-                aliases=["Pays", "% du hub", "Nb DC"],
-                localize=True,
-            ),
-        ).add_to(m)
+            marker.add_to(map_obj)
+            marqueurs[marker.get_name()] = hub_name
+        # Script de clic injecté après l'ajout des marqueurs
+        map_obj.get_root().html.add_child(folium.Element(_bind_clicks(marqueurs)))
 
-        # Flux : lignes reliant chaque pays au hub, d'épaisseur proportionnelle au nombre de DC
-        flux_color = "#E2E8F0" if dark else "#333"
-        folium.GeoJson(
-            data_flows,
-            style_function=lambda f: {
-                "color":   flux_color,
-                "weight":  1 + (f["properties"]["n_dc"] ** 0.5),
-                "opacity": 0.7,
-            },
-        ).add_to(m)
+    # Vue globale — tous les hubs, sans sélection
+    if hub is None or hub == "":
+        min_lat, max_lat = float(hubs_lat.min()), float(hubs_lat.max())
+        min_lon, max_lon = float(hubs_lon.min()), float(hubs_lon.max())
+        m.fit_bounds([[min_lat, min_lon], [max_lat, max_lon]])
+
+        add_hubs_on_top(m, selected_hub=None)
+        add_legend(m, mode="global")
 
-        # Points de départ des flux (centroïde du pays d'origine)
-        for _, rr in data_flows.iterrows():
-            x, y = rr.geometry.coords[0]
-            folium.CircleMarker(
-                [y, x], radius=5,
-                color=hq_dot_color, fill=True, fill_color=hq_dot_color,
-                fill_opacity=0.9, opacity=1.0,
-            ).add_to(m)
-
-        COLORMAP.add_to(m)
-
-        # Recentrage sur les flux du hub sélectionné
-        if not data_flows.empty:
-            xs, ys = [], []
-            for _, rr in data_flows.iterrows():
-                (x0, y0), (x1, y1) = list(rr.geometry.coords)
-                xs.extend([x0, x1])
-                ys.extend([y0, y1])
-            m.fit_bounds([[min(ys), min(xs)], [max(ys), max(xs)]])
-
-        add_hubs_on_top(m, selected_hub=hub)
-        add_legend(m, mode="hub", hub_name=hub)
-
-        html = m._repr_html_().replace(
+        html = carte_html(m).replace(
             "width:100.0%;height:100.0%;",
             "width:100%;height:100%;"
         )
-        return ui.HTML(html)
+        return html
+
+    # Vue hub sélectionné — choroplèthe + flux
+    data_hq    = hq_by_hub[hq_by_hub["city_hub"] == hub].copy()
+    data_flows = flows_gdf[flows_gdf["city_hub"] == hub].copy()
+
+    # Contours simplifiés pour le zoom auquel la carte de ce hub s'affiche
+    world = d["world_par_zoom"][d["hub_zoom"].get(hub, max(frontieres.ZOOMS))]
+    world_merged  = world.merge(data_hq, left_on="name", right_on="country_hq", how="left")
+    world_tooltip = world_merged[world_merged["pct"].notnull()]
+
+    def style(f):
+        pct = f["properties"].get("pct", None)
+        if pct is None:
+            return {"fillOpacity": 0, "color": country_border, "weight": 0.5}
+        return {
+            "fillColor":   COLORMAP(pct),
+            "fillOpacity": 0.85,
+            "color":       country_border,
+            "weight":      0.6,
+        }
+
+    # Couche choroplèthe des pays d'origine
+    folium.GeoJson(
+        world_tooltip,
+        style_function=style,
+        tooltip=folium.GeoJsonTooltip(
+            fields=["name", "pct", "n_dc"],
+            aliases=["Pays", "% du hub", "Nb DC"],
+            localize=True,
+        ),
+    ).add_to(m)
+
+    # Flux : lignes reliant chaque pays au hub, d'épaisseur proportionnelle au nombre de DC
+    flux_color = "#E2E8F0" if dark else "#333"
+    folium.GeoJson(
+        data_flows,
+        style_function=lambda f: {
+            "color":   flux_color,
+            "weight":  1 + (f["properties"]["n_dc"] ** 0.5),
+            "opacity": 0.7,
+        },
+    ).add_to(m)
+
+    # Points de départ des flux (centroïde du pays d'origine)
+    for lat_lon in d["flow_starts"].get(hub, []):
+        folium.CircleMarker(
+            lat_lon, radius=5,
+            color=hq_dot_color, fill=True, fill_color=hq_dot_color,
+            fill_opacity=0.9, opacity=1.0,
+        ).add_to(m)
+
+    COLORMAP.add_to(m)
+
+    # Recentrage sur les flux du hub sélectionné (emprise précalculée)
+    if hub in d["flow_bounds"]:
+        m.fit_bounds(d["flow_bounds"][hub])
+
+    add_hubs_on_top(m, selected_hub=hub)
+    add_legend(m, mode="hub", hub_name=hub)
+
+    html = carte_html(m).replace(
+        "width:100.0%;height:100.0%;",
+        "width:100%;height:100%;"
+    )
+    return html
+
+
+def _get_map_html(app_dir: Path, hub: str | None, dark: bool) -> str:
+    """Cache des cartes Folium par (hub, thème) — construites à la demande."""
+    key = f"gestionnaire::map::{Path(app_dir).resolve()}::{hub or ''}::{int(dark)}"
+    return cached(key, lambda: _build_map_html(_get_prepared(app_dir), hub or None, dark))
+
+
+def prechauffer_map(app_dir: Path) -> None:
+    """Construit d'avance la vue globale et la vue de chaque hub, dans les deux thèmes."""
+    for hub in [None, *_get_prepared(app_dir)["hubs_geom"]["city_hub"]]:
+        for dark in (False, True):
+            _get_map_html(app_dir, hub, dark)
+
+
+# =====================================================================
+# Fonctions serveur Shiny
+# =====================================================================
+def server(input, output, session, app_dir: Path):
+
+    bundle          = _get_prepared(app_dir)
+    hq_by_hub       = bundle["hq_by_hub"]
+    entreprise_stats = bundle["entreprise_stats"]
+    treemaps        = bundle["treemaps"]
+    hubs_connus     = set(bundle["HUB_VIEWS"])
 
     # =========================================================
     # Tableau Top 5 des entreprises d'un hub
@@ -404,57 +497,6 @@ def server(input, output, session, app_dir: Path):
         })
         return df[["Entreprise", "Pays du siège", "Nombre de DC", "Score moyen share_info (%)"]]
 
-    # =========================================================
-    # Treemap Plotly de la répartition par pays
-    # =========================================================
-    def make_treemap(hub: str, dark: bool = False) -> ui.HTML:
-        """
-        Génère un treemap Plotly (rendu en HTML) montrant la part de chaque pays
-        dans le hub sélectionné. Chaque cellule est proportionnelle au % du hub.
-        """
-        df = hq_by_hub[hq_by_hub["city_hub"] == hub].copy()
-        if df.empty:
-            return ui.HTML("<p>Aucune donnée pour ce hub.</p>")
-        df = df[df["pct"].notna()].copy()
-        if df.empty:
-            return ui.HTML("<p>Aucune donnée exploitable pour ce hub.</p>")
-
-        df["pct"]           = df["pct"].round(1)
-        df["label_country"] = df["country_hq"] + " (" + df["pct"].astype(str) + "%)"
-
-        font_color = "#F8FAFC" if dark else "#0B162C"
-
-        fig = px.treemap(
-            df,
-            path=["label_country"],
-            values="pct",
-            color="pct",
-            color_continuous_scale="Blues",
-            title=f"Répartition des entreprises (% par pays) — {hub}",
-        )
-        fig.update_traces(
-            texttemplate="%{label}",
-            textfont_size=14,
-            hovertemplate=(
-                "<b>%{customdata[0]}</b><br>"
-                "Part du hub : %{value:.1f}%<br>"
-                "Nombre de DC : %{customdata[1]}<extra></extra>"
-            ),
-            customdata=df[["country_hq", "n_dc"]].to_numpy(),
-        )
-        fig.update_layout(
-            margin=dict(l=10, r=10, t=40, b=10),
-            coloraxis_showscale=False,
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            font=dict(color=font_color, family="Poppins, Arial, sans-serif"),
-            title_font=dict(color=font_color),
-        )
-        # Plotly est ici rendu en HTML complet (hors widget Shiny) car le treemap
-        # doit être imbriqué dans un output_ui Shiny, pas dans un output_widget.
-        html = fig.to_html(full_html=False, include_plotlyjs="cdn")
-        return ui.HTML(html)
-
     # =========================================================
     # Module serveur principal (enregistrement des outputs)
     # =========================================================
@@ -464,12 +506,14 @@ def server(input, output, session, app_dir: Path):
         selected_hub = reactive.Value(None)
 
         # Clic sur un marqueur de la carte Folium → mise à jour du hub
-        # (un deuxième clic sur le même hub désélectionne)
+        # (un deuxième clic sur le même hub désélectionne). La valeur vient du
+        # navigateur : un nom de hub inconnu est ignoré (il servirait sinon de
+        # clé au cache des cartes, partagé par tout le processus).
         @reactive.effect
         @reactive.event(input.hub_click)
         def _hub_click():
             clicked = input.hub_click()
-            if clicked is None or clicked == "":
+            if not isinstance(clicked, str) or clicked not in hubs_connus:
                 return
             current = selected_hub()
             if current == clicked:
@@ -533,10 +577,15 @@ def server(input, output, session, app_dir: Path):
 
         output.titre_carte_hq = titre_carte_hq
 
-        # Carte Folium — se redessine à chaque changement de hub ou de thème
+        # Carte Folium — lue dans le cache par (hub, thème) ; une variante pas
+        # encore construite l'est dans le pool de rendu (cf. server/_common.py)
+        _carte = tache_de_rendu(
+            lambda: (app_dir, selected_hub(), is_dark(input)), _get_map_html, sortie="map_hq_flapd",
+        )
+
         @render.ui
         def map_hq_flapd():
-            return make_map(selected_hub(), dark=is_dark(input))
+            return ui.HTML(_carte())
 
         output.map_hq_flapd = map_hq_flapd
 
@@ -560,13 +609,27 @@ def server(input, output, session, app_dir: Path):
 
         output.top5_table = top5_table
 
-        # Treemap — affiché uniquement quand un hub est sélectionné
-        @render.ui
+        # Treemap — widget rendu une seule fois ; au changement de hub, seules les
+        # étiquettes, valeurs et le titre sont envoyés (données précalculées par hub)
+        @sw.render_widget
         def treemap_hq():
+            hub  = valeur_initiale(selected_hub)
+            dark = valeur_initiale(lambda: is_dark(input))
+            return widget(_build_treemap(treemaps, hub, dark))
+
+        @reactive.effect
+        @reactive.event(selected_hub, ignore_init=True)
+        def _patch_treemap_hub():
             hub = selected_hub()
-            if hub is None:
-                return ui.HTML("<p>Cliquer sur un hub sur la carte pour afficher le treemap.</p>")
-            return make_treemap(hub, dark=is_dark(input))
+            w = treemap_hq.widget
+            with w.batch_update():
+                w.data[0].update(_treemap_valeurs(treemaps, hub))
+                w.layout.title.text = _treemap_titre(treemaps, hub)
+
+        @reactive.effect
+        @reactive.event(lambda: is_dark(input), ignore_init=True)
+        def _patch_treemap_theme():
+            treemap_hq.widget.layout.update(_treemap_couleurs(is_dark(input)))
 
         output.treemap_hq = treemap_hq
 
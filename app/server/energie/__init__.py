@@ -1,31 +1,101 @@
 # server/energie/__init__.py — serveur du module Énergie
 #
-# Ce fichier initialise tous les sous-modules du module Énergie
-# quand l'utilisateur navigue pour la première fois vers cette section.
+# Ce fichier initialise les sous-modules du module Énergie, onglet par onglet :
+# le serveur d'un sous-module (et donc le chargement de ses données : GeoJSON,
+# cartes d'Europe, échanges RTE…) n'est enregistré que lorsque son onglet
+# devient visible pour la première fois.
 #
-# Les imports sont faits à l'intérieur de la fonction server() (et non
-# au niveau du module) pour éviter les imports circulaires : chaque
-# sous-module importe lui-même des choses de server._common, et si tout
-# était importé au niveau global, Python ne saurait plus dans quel ordre
-# charger les fichiers.
+#   onglet (input, valeur)                     sous-module
+#   ("tabs_repartition", "repartition")    →   repartition.server
+#   ("tabs_repartition", "flapd")          →   flapd.server
+#   ("tabs_bilan",       "bilan")          →   bilan.server
+#   ("tabs_bilan",       "echanges")       →   echanges.server
+#   ("sim_tabs",         "predictif")      →   simulateurs.predictif.server
+#   ("sim_tabs",         "comparatif")     →   simulateurs.comparatif.server
 #
-# Chaque sous-module expose sa propre fonction server() qui enregistre
-# ses outputs Shiny auprès de l'objet "output" partagé par toute la session.
+# Les valeurs des onglets sont fixées dans ui/energie/ (paramètre value= de
+# ui.nav_panel) : elles ne dépendent donc pas des libellés affichés.
+# En attendant l'enregistrement, les graphiques et cartes de l'onglet affichent
+# un espace réservé (cf. www/styles.css, « Espaces réservés »).
+#
+# Les sous-modules sont importés à la demande (et non au niveau du module),
+# ce qui évite les imports circulaires et retarde les imports lourds
+# (GeoPandas, Folium…). L'import et la lecture des données se font dans le
+# pool de rendu (server/_common.py) pour ne pas bloquer les autres sessions ;
+# les outputs sont déclarés une fois les données prêtes.
+#
+# Mesure du coût : chaque enregistrement est chronométré et journalisé
+# (logger "server.energie", niveau INFO), par exemple :
+#   sous-module echanges : chargement 412.3 ms, enregistrement 3.1 ms (…)
+from __future__ import annotations
+
+import importlib
+import logging
+import time
 from pathlib import Path
 
+from shiny import reactive
+
+from server._common import apres_chargement
+
+
+logger = logging.getLogger(__name__)
+
+
+# Onglets → sous-modules :
+# (id du navset, valeur de l'onglet, sous-module, chargeur de données du sous-module ou None)
+SOUS_MODULES = [
+    ("tabs_repartition", "repartition", "repartition",           "_get_data"),
+    ("tabs_repartition", "flapd",       "flapd",                 "_get_prepared_gdf"),
+    ("tabs_bilan",       "bilan",       "bilan",                 "_get_data"),
+    ("tabs_bilan",       "echanges",    "echanges",              "_get_bundle"),
+    ("sim_tabs",         "predictif",   "simulateurs.predictif",  None),
+    ("sim_tabs",         "comparatif",  "simulateurs.comparatif", None),
+]
+
+
+def _charger(nom: str, chargeur: str | None, app_dir: Path):
+    """Importe le sous-module et remplit son cache de données (exécuté dans le pool de rendu)."""
+    module = importlib.import_module(f".{nom}", __name__)
+    if chargeur is not None:
+        getattr(module, chargeur)(app_dir)
+    return module
+
+
+def _onglet_actif(input, tabset: str) -> str | None:
+    """Valeur de l'onglet actif, ou None tant que le navigateur ne l'a pas envoyée."""
+    try:
+        return input[tabset]()
+    except Exception:
+        return None
+
 
 def server(input, output, session, app_dir: Path):
-    from . import repartition
-    from . import flapd
-    from . import bilan
-    from . import echanges
-    from . import simulateurs
-
-    # Chaque appel enregistre les outputs de ce sous-module.
-    # L'ordre n'a pas d'importance fonctionnelle : Shiny résout
-    # les dépendances entre outputs au moment de l'exécution.
-    repartition.server(input, output, session, app_dir)
-    flapd.server(input, output, session, app_dir)
-    bilan.server(input, output, session, app_dir)
-    echanges.server(input, output, session, app_dir)
-    simulateurs.server(input, output, session, app_dir)
+    t_session = time.perf_counter()
+
+    def _surveiller(tabset: str, valeur: str, nom: str, chargeur: str | None):
+        # Un effet par sous-module : il se détruit après le premier affichage de l'onglet.
+        @reactive.effect
+        def _lazy():
+            if _onglet_actif(input, tabset) != valeur:
+                return
+            t0 = time.perf_counter()
+
+            def _enregistrer(module):
+                t1 = time.perf_counter()
+                module.server(input, output, session, app_dir)
+                t2 = time.perf_counter()
+                logger.info(
+                    "sous-module %s : chargement %.1f ms, enregistrement %.1f ms "
+                    "(%.1f ms après l'ouverture du module)",
+                    nom, (t1 - t0) * 1000.0, (t2 - t1) * 1000.0, (t2 - t_session) * 1000.0,
+                )
+
+            # Imports et lecture des données dans le pool de rendu, puis
+            # déclaration des outputs sur la boucle Shiny (cf. server/_common.py)
+            with reactive.isolate():
+                apres_chargement(lambda: _charger(nom, chargeur, app_dir), _enregistrer)
+            _lazy.destroy()
+
+    for tabset, valeur, nom, chargeur in SOUS_MODULES:
+        _surveiller(tabset, valeur, nom, chargeur)
@@ -18,22 +18,24 @@
 # www/data/regions_simplified.geojson.
 from __future__ import annotations
 
-from shiny import render, ui
+from shiny import reactive, render, ui
 import shinywidgets as sw
 
-import copy
 import pandas as pd
-import geopandas as gpd
-import folium
 import plotly.graph_objects as go
 import json
 from pathlib import Path
-import branca
 
 from server._common import (
-    is_dark, cached, text_color, grid_color,
+    is_dark, cached, lazy_import, valeur_initiale, tache_de_rendu, carte_html, text_color, grid_color,
     FILIERE_CODES, FILIERE_LABEL, FILIERE_COLOR_BY_LABEL, FILIERE_LABELS_FR,
 )
+from server._figures import figure, tableau, widget
+
+# Bibliothèques lourdes importées au premier rendu (cf. server/_common.py)
+gpd    = lazy_import("geopandas")
+folium = lazy_import("folium")
+branca = lazy_import("branca")
 
 
 # Alias locaux pour raccourcir les noms dans ce module
@@ -164,7 +166,7 @@ def _build_balance_choropleth_html_from_base(
     ).add_to(m)
 
     cmap.add_to(m)
-    return m._repr_html_()
+    return carte_html(m)
 
 
 # =========================================================
@@ -245,19 +247,178 @@ def _get_map_html(app_dir: Path, year: int, dark: bool) -> str:
     return cached(key, _build)
 
 
+def prechauffer_fr_map(app_dir: Path) -> None:
+    """Construit d'avance les cartes de toutes les années, dans les deux thèmes."""
+    for year in _get_data(app_dir)["years"]:
+        for dark in (False, True):
+            _get_map_html(app_dir, int(year), dark)
+
+
+# =========================================================
+# Graphique en aires — figures de base partagées entre sessions
+# 15 zones (France + régions) × 2 thèmes : chaque figure est construite une fois
+# par processus, figée sous forme de dict Plotly, puis lue par toutes les sessions.
+# Le marqueur de l'année est superposé au moment de créer le widget.
+# =========================================================
+def _style_area(fig, dark: bool):
+    """Couleurs du graphique en aires (appliquées à la construction et par patch de thème)."""
+    font_color = text_color(dark)
+    gc         = grid_color(dark)
+    fig.update_layout(
+        xaxis=dict(
+            title=dict(font=dict(color=font_color)),
+            tickfont=dict(color=font_color),
+            gridcolor=gc, zerolinecolor=gc,
+        ),
+        yaxis=dict(
+            title=dict(font=dict(color=font_color)),
+            tickfont=dict(color=font_color),
+            gridcolor=gc, zerolinecolor=gc,
+        ),
+        legend=dict(font=dict(color=font_color)),
+        font=dict(color=font_color),
+    )
+    return fig
+
+
+def _build_area_base(d: dict, region: str, dark: bool) -> dict:
+    """
+    Figure de base du graphique en aires (sans marqueur d'année), sérialisée
+    en dict Plotly pour être partagée telle quelle entre toutes les sessions.
+    """
+    df_long = d["long_by_region"].get(region)
+    if df_long is None:
+        sub = d["ts"][d["ts"]["regions"] == region].copy().sort_values("year")
+        sub = sub[(sub["year"] >= 2014) & (sub["year"] <= 2024)]
+        df_long = sub.melt(
+            id_vars=["year", "conso"],
+            value_vars=list(FILIERES_MAP.keys()),
+            var_name="filiere",
+            value_name="production",
+        ).assign(filiere=lambda x: x["filiere"].map(FILIERES_MAP))
+
+    df_conso = d["ts"][d["ts"]["regions"] == region].copy()
+    df_conso = df_conso[(df_conso["year"] >= 2014) & (df_conso["year"] <= 2024)].sort_values("year")
+
+    fig = go.Figure()
+    # Une trace par filière, empilées (stackgroup="one")
+    for f in PIE_LABELS_FR:
+        dff = df_long[df_long["filiere"] == f]
+        fig.add_trace(
+            go.Scatter(
+                x=dff["year"],
+                y=dff["production"],
+                mode="none",
+                stackgroup="one",
+                fill="tonexty",
+                name=f,
+                fillcolor=PIE_COLOR_MAP[f],
+                hovertemplate=f"<b>{f}</b><br>Année: %{{x}}<br>Prod: %{{y:.1f}} TWh<extra></extra>",
+            )
+        )
+
+    # Ligne de consommation superposée aux aires de production
+    fig.add_trace(
+        go.Scatter(
+            x=df_conso["year"],
+            y=df_conso["conso"],
+            mode="lines",
+            name="Consommation",
+            line=dict(color="red", width=3, dash="dash"),
+            hovertemplate="<b>Consommation</b><br>Année: %{x}<br>%{y:.1f} TWh<extra></extra>",
+        )
+    )
+
+    fig.update_xaxes(rangeslider=dict(visible=False), range=[2014, 2024])
+    fig.update_layout(
+        autosize=True, height=250,
+        xaxis=dict(
+            title=dict(text="Année", font=dict(size=13)),
+            tickfont=dict(size=11),
+        ),
+        yaxis=dict(
+            title=dict(text="TWh", font=dict(size=13)),
+            tickfont=dict(size=11),
+        ),
+        legend=dict(
+            orientation="h", yanchor="bottom", y=1.02,
+            xanchor="left", x=0,
+            font=dict(size=11),
+        ),
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)",
+        margin=dict(l=36, r=16, t=8, b=8),
+        font=dict(family="Poppins, Arial, sans-serif"),
+    )
+    return _style_area(fig, dark).to_plotly_json()
+
+
+def _get_area_base(app_dir: Path, region: str, dark: bool) -> dict:
+    """Figure de base (région, thème), en lecture seule — ne jamais la modifier."""
+    key = f"bilan::area::{Path(app_dir).resolve()}::{region}::{int(dark)}"
+    return cached(key, lambda: _build_area_base(_get_data(app_dir), region, dark))
+
+
+def prechauffer_area(app_dir: Path) -> None:
+    """Construit d'avance toutes les figures de base (utile avant d'ouvrir l'application)."""
+    for region in ["France"] + _get_data(app_dir)["regions"]:
+        for dark in (False, True):
+            _get_area_base(app_dir, region, dark)
+
+
+def _build_prod_pie(values, dark: bool) -> dict:
+    """Camembert de la production par filière (dict Plotly brut, cf. server/_figures.py)."""
+    font_color = text_color(dark)
+    data = [dict(
+        type="pie",
+        labels=PIE_LABELS_FR,
+        values=tableau(values),
+        hole=0.15,
+        marker=dict(colors=[PIE_COLOR_MAP[l] for l in PIE_LABELS_FR]),
+        textinfo="percent+label",
+        textfont=dict(color=font_color),
+        hovertemplate="<b>%{label}</b><br>%{value:.1f} TWh<br>%{percent}<extra></extra>",
+    )]
+    layout = dict(
+        height=340,
+        font=dict(color=font_color, family="Poppins, Arial, sans-serif"),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        legend=dict(
+            orientation="h", y=-0.15, x=0.5, xanchor="center",
+            font=dict(color=font_color),
+        ),
+    )
+    return figure(data, layout)
+
+
+def _year_marker(year: int) -> dict:
+    """Trait vertical pointillé de l'année sélectionnée (équivalent de fig.add_vline)."""
+    return dict(
+        type="line", x0=year, x1=year, xref="x", y0=0, y1=1, yref="y domain",
+        line=dict(color="red", width=2, dash="dot"),
+    )
+
+
 # =========================================================
 # Fonctions serveur Shiny
 # =========================================================
 def server(input, output, session, app_dir: Path):
     d = _get_data(app_dir)
 
-    # Carte choroplèthe — se recalcule quand l'année ou le thème change
+    # Carte choroplèthe — se recalcule quand l'année ou le thème change.
+    # Construction Folium dans le pool de rendu (cf. server/_common.py) :
+    # une carte froide ne bloque pas les autres sessions.
+    _carte_fr = tache_de_rendu(
+        lambda: (app_dir, int(input.year()), is_dark(input)),
+        _get_map_html,
+        sortie="fr_map",
+    )
+
     @output
     @render.ui
     def fr_map():
-        year = int(input.year())
-        dark = is_dark(input)
-        return ui.HTML(_get_map_html(app_dir, year, dark))
+        return ui.HTML(_carte_fr())
 
     # Camembert de la production par filière
     @output
@@ -274,128 +435,40 @@ def server(input, output, session, app_dir: Path):
             row    = d["ts"][(d["ts"]["regions"] == region) & (d["ts"]["year"] == year)]
             values = [row.iloc[0][k] if not row.empty else 0 for k in PIE_FIELDS_TS]
 
-        font_color = text_color(dark)
-
-        fig = go.Figure(
-            data=[
-                go.Pie(
-                    labels=PIE_LABELS_FR,
-                    values=values,
-                    hole=0.15,
-                    marker=dict(colors=[PIE_COLOR_MAP[l] for l in PIE_LABELS_FR]),
-                    textinfo="percent+label",
-                    textfont=dict(color=font_color),
-                    hovertemplate="<b>%{label}</b><br>%{value:.1f} TWh<br>%{percent}<extra></extra>",
-                )
-            ]
-        )
-
-        fig.update_layout(
-            height=340,
-            font=dict(color=font_color, family="Poppins, Arial, sans-serif"),
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            legend=dict(
-                orientation="h", y=-0.15, x=0.5, xanchor="center",
-                font=dict(color=font_color),
-            ),
-        )
-        return fig
+        return widget(_build_prod_pie(values, dark))
 
     # Graphique en aires — évolution production + consommation 2014–2024
-    # La version de base est mise en cache par (région, thème) ;
-    # seul le marqueur de l'année sélectionnée est ajouté à chaque rendu.
-    _area_base_cache: dict[tuple[str, bool], go.Figure] = {}
-
-    def _build_area_base(region: str, dark: bool) -> go.Figure:
-        df_long = d["long_by_region"].get(region)
-        if df_long is None:
-            sub = d["ts"][d["ts"]["regions"] == region].copy().sort_values("year")
-            sub = sub[(sub["year"] >= 2014) & (sub["year"] <= 2024)]
-            df_long = sub.melt(
-                id_vars=["year", "conso"],
-                value_vars=list(FILIERES_MAP.keys()),
-                var_name="filiere",
-                value_name="production",
-            ).assign(filiere=lambda x: x["filiere"].map(FILIERES_MAP))
-
-        df_conso = d["ts"][d["ts"]["regions"] == region].copy()
-        df_conso = df_conso[(df_conso["year"] >= 2014) & (df_conso["year"] <= 2024)].sort_values("year")
-
-        font_color = text_color(dark)
-        gc         = grid_color(dark)
-
-        fig = go.Figure()
-        # Une trace par filière, empilées (stackgroup="one")
-        for f in PIE_LABELS_FR:
-            dff = df_long[df_long["filiere"] == f]
-            fig.add_trace(
-                go.Scatter(
-                    x=dff["year"],
-                    y=dff["production"],
-                    mode="none",
-                    stackgroup="one",
-                    fill="tonexty",
-                    name=f,
-                    fillcolor=PIE_COLOR_MAP[f],
-                    hovertemplate=f"<b>{f}</b><br>Année: %{{x}}<br>Prod: %{{y:.1f}} TWh<extra></extra>",
-                )
-            )
-
-        # Ligne de consommation superposée aux aires de production
-        fig.add_trace(
-            go.Scatter(
-                x=df_conso["year"],
-                y=df_conso["conso"],
-                mode="lines",
-                name="Consommation",
-                line=dict(color="red", width=3, dash="dash"),
-                hovertemplate="<b>Consommation</b><br>Année: %{x}<br>%{y:.1f} TWh<extra></extra>",
-            )
-        )
-
-        fig.update_xaxes(rangeslider=dict(visible=False), range=[2014, 2024])
-        fig.update_layout(
-            autosize=True, height=250,
-            xaxis=dict(
-                title=dict(text="Année", font=dict(size=13, color=font_color)),
-                tickfont=dict(size=11, color=font_color),
-                gridcolor=gc, zerolinecolor=gc,
-            ),
-            yaxis=dict(
-                title=dict(text="TWh", font=dict(size=13, color=font_color)),
-                tickfont=dict(size=11, color=font_color),
-                gridcolor=gc, zerolinecolor=gc,
-            ),
-            legend=dict(
-                orientation="h", yanchor="bottom", y=1.02,
-                xanchor="left", x=0,
-                font=dict(size=11, color=font_color),
-            ),
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            margin=dict(l=36, r=16, t=8, b=8),
-            font=dict(color=font_color, family="Poppins, Arial, sans-serif"),
-        )
-        return fig
-
+    # La base (région, thème) vient du cache partagé ; le widget n'est reconstruit
+    # qu'au changement de région. Le marqueur de l'année et le thème sont ensuite
+    # déplacés / recolorés par patch, sans renvoyer les traces.
     @output
     @sw.render_widget
     def area_chart():
         region   = _get_region(input)
+        year_sel = valeur_initiale(lambda: int(input.year()))
+        dark     = valeur_initiale(lambda: is_dark(input))
+
+        # Le widget copie la base partagée ; seule la liste des formes est propre à la session
+        base = _get_area_base(app_dir, region, dark)
+        return widget({
+            "data":   base["data"],
+            "layout": {**base["layout"], "shapes": [_year_marker(year_sel)]},
+        })
+
+    # Année → seul le marqueur vertical est déplacé
+    @reactive.effect
+    @reactive.event(input.year, ignore_init=True)
+    def _patch_area_annee():
         year_sel = int(input.year())
-        dark     = is_dark(input)
-
-        key  = (region, dark)
-        base = _area_base_cache.get(key)
-        if base is None:
-            base = _build_area_base(region, dark)
-            _area_base_cache[key] = base
-
-        # Copie profonde pour ne pas modifier la version en cache
-        fig = copy.deepcopy(base)
-        fig.add_vline(x=year_sel, line_width=2, line_dash="dot", line_color="red")
-        return fig
+        area_chart.widget.layout.shapes[0].update(x0=year_sel, x1=year_sel)
+
+    # Thème → seules les couleurs sont envoyées
+    @reactive.effect
+    @reactive.event(lambda: is_dark(input), ignore_init=True)
+    def _patch_area_theme():
+        w = area_chart.widget
+        with w.batch_update():
+            _style_area(w, is_dark(input))
 
     # Sélecteur de région — construit dynamiquement avec les régions disponibles dans les données
     @output
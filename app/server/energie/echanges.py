@@ -15,20 +15,23 @@
 #   - www/data/consommation_brute_2014_2024.csv      (conso OWID)
 from __future__ import annotations
 
+from dataclasses import dataclass
+
 from shiny import render, ui, reactive, req
 from shinywidgets import render_widget
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from plotly.colors import qualitative
 from pathlib import Path
 
-import folium
-from folium import CircleMarker
-
 from server._common import (
-    is_dark, plotly_theme, cached,
+    is_dark, plotly_theme, cached, lazy_import, carte_html,
     FILIERE_CODES, FILIERE_LABEL, FILIERE_COLOR,
 )
+from server._figures import figure, tableau, widget
+
+# Bibliothèques lourdes importées au premier rendu (cf. server/_common.py)
+folium = lazy_import("folium")
 
 
 # =========================================================
@@ -117,6 +120,63 @@ def _agg_period(df_sub: pd.DataFrame, how: str) -> pd.DataFrame:
     return piv
 
 
+# =========================================================
+# Cube du mix OWID : année × pays × filière
+# =========================================================
+@dataclass
+class CubeMix:
+    """
+    Mix et consommation OWID rangés une fois pour toutes dans des tableaux NumPy,
+    pour que la carte et le barplot lisent une tranche au lieu de refaire
+    filtre + pivot_table à chaque rendu.
+
+    Les pays sont triés par nom français (ordre des barres du barplot).
+    """
+    years:   np.ndarray   # (années,)
+    iso3:    list         # code ISO3 de chaque pays
+    noms:    list         # nom français de chaque pays (libellés du barplot)
+    twh:     np.ndarray   # (années × pays × filières) production en TWh, filières dans FILIERE_ORDER
+    pct:     np.ndarray   # idem en part du mix national (%), arrondie à 0,1
+    total:   np.ndarray   # (années × pays) production totale (TWh)
+    conso:   np.ndarray   # (années × pays) consommation brute (TWh), 0 si absente
+    present: np.ndarray   # (années × pays) le pays a-t-il des données de mix cette année ?
+
+    def annee(self, year: int) -> int:
+        """Index de l'année dans le cube."""
+        return int(np.searchsorted(self.years, year))
+
+    def pays(self, iso3: str) -> int | None:
+        """Index du pays dans le cube (None s'il n'apparaît pas dans les données)."""
+        return self.iso3.index(iso3) if iso3 in self.iso3 else None
+
+
+def _build_cube(mix: pd.DataFrame, conso: pd.DataFrame) -> CubeMix:
+    pays  = mix[["country_code", "country_fr"]].drop_duplicates("country_code").sort_values("country_fr")
+    iso3  = pays["country_code"].tolist()
+    years = np.sort(mix["year"].unique())
+
+    # Une seule pivot_table pour toutes les années, remise en forme (années, pays, filières)
+    index = pd.MultiIndex.from_product([years, iso3], names=["year", "country_code"])
+    pivot = mix.pivot_table(index=["year", "country_code"], columns="filiere", values="twh", aggfunc="sum")
+    present = index.isin(pivot.index).reshape(len(years), len(iso3))
+    pivot = pivot.reindex(index=index, columns=FILIERE_ORDER).fillna(0.0)
+    twh   = pivot.to_numpy(dtype=float).reshape(len(years), len(iso3), len(FILIERE_ORDER))
+
+    total = twh.sum(axis=2)
+    # Même convention que l'ancien calcul : un total nul est remplacé par 1
+    pct   = np.round(twh / np.where(total == 0, 1.0, total)[:, :, None] * 100, 1)
+
+    conso_arr = (
+        conso.groupby(["year", "country_code"])["twh"].sum()
+        .reindex(index).fillna(0.0)
+        .to_numpy(dtype=float).reshape(len(years), len(iso3))
+    )
+    return CubeMix(
+        years=years, iso3=iso3, noms=pays["country_fr"].tolist(),
+        twh=twh, pct=pct, total=total, conso=conso_arr, present=present,
+    )
+
+
 # =========================================================
 # Chargement global des trois fichiers de données
 # =========================================================
@@ -134,46 +194,38 @@ def _load_all(app_dir: Path) -> dict:
         "df_trade":  df_trade,
         "mix":       mix,
         "conso":     conso,
+        "cube":      _build_cube(mix, conso),
         "neighbors": sorted(df_trade["frontiere"].unique().tolist()),
     }
 
 
+def _get_bundle(app_dir: Path) -> dict:
+    """Données des échanges, chargées une fois par processus."""
+    return cached(f"echanges::{Path(app_dir).resolve()}", lambda: _load_all(app_dir))
+
+
 # =========================================================
 # Construction de la carte Folium du mix par pays
 # =========================================================
-def _build_map_elec_html(mix: pd.DataFrame, conso: pd.DataFrame, year: int, filiere: str, dark: bool) -> str:
+def _build_map_elec_html(cube: CubeMix, year: int, filiere: str, dark: bool) -> str:
     """
     Carte avec un cercle par pays. Le rayon reflète la production (ou la production
     de la filière sélectionnée), la couleur correspond à la filière.
     """
-    pivot = (
-        mix[mix["year"] == year]
-        .pivot_table(
-            index="country_code",
-            columns="filiere",
-            values="twh",
-            aggfunc="sum",
-        )
-        .reindex(columns=FILIERE_ORDER, fill_value=0.0)
-        .fillna(0.0)
-    )
-
-    conso_y = (
-        conso[conso["year"] == year]
-        .set_index("country_code")["twh"]
-        .to_dict()
-    )
+    a       = cube.annee(year)
+    twh_y   = cube.twh[a]
+    total_y = cube.total[a]
+    conso_y = cube.conso[a]
+    valeurs = total_y if filiere == "all" else twh_y[:, FILIERE_ORDER.index(filiere)]
+
+    # Pays à représenter (ordre de COUNTRIES) → index dans le cube
+    idx = {
+        iso3: i for iso3 in COUNTRIES
+        if (i := cube.pays(iso3)) is not None and cube.present[a, i]
+    }
 
     # Calcul de la valeur servant à déterminer le rayon de chaque cercle
-    bases = {}
-    for iso3 in COUNTRIES.keys():
-        if iso3 not in pivot.index:
-            continue
-        if filiere == "all":
-            base = float(pivot.loc[iso3, FILIERE_ORDER].sum())
-        else:
-            base = float(pivot.loc[iso3, filiere])
-        bases[iso3] = max(0.0, base)
+    bases = {iso3: max(0.0, float(valeurs[i])) for iso3, i in idx.items()}
 
     max_base = max(bases.values()) if bases else 1.0
 
@@ -192,18 +244,19 @@ def _build_map_elec_html(mix: pd.DataFrame, conso: pd.DataFrame, year: int, fili
     )
 
     for iso3, (name_fr, lat, lon) in COUNTRIES.items():
-        if iso3 not in pivot.index:
+        if iso3 not in idx:
             continue
 
-        total_prod  = float(pivot.loc[iso3, FILIERE_ORDER].sum())
-        total_conso = float(conso_y.get(iso3, 0.0))
+        i           = idx[iso3]
+        total_prod  = float(total_y[i])
+        total_conso = float(conso_y[i])
 
         if filiere == "all":
             prod_filiere  = total_prod
             color         = "#9C9CA1"
             filiere_label = "Toutes filières"
         else:
-            prod_filiere  = float(pivot.loc[iso3, filiere])
+            prod_filiere  = float(valeurs[i])
             color         = FILIERE_COLOR.get(filiere, "#777")
             filiere_label = FILIERE_LABEL.get(filiere, filiere)
 
@@ -223,7 +276,7 @@ def _build_map_elec_html(mix: pd.DataFrame, conso: pd.DataFrame, year: int, fili
             "<em>Note : la catégorie « Fossile » inclut ici le gaz naturel.</em>",
         ]
 
-        CircleMarker(
+        folium.CircleMarker(
             location=(lat, lon),
             radius=radius,
             color=color,
@@ -234,18 +287,177 @@ def _build_map_elec_html(mix: pd.DataFrame, conso: pd.DataFrame, year: int, fili
             tooltip="<br>".join(lines),
         ).add_to(m)
 
-    return f"<div class='map-wrap'>{m._repr_html_()}</div>"
+    return f"<div class='map-wrap'>{carte_html(m)}</div>"
+
+
+# Les 11 années × 7 choix de filière × 2 thèmes = 154 variantes de la carte.
+# Chaque variante est construite une fois par processus puis servie à toutes les sessions.
+def _get_map_elec_html(app_dir: Path, year: int, filiere: str, dark: bool) -> str:
+    """Carte du mix (HTML) mise en cache au niveau du processus."""
+    key = f"echanges::map::{Path(app_dir).resolve()}::{year}::{filiere}::{int(dark)}"
+    return cached(key, lambda: _build_map_elec_html(_get_bundle(app_dir)["cube"], year, filiere, dark))
+
+
+def prechauffer_map_elec(app_dir: Path) -> None:
+    """Construit d'avance toutes les variantes de la carte (utile avant d'ouvrir l'application)."""
+    for year in _get_bundle(app_dir)["cube"].years.tolist():
+        for filiere in FILIERE_CHOICES:
+            for dark in (False, True):
+                _get_map_elec_html(app_dir, year, filiere, dark)
+
+
+# =========================================================
+# Graphiques Plotly (dicts bruts, cf. server/_figures.py)
+# =========================================================
+
+# Couleurs imposées pour les frontières principales ; les autres suivent
+# la palette par défaut de Plotly, dans l'ordre d'apparition.
+COULEURS_FRONTIERES = {
+    "Suisse":              "#DC2626",
+    "Belgique/Allemagne":  "#000000",
+    "Italie":              "#1D4ED8",
+    "Espagne":             "#FACC15",
+    "Royaume-Uni":         "#7C3AED",
+}
+
+
+def _build_bar_exports(cube: CubeMix, year: int, as_pct: bool, dark: bool) -> dict:
+    """
+    Barplot du mix par pays, empilé par filière.
+    Deux modes : valeurs absolues (TWh) ou part du mix (%), lus dans la même
+    tranche annuelle du cube. En mode TWh, une ligne rouge de consommation
+    brute est superposée.
+    """
+    th = plotly_theme(dark)
+
+    a      = cube.annee(year)
+    lignes = np.flatnonzero(cube.present[a])
+    pays   = [cube.noms[i] for i in lignes]
+
+    if as_pct:
+        # Barres empilées en pourcentage du total national
+        data  = cube.pct[a, lignes]
+        ylab  = "Part du mix (%)"
+        hover = "%{x} — %{y:.1f}% (%{legendgroup})<extra></extra>"
+    else:
+        data  = np.round(cube.twh[a, lignes], 2)
+        ylab  = "TWh"
+        hover = "%{x} — %{y:.1f} TWh (%{legendgroup})<extra></extra>"
+
+    traces = [
+        dict(
+            type="bar", x=pays, y=tableau(data[:, j]),
+            name=FILIERE_LABEL[code], legendgroup=FILIERE_LABEL[code],
+            marker=dict(color=FILIERE_COLOR[code], line=dict(color=th["bar_outline"], width=1)),
+            hovertemplate=hover,
+        )
+        for j, code in enumerate(FILIERE_ORDER)
+    ]
+
+    if not as_pct:
+        # Ligne de consommation brute superposée pour comparer production vs conso
+        traces.append(dict(
+            type="scatter",
+            x=pays, y=tableau(cube.conso[a, lignes]),
+            mode="lines+markers",
+            name="Consommation brute (TWh)",
+            line=dict(color="#DC2626" if not dark else "#F97316", width=3),
+            marker=dict(size=7),
+            hovertemplate="Consommation: %{y:.1f} TWh<extra></extra>",
+        ))
+
+    layout = dict(
+        title=dict(text=f"Mix énergétique — {year}", x=0.5),
+        barmode="stack",
+        margin=dict(l=10, r=10, t=56, b=30),
+        plot_bgcolor=th["plot"], paper_bgcolor=th["paper"],
+        font=dict(family="Poppins, Arial, sans-serif", color=th["font"]),
+        legend=dict(
+            title=dict(text="Filière"), tracegroupgap=0,
+            bgcolor=th["legend_bg"], bordercolor=th["legend_border"], borderwidth=1,
+        ),
+        yaxis=dict(
+            title=dict(text=ylab, font=dict(color=th["font"])), gridcolor=th["grid"],
+            zeroline=True, zerolinecolor=th["zeroline"], zerolinewidth=1.6,
+            tickfont=dict(color=th["font"]),
+        ),
+        xaxis=dict(
+            title=dict(text="Pays", font=dict(color=th["font"])),
+            tickfont=dict(color=th["font"]),
+        ),
+    )
+    return figure(traces, layout)
+
+
+def _build_comp_plot(
+    df_trade: pd.DataFrame, start: str, end: str,
+    metric: str, how: str, roll: int, keep: list[str], dark: bool,
+) -> dict:
+    """Courbes des échanges France ↔ frontières sélectionnées (une trace par frontière)."""
+    th = plotly_theme(dark)
+
+    sub = _filter_period(df_trade, start, end)
+    agg = _agg_period(sub, how=how)
+
+    data = (
+        agg[agg["frontiere"].isin(keep)][["periode", "frontiere", metric]]
+        .sort_values(["frontiere", "periode"])
+    )
+    data["periode"] = pd.to_datetime(data["periode"]).astype("datetime64[ms]")
+
+    # Lissage glissant optionnel (réduit le bruit sur les données mensuelles)
+    data[metric] = data.groupby("frontiere")[metric].transform(
+        lambda s: s.rolling(roll, min_periods=1).mean()
+    )
+
+    palette  = qualitative.Plotly
+    couleurs = dict(COULEURS_FRONTIERES)
+    traces   = []
+    for frontiere, grp in data.groupby("frontiere", sort=False):
+        if frontiere not in couleurs:
+            couleurs[frontiere] = palette[len(couleurs) % len(palette)]
+        traces.append(dict(
+            type="scatter",
+            x=tableau(grp["periode"]), y=tableau(grp[metric]),
+            name=frontiere, legendgroup=frontiere,
+            mode="lines+markers",
+            line=dict(color=couleurs[frontiere], width=2.3),
+            marker=dict(color=couleurs[frontiere], size=6),
+            hovertemplate="%{x|%Y-%m-%d} — %{y:.1f} TWh (%{legendgroup})<extra></extra>",
+        ))
+
+    title_cible = ", ".join(keep) if len(keep) <= 6 else f"{len(keep)} pays"
+    layout = dict(
+        title=dict(text=f"{metric} — comparaison ({title_cible})", x=0.5),
+        margin=dict(l=10, r=16, t=54, b=20),
+        plot_bgcolor=th["plot"], paper_bgcolor=th["paper"],
+        font=dict(color=th["font"], family="Poppins, Arial, sans-serif"),
+        legend=dict(
+            title=dict(text="frontiere"), tracegroupgap=0,
+            bgcolor=th["legend_bg"], bordercolor=th["legend_border"], borderwidth=1,
+        ),
+        yaxis=dict(
+            title=dict(text=f"{metric} (TWh)", font=dict(color=th["font"])), gridcolor=th["grid"],
+            zeroline=True, zerolinewidth=2.5, zerolinecolor=th["zeroline"],
+            tickfont=dict(color=th["font"]),
+        ),
+        xaxis=dict(
+            type="date",
+            tickformat="%Y-%m" if how == "Mensuel" else "%Y",
+            tickfont=dict(color=th["font"]),
+            title=dict(text="Période", font=dict(color=th["font"])),
+        ),
+    )
+    return figure(traces, layout)
 
 
 # =========================================================
 # Fonctions serveur Shiny
 # =========================================================
 def server(input, output, session, app_dir: Path):
-    key    = f"echanges::{Path(app_dir).resolve()}"
-    bundle = cached(key, lambda: _load_all(app_dir))
+    bundle = _get_bundle(app_dir)
     df_trade  = bundle["df_trade"]
-    mix       = bundle["mix"]
-    conso     = bundle["conso"]
+    cube      = bundle["cube"]
     neighbors = bundle["neighbors"]
 
     # --- Valeurs réactives calculées ---
@@ -270,23 +482,12 @@ def server(input, output, session, app_dir: Path):
         return bool(input.ech_plot_mode())
 
     # --- Carte du mix (OWID) ---
-    # Cache par (année, filière, thème) pour éviter de reconstruire la carte Folium
-    # à chaque interaction non pertinente.
-    _map_elec_cache: dict[tuple[int, str, bool], str] = {}
-
+    # Une carte Folium par (année, filière, thème), partagée entre toutes les sessions
+    # (cf. _get_map_elec_html) : une interaction déjà vue ailleurs ne coûte qu'une lecture.
     @output
     @render.ui
     def map_elec():
-        year    = r_mix_year()
-        filiere = r_mix_filiere()
-        dark    = is_dark(input)
-
-        ck   = (year, filiere, dark)
-        html = _map_elec_cache.get(ck)
-        if html is None:
-            html = _build_map_elec_html(mix, conso, year, filiere, dark)
-            _map_elec_cache[ck] = html
-        return ui.HTML(html)
+        return ui.HTML(_get_map_elec_html(app_dir, r_mix_year(), r_mix_filiere(), is_dark(input)))
 
     # --- Barplot du mix par pays (OWID) ---
     # Deux modes : valeurs absolues (TWh) ou part du mix (%).
@@ -294,141 +495,7 @@ def server(input, output, session, app_dir: Path):
     @output
     @render_widget
     def bar_exports():
-        year   = r_mix_year()
-        as_pct = r_plot_mode_pct()
-        dark   = is_dark(input)
-        th     = plotly_theme(dark)
-
-        pivot = (
-            mix[mix["year"] == year]
-            .pivot_table(
-                index="country_fr",
-                columns="filiere",
-                values="twh",
-                aggfunc="sum",
-            )
-            .reindex(columns=FILIERE_ORDER, fill_value=0.0)
-            .fillna(0.0)
-        )
-
-        conso_y = (
-            conso[conso["year"] == year]
-            .set_index("country_fr")["twh"]
-            .to_dict()
-        )
-
-        if as_pct:
-            # Barres empilées en pourcentage du total national
-            totals = pivot.sum(axis=1).replace(0, 1)
-            data   = (pivot.div(totals, axis=0) * 100).round(1)
-            ylab   = "Part du mix (%)"
-
-            long = (
-                data.reset_index()
-                .melt(id_vars="country_fr", var_name="filiere", value_name="val")
-                .replace({"filiere": FILIERE_LABEL})
-            )
-            color_map = {FILIERE_LABEL[k]: v for k, v in FILIERE_COLOR.items()}
-
-            fig = px.bar(
-                long,
-                x="country_fr", y="val", color="filiere",
-                category_orders={"filiere": [FILIERE_LABEL[f] for f in FILIERE_ORDER]},
-                labels={"country_fr": "Pays", "val": ylab, "filiere": "Filière"},
-                title=f"Mix énergétique — {year}",
-            )
-
-            fig.update_traces(
-                marker=dict(line=dict(color=th["bar_outline"], width=1)),
-                hovertemplate="%{x} — %{y:.1f}% (%{legendgroup})<extra></extra>",
-            )
-
-            fig.update_layout(
-                barmode="stack", title_x=0.5,
-                margin=dict(l=10, r=10, t=56, b=30),
-                plot_bgcolor=th["plot"], paper_bgcolor=th["paper"],
-                legend_title_text="Filière",
-                font=dict(family="Poppins, Arial, sans-serif", color=th["font"]),
-                legend=dict(bgcolor=th["legend_bg"], bordercolor=th["legend_border"], borderwidth=1),
-            )
-            fig.update_yaxes(
-                title_text=ylab, gridcolor=th["grid"],
-                zeroline=True, zerolinecolor=th["zeroline"], zerolinewidth=1.6,
-                tickfont=dict(color=th["font"]), title_font=dict(color=th["font"]),
-            )
-            fig.update_xaxes(
-                title_text="Pays",
-                tickfont=dict(color=th["font"]), title_font=dict(color=th["font"]),
-            )
-
-            for tr in fig.data:
-                tr.marker.color = color_map.get(tr.name, tr.marker.color)
-
-            return fig
-
-        # Mode TWh : barres par filière + ligne de consommation brute
-        data = pivot.round(2)
-        long = (
-            data.reset_index()
-            .melt(id_vars="country_fr", var_name="filiere", value_name="val")
-            .replace({"filiere": FILIERE_LABEL})
-        )
-        color_map = {FILIERE_LABEL[k]: v for k, v in FILIERE_COLOR.items()}
-
-        fig = px.bar(
-            long,
-            x="country_fr", y="val", color="filiere",
-            category_orders={"filiere": [FILIERE_LABEL[f] for f in FILIERE_ORDER]},
-            labels={"country_fr": "Pays", "val": "TWh", "filiere": "Filière"},
-            title=f"Mix énergétique — {year}",
-        )
-
-        fig.update_traces(
-            marker=dict(line=dict(color=th["bar_outline"], width=1)),
-            hovertemplate="%{x} — %{y:.1f} TWh (%{legendgroup})<extra></extra>",
-        )
-
-        fig.update_layout(
-            barmode="stack", title_x=0.5,
-            margin=dict(l=10, r=10, t=56, b=30),
-            plot_bgcolor=th["plot"], paper_bgcolor=th["paper"],
-            legend_title_text="Filière",
-            font=dict(family="Poppins, Arial, sans-serif", color=th["font"]),
-            legend=dict(bgcolor=th["legend_bg"], bordercolor=th["legend_border"], borderwidth=1),
-        )
-        fig.update_yaxes(
-            title_text="TWh", gridcolor=th["grid"],
-            zeroline=True, zerolinecolor=th["zeroline"], zerolinewidth=1.6,
-            tickfont=dict(color=th["font"]), title_font=dict(color=th["font"]),
-        )
-        fig.update_xaxes(
-            title_text="Pays",
-            tickfont=dict(color=th["font"]), title_font=dict(color=th["font"]),
-        )
-
-        # Ligne de consommation brute superposée pour comparer production vs conso
-        pays_ordre = data.index.tolist()
-        conso_line_x, conso_line_y = [], []
-        for p in pays_ordre:
-            conso_line_x.append(p)
-            conso_line_y.append(float(conso_y.get(p, 0.0)))
-
-        fig.add_trace(
-            go.Scatter(
-                x=conso_line_x, y=conso_line_y,
-                mode="lines+markers",
-                name="Consommation brute (TWh)",
-                line=dict(color="#DC2626" if not dark else "#F97316", width=3),
-                marker=dict(size=7),
-                hovertemplate="Consommation: %{y:.1f} TWh<extra></extra>",
-            )
-        )
-
-        for tr in fig.data:
-            if tr.type == "bar":
-                tr.marker.color = color_map.get(tr.name, tr.marker.color)
-
-        return fig
+        return widget(_build_bar_exports(cube, r_mix_year(), r_plot_mode_pct(), is_dark(input)))
 
     # --- Courbes comparatives Franco-Voisins (données RTE) ---
     # Les cases à cocher sont initialisées au premier rendu avec les deux frontières
@@ -466,12 +533,7 @@ def server(input, output, session, app_dir: Path):
     @output
     @render_widget
     def comp_plot():
-        dark   = is_dark(input)
-        th     = plotly_theme(dark)
-
         s, e   = r_cmp_period()
-        metric = r_cmp_metric()
-        how    = r_cmp_agg()
         try:
             roll = max(1, min(6, int(input.ech_roll() or 1)))
         except Exception:
@@ -481,61 +543,6 @@ def server(input, output, session, app_dir: Path):
         if not keep:
             req(False)  # interrompt le rendu si aucune frontière n'est sélectionnée
 
-        sub  = _filter_period(df_trade, s, e)
-        agg  = _agg_period(sub, how=how)
-
-        data = (
-            agg[agg["frontiere"].isin(keep)][["periode", "frontiere", metric]]
-            .sort_values(["frontiere", "periode"])
-        )
-        data["periode"] = pd.to_datetime(data["periode"]).astype("datetime64[ms]")
-
-        # Lissage glissant optionnel (réduit le bruit sur les données mensuelles)
-        data[metric] = data.groupby("frontiere")[metric].transform(
-            lambda s: s.rolling(roll, min_periods=1).mean()
-        )
-
-        title_cible = ", ".join(keep) if len(keep) <= 6 else f"{len(keep)} pays"
-        fig = px.line(
-            data,
-            x="periode", y=metric, color="frontiere",
-            labels={"periode": "Période", metric: f"{metric} (TWh)"},
-            title=f"{metric} — comparaison ({title_cible})",
-            color_discrete_map={
-                "Suisse":              "#DC2626",
-                "Belgique/Allemagne":  "#000000",
-                "Italie":              "#1D4ED8",
-                "Espagne":             "#FACC15",
-                "Royaume-Uni":         "#7C3AED",
-            },
-        )
-
-        fig.update_traces(
-            mode="lines+markers",
-            line=dict(width=2.3),
-            marker=dict(size=6),
-            hovertemplate="%{x|%Y-%m-%d} — %{y:.1f} TWh (%{legendgroup})<extra></extra>",
-        )
-
-        fig.update_layout(
-            title_x=0.5,
-            margin=dict(l=10, r=16, t=54, b=20),
-            plot_bgcolor=th["plot"], paper_bgcolor=th["paper"],
-            font=dict(color=th["font"], family="Poppins, Arial, sans-serif"),
-            legend=dict(bgcolor=th["legend_bg"], bordercolor=th["legend_border"], borderwidth=1),
-        )
-
-        fig.update_yaxes(
-            title_text=f"{metric} (TWh)", gridcolor=th["grid"],
-            zeroline=True, zerolinewidth=2.5, zerolinecolor=th["zeroline"],
-            tickfont=dict(color=th["font"]), title_font=dict(color=th["font"]),
-        )
-
-        fig.update_xaxes(
-            type="date",
-            tickformat="%Y-%m" if how == "Mensuel" else "%Y",
-            tickfont=dict(color=th["font"]), title_font=dict(color=th["font"]),
-            title_text="Période",
-        )
-
-        return fig
+        return widget(_build_comp_plot(
+            df_trade, s, e, r_cmp_metric(), r_cmp_agg(), roll, keep, is_dark(input),
+        ))
@@ -17,15 +17,18 @@ from __future__ import annotations
 
 from shiny import reactive, render, ui
 import pandas as pd
-import geopandas as gpd
-import folium
-from folium.plugins import FastMarkerCluster
-from branca.colormap import linear
 import numpy as np
 from pathlib import Path
 import sys
 
-from server._common import is_dark, cached, stable_jitter
+from server._common import (
+    is_dark, cached, lazy_import, stable_jitter, tache_de_rendu, carte_html, cache_de_session,
+)
+
+# Bibliothèques lourdes importées au premier rendu (cf. server/_common.py)
+gpd    = lazy_import("geopandas")
+folium = lazy_import("folium")
+branca = lazy_import("branca")
 
 
 # Coordonnées géographiques des cinq hubs FLAP-D
@@ -105,9 +108,9 @@ def _build_map_all(df: pd.DataFrame, dark: bool) -> str:
     m = folium.Map(location=[51, 5], zoom_start=5, tiles=tiles)
 
     coords = df[["latitude", "longitude"]].to_numpy().tolist()
-    FastMarkerCluster(data=coords).add_to(m)
+    folium.plugins.FastMarkerCluster(data=coords).add_to(m)
 
-    return m._repr_html_()
+    return carte_html(m)
 
 
 def _build_map_hub(df: pd.DataFrame, dark: bool) -> str:
@@ -128,7 +131,7 @@ def _build_map_hub(df: pd.DataFrame, dark: bool) -> str:
             vmin -= 0.5
             vmax += 0.5
 
-    pal = linear.Reds_09.scale(vmin, vmax)
+    pal = branca.colormap.linear.Reds_09.scale(vmin, vmax)
     pal.caption = "Puissance (MW)"
 
     m = folium.Map(
@@ -207,7 +210,7 @@ def _build_map_hub(df: pd.DataFrame, dark: bool) -> str:
     m.get_root().html.add_child(folium.Element(legend))
     pal.add_to(m)
 
-    return m._repr_html_()
+    return carte_html(m)
 
 
 # =====================================================================
@@ -249,32 +252,28 @@ def carte_flapd_server(input, output, session, gdf: gpd.GeoDataFrame):
     def _reset():
         selected_ville.set("All")
 
-    # Cache local par (ville, thème) pour ne pas reconstruire la carte Folium
-    # à chaque fois que l'utilisateur revient sur le même hub.
-    _map_cache: dict[tuple[str, bool], str] = {}
+    # Cache de la session par (ville, thème) pour ne pas reconstruire la carte Folium
+    # à chaque fois que l'utilisateur revient sur le même hub : borné, et libéré
+    # à la fin de la session (cf. server/_common.py).
+    _map_cache = cache_de_session(session, "flapd.cartes")
+
+    def _construire_carte(city: str, dark: bool) -> str | None:
+        """HTML de la carte (None si le hub n'a aucun DC) — exécuté dans le pool de rendu."""
+        def _build():
+            if city == "All":
+                return _build_map_all(gdf, dark)
+            df = gdf[gdf["city_hub_auto"] == city]
+            return None if df.empty else _build_map_hub(df, dark)
+        return _map_cache.get_or_build((city, dark), _build)
+
+    _carte = tache_de_rendu(lambda: (selected_ville(), is_dark(input)), _construire_carte, sortie="map_flapd_sites")
 
     @output
     @render.ui
     def map_flapd_sites():
-        city = selected_ville()
-        dark = is_dark(input)
-
-        ck = (city, dark)
-        html = _map_cache.get(ck)
-        if html is not None:
-            return ui.div(ui.HTML(html), class_="map-wrap")
-
-        if city == "All":
-            html = _build_map_all(gdf, dark)
-            _map_cache[ck] = html
-            return ui.div(ui.HTML(html), class_="map-wrap")
-
-        df = gdf[gdf["city_hub_auto"] == city]
-        if df.empty:
-            return ui.div(f"Aucun DC trouvé pour {city}")
-
-        html = _build_map_hub(df, dark)
-        _map_cache[ck] = html
+        html = _carte()
+        if html is None:
+            return ui.div(f"Aucun DC trouvé pour {selected_ville()}")
         return ui.div(ui.HTML(html), class_="map-wrap")
 
     # Tableau de synthèse par hub : surface, puissance, PUE
@@ -19,13 +19,17 @@ from shiny import render, ui, req
 import shinywidgets as sw
 
 from pathlib import Path
-import geopandas as gpd
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import folium, branca, json
+import json
 
-from server._common import is_dark, plotly_theme, cached
+from server._common import is_dark, plotly_theme, cached, lazy_import, carte_html
+from server._figures import echelle, figure, tableau, widget
+
+# Bibliothèques lourdes importées au premier rendu (cf. server/_common.py)
+gpd    = lazy_import("geopandas")
+folium = lazy_import("folium")
+branca = lazy_import("branca")
 
 
 # =========================================================
@@ -125,7 +129,7 @@ def _build_map_html(gdf: gpd.GeoDataFrame, gj_text: str, dark: bool) -> str:
 
     # Folium génère du HTML avec une hauteur exprimée en pourcentage flottant (0.0%)
     # qu'on corrige en valeur utilisable par le navigateur.
-    html = m._repr_html_()
+    html = carte_html(m)
     html = (html
             .replace("height: 0.0%;", "height: 100%;")
             .replace("height:0.0%;", "height: 100%;")
@@ -202,13 +206,67 @@ def _get_data(app_dir: Path) -> dict:
     return cached(f"repartition::{Path(app_dir).resolve()}", lambda: _load_data_prepared(app_dir))
 
 
+# =========================================================
+# Graphique : part du nombre total de DC par pays (dict Plotly brut)
+# =========================================================
+def _build_dc_share(df_share: pd.DataFrame, dark: bool, top_n: int = 10) -> dict:
+    """
+    Barres horizontales du top 10 des pays ; les autres pays sont regroupés
+    dans "Reste de l'Europe".
+    """
+    if df_share.empty:
+        return figure([], dict(title=dict(text="Aucune donnée")))
+
+    top = df_share.head(top_n)
+    rest_pct = max(0.0, 100.0 - float(top["share"].sum()))
+    chart_df = pd.concat(
+        [pd.DataFrame([{"country": "Reste de l'Europe", "share": rest_pct}]), top[["country", "share"]]],
+        ignore_index=True,
+    )
+
+    data_plot = chart_df.sort_values("share", ascending=True)
+    share     = tableau(data_plot["share"])
+    th        = plotly_theme(dark)
+
+    trace = dict(
+        type="bar", orientation="h",
+        x=share, y=data_plot["country"].tolist(),
+        text=[f"{v:.1f}%" for v in share],
+        textposition="outside", cliponaxis=False,
+        marker=dict(
+            color=share, colorscale=echelle("Purples"),
+            line=dict(color=th["bar_outline"], width=1),
+        ),
+        hovertemplate="(%{x:.1f}%, %{y})<extra></extra>",
+    )
+    xmax = float(share.max()) if len(share) else 0.0
+    layout = dict(
+        margin=dict(l=10, r=10, t=30, b=10),
+        autosize=True, showlegend=False, title=dict(text=""),
+        paper_bgcolor=th["paper"], plot_bgcolor=th["plot"],
+        font=dict(color=th["font"], family="Poppins, Arial, sans-serif", size=13),
+        xaxis=dict(
+            title=dict(text="Part du nombre de DC", font=dict(color=th["font"])),
+            ticksuffix="%", range=[0, xmax * 1.15],
+            gridcolor=th["grid"], zeroline=True, zerolinecolor=th["zeroline"],
+            linecolor=th["grid"], tickfont=dict(color=th["font"]),
+        ),
+        yaxis=dict(
+            title=dict(text="", font=dict(color=th["font"])),
+            gridcolor=th["grid"], linecolor=th["grid"],
+            tickfont=dict(color=th["font"]), automargin=True,
+        ),
+    )
+    return figure([trace], layout)
+
+
 # =========================================================
 # Fonctions serveur Shiny
 # =========================================================
 def server(input, output, session, app_dir: Path):
 
     # --- Carte Europe ---
-    # Se redessine uniquement si l'onglet actif est "Europe" et si le thème change.
+    # Se redessine uniquement si l'onglet actif est "repartition" (Europe) et si le thème change.
     @output
     @render.ui
     def repartition_map():
@@ -216,7 +274,7 @@ def server(input, output, session, app_dir: Path):
         # (évite un calcul inutile quand l'onglet n'est pas visible)
         tabs = getattr(input, "tabs_repartition", None)
         if callable(tabs):
-            req(tabs() == "Europe")
+            req(tabs() == "repartition")
 
         d = _get_data(app_dir)
         dark = is_dark(input)
@@ -228,53 +286,7 @@ def server(input, output, session, app_dir: Path):
     @output
     @sw.render_widget
     def dc_share_plot():
-        d = _get_data(app_dir)
-        df_share = d["df_share"]
-        if df_share.empty:
-            return px.bar(title="Aucune donnée")
-
-        TOP_N = 10
-        top = df_share.head(TOP_N)
-        rest_pct = max(0.0, 100.0 - float(top["share"].sum()))
-        # On regroupe les pays hors top 10 dans "Reste de l'Europe"
-        chart_df = pd.concat(
-            [pd.DataFrame([{"country": "Reste de l'Europe", "share": rest_pct}]), top[["country", "share"]]],
-            ignore_index=True,
-        )
-
-        data_plot = chart_df.sort_values("share", ascending=True)
-        th = plotly_theme(is_dark(input))
-
-        fig = px.bar(
-            data_plot,
-            x="share", y="country", orientation="h",
-            text=data_plot["share"].map(lambda v: f"{v:.1f}%"),
-            color="share",
-            color_continuous_scale="Purples",
-        )
-        fig.update_traces(
-            textposition="outside", cliponaxis=False,
-            hovertemplate="(%{x:.1f}%, %{y})<extra></extra>",
-            marker_line=dict(color=th["bar_outline"], width=1),
-        )
-        xmax = float(data_plot["share"].max()) if len(data_plot) else 0.0
-        fig.update_layout(
-            margin=dict(l=10, r=10, t=30, b=10),
-            autosize=True, showlegend=False, title_text="",
-            paper_bgcolor=th["paper"], plot_bgcolor=th["plot"],
-            font=dict(color=th["font"], family="Poppins, Arial, sans-serif", size=13),
-            coloraxis_showscale=False,
-        )
-        fig.update_xaxes(
-            title_text="Part du nombre de DC", ticksuffix="%", range=[0, xmax * 1.15],
-            gridcolor=th["grid"], zeroline=True, zerolinecolor=th["zeroline"],
-            linecolor=th["grid"], tickfont=dict(color=th["font"]), title_font=dict(color=th["font"]),
-        )
-        fig.update_yaxes(
-            title_text="", gridcolor=th["grid"], linecolor=th["grid"],
-            tickfont=dict(color=th["font"]), title_font=dict(color=th["font"]), automargin=True,
-        )
-        return fig
+        return widget(_build_dc_share(_get_data(app_dir)["df_share"], is_dark(input)))
 
     # --- Chiffres clés (KPI) ---
     @output
@@ -1,4 +1,4 @@
-# server/energie/simulateurs/__init__.py — coordinateur du package Simulateurs
+# server/energie/simulateurs/__init__.py — package Simulateurs
 #
 # Ce package regroupe les deux simulateurs énergétiques, chacun dans son fichier :
 #
@@ -10,13 +10,18 @@
 #                    convertit la consommation d'un DC en nombre d'habitants équivalents
 #                    selon différents profils nationaux
 #
+#   montee_en_charge.py — moteur de montée en charge par paliers (dc_paliers.csv)
+#                    pour un portefeuille de projets, utilisé par le simulateur prédictif
+#
+#   horaire.py     — simulation horaire (8 760 h) de la charge DC face aux profils
+#                    nationaux de consommation et de production (pointe, heures en déficit),
+#                    avec sa ligne de commande sur une table de scénarios de batch.py
+#
+#   batch.py       — API Python + ligne de commande (hors Shiny) pour évaluer
+#                    une table de scénarios en mode vectorisé, éventuellement en parallèle
+#
 # Les utilitaires communs (chargement CSV, style Plotly, constantes physiques)
 # vivent dans _shared.py pour éviter la duplication entre les deux simulateurs.
-from pathlib import Path
-
-
-def server(input, output, session, app_dir: Path):
-    from . import predictif
-    from . import comparatif
-    predictif.server(input, output, session, app_dir)
-    comparatif.server(input, output, session, app_dir)
+#
+# Les server() de predictif et comparatif sont enregistrés directement par
+# server/energie/__init__.py (SOUS_MODULES), à la première ouverture de leur onglet.
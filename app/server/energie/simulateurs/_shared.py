@@ -6,8 +6,10 @@
 #   - Chargement et mise en cache des CSV de données (paliers DC, historiques
 #     et projections de consommation/production nationale)
 #   - SimData : conteneur structuré de toutes les séries temporelles
-#   - style_fig() : mise en forme Plotly cohérente (thème clair/sombre)
+#   - style_fig() / style_fig_theme() / theme_layout() : mise en forme Plotly cohérente (thème clair/sombre)
 #   - Constantes physiques des filières de production (pour les KPI du simulateur prédictif)
+#   - Formules vectorisées d'un scénario de DC (TWh, unités équivalentes, courbe
+#     simulée, habitants équivalents), communes à l'interface, batch.py et horaire.py
 #   - COUNTRY_CONSO : consommation annuelle par habitant selon le pays (MWh/an)
 #   - DC_LABELS, DC_PALIER_MWH, DC_1GW_MWH : paliers de puissance du projet Data One
 from __future__ import annotations
@@ -15,6 +17,7 @@ from __future__ import annotations
 from pathlib import Path
 from dataclasses import dataclass
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 
@@ -27,6 +30,7 @@ COLORS = {
     "consumption_dark": "#58A6FF",   # bleu clair pour le mode sombre
     "production":       "#2EA043",   # vert — production nationale
     "accent":           "#F97316",   # orange — consommation avec DC simulés
+    "buildout":         "#A855F7",   # violet — consommation avec montée en charge par paliers
 }
 
 
@@ -120,29 +124,42 @@ def style_fig(fig: go.Figure, input, *, height: int = 460) -> go.Figure:
     Applique le thème clair/sombre à une figure Plotly.
     À appeler en dernier, après avoir construit toutes les traces.
     """
-    dark = is_dark(input)
+    return style_fig_theme(fig, is_dark(input), height=height)
+
+
+def style_fig_theme(fig: go.Figure, dark: bool, *, height: int = 460) -> go.Figure:
+    """Comme style_fig(), mais avec le thème passé explicitement (hors session Shiny)."""
+    layout = theme_layout(dark, height=height)
+    axe_x, axe_y = layout.pop("xaxis"), layout.pop("yaxis")
+    fig.update_layout(layout)
+    fig.update_xaxes(axe_x)
+    fig.update_yaxes(axe_y)
+    return fig
+
+
+def theme_layout(dark: bool, *, height: int = 460) -> dict:
+    """Layout du thème sous forme de dict, pour les figures brutes (cf. server/_figures.py)."""
     tc   = text_color(dark)
     gc   = grid_color(dark)
-    fig.update_layout(
+    axe  = dict(showgrid=True, gridcolor=gc,
+                tickfont=dict(color=tc), title=dict(font=dict(color=tc)))
+    return dict(
         template="plotly_white",
         font=dict(family="Poppins, Arial, sans-serif", size=13, color=tc),
         paper_bgcolor="rgba(0,0,0,0)",
         plot_bgcolor="rgba(0,0,0,0)",
-        hoverlabel=dict(font_size=12, font_family="Poppins, Arial, sans-serif"),
+        hoverlabel=dict(font=dict(size=12, family="Poppins, Arial, sans-serif")),
         margin=dict(t=40, r=20, b=40, l=40),
-        title_font=dict(color=tc),
+        title=dict(font=dict(color=tc)),
         legend=dict(
             orientation="h", y=-0.2, x=0.5, xanchor="center",
             bgcolor="rgba(0,0,0,0)", bordercolor="rgba(0,0,0,0)",
             font=dict(color=tc),
         ),
         height=height,
+        xaxis=dict(axe),
+        yaxis=dict(axe),
     )
-    fig.update_xaxes(showgrid=True, gridcolor=gc,
-                     tickfont=dict(color=tc), title_font=dict(color=tc))
-    fig.update_yaxes(showgrid=True, gridcolor=gc,
-                     tickfont=dict(color=tc), title_font=dict(color=tc))
-    return fig
 
 
 # =========================================================
@@ -174,16 +191,71 @@ capacities_twh_per_unit = {
 }
 
 
+# =========================================================
+# Formules d'un scénario de DC (vectorisées)
+# Seul endroit où elles sont écrites : les deux simulateurs, batch.py et
+# horaire.py donnent ainsi le même résultat pour un même scénario.
+# Chaque fonction accepte des scalaires ou des tableaux (un élément par scénario).
+# =========================================================
+HEURES_PAR_AN = 8760
+
+
+def nombre_dc(nb_dc) -> np.ndarray:
+    """Nombre de DC : entier, au moins 0 (valeur absente → 0)."""
+    nb = np.nan_to_num(np.atleast_1d(np.asarray(nb_dc, dtype=float)))
+    return np.maximum(0.0, np.floor(nb))
+
+
+def facteur_charge(facteur_pct) -> np.ndarray:
+    """Facteur de charge en % → fraction bornée à [0, 1] (valeur absente → 0)."""
+    fc = np.nan_to_num(np.atleast_1d(np.asarray(facteur_pct, dtype=float)))
+    return np.clip(fc / 100.0, 0.0, 1.0)
+
+
+def twh_par_an(puissance_mw, facteur_pct) -> np.ndarray:
+    """Énergie annuelle (TWh) d'une puissance de puissance_mw MW au facteur de charge facteur_pct %."""
+    mw = np.atleast_1d(np.asarray(puissance_mw, dtype=float))
+    return mw * HEURES_PAR_AN * facteur_charge(facteur_pct) / 1e6
+
+
+def twh_dc(nb_dc, facteur_pct, puissance_mw) -> np.ndarray:
+    """Consommation annuelle de nb_dc DC identiques (TWh/an)."""
+    return nombre_dc(nb_dc) * twh_par_an(puissance_mw, facteur_pct)
+
+
+def equivalents(twh) -> dict[str, np.ndarray]:
+    """
+    Unités de production (réacteurs, barrages, parcs…) qui produisent twh TWh/an,
+    par filière de capacities_twh_per_unit (arrondi à l'unité).
+    """
+    twh = np.atleast_1d(np.asarray(twh, dtype=float))
+    return {
+        source: np.rint(twh / unit).astype(int) if unit > 0 else np.zeros(twh.shape, dtype=int)
+        for source, unit in capacities_twh_per_unit.items()
+    }
+
+
 def equivalent_units(source: str, nb_dc: int, facteur_pct: float, puissance_mw: float) -> int:
     """
     Calcule combien d'unités de production (réacteurs, barrages, parcs…) seraient
     nécessaires pour alimenter nb_dc data centers de puissance_mw MW avec un facteur
     de charge facteur_pct %.
     """
-    fc         = max(0.0, min(1.0, (facteur_pct or 0) / 100.0))
-    twh_2035   = (puissance_mw * 8760 * fc / 1e6) * max(1, nb_dc)
-    unit_twh   = capacities_twh_per_unit[source]
-    return int(round(twh_2035 / unit_twh)) if unit_twh > 0 else 0
+    return int(equivalents(twh_dc(nb_dc, facteur_pct, puissance_mw))[source][0])
+
+
+def courbe_simulee(sim: SimData, twh) -> np.ndarray:
+    """
+    Courbe "Consommation avec Data Centers" : matrice (scénarios × années de
+    projection), NaN avant 2025, référence RTE en 2025 (point d'attache),
+    référence + twh ensuite.
+    """
+    annees = np.asarray(sim.CONSO_PROJ_Y, dtype=int)
+    ref    = np.asarray(sim.CONSO_PROJ_REF, dtype=float)
+    impact = np.atleast_1d(np.asarray(twh, dtype=float))[:, None] * (annees > 2025)[None, :]
+    courbe = ref[None, :] + impact
+    courbe[:, annees < 2025] = np.nan
+    return courbe
 
 
 # =========================================================
@@ -208,6 +280,20 @@ DC_LABELS    = ["15 MW", "200 MW", "400 MW", "1 GW"]
 DC_PALIER_MWH = [15*24*365, 200*24*365, 400*24*365, 1000*24*365]
 DC_1GW_MWH   = 8_760_000.0  # MWh/an pour un DC de 1 GW à pleine charge
 
+
+def habitants_equivalents(mwh, conso_par_habitant) -> np.ndarray:
+    """
+    Nombre d'habitants consommant autant que mwh (MWh/an) : matrice
+    (profils × valeurs de mwh), 0 pour un profil sans consommation.
+    """
+    mwh   = np.atleast_1d(np.asarray(mwh, dtype=float))
+    conso = np.atleast_1d(np.asarray(conso_par_habitant, dtype=float))
+    return np.divide(
+        mwh[None, :], conso[:, None],
+        out=np.zeros((conso.size, mwh.size)), where=conso[:, None] > 0,
+    )
+
+
 # Palette de couleurs pour les barres du simulateur comparatif
 PALETTE = [
     "#3B82F6", "#22C55E", "#F59E0B", "#EF4444",
@@ -0,0 +1,148 @@
+# server/energie/simulateurs/batch.py — API Python et ligne de commande sans Shiny
+#
+# Évalue les scénarios du simulateur prédictif (TWh des DC, unités de production
+# équivalentes, courbe simulée et courbe de montée en charge sur la projection
+# RTE) et du simulateur comparatif (habitants équivalents) hors de Shiny, depuis
+# un notebook ou une tâche planifiée, pour des milliers de scénarios d'un coup.
+#
+# Les formules sont celles de _shared.py et montee_en_charge.py, appelées aussi
+# par le simulateur prédictif : un scénario donne le même résultat ici et dans
+# l'interface. Elles acceptent des tableaux : une table de scénarios est évaluée
+# en une seule passe vectorisée.
+#
+# Table de scénarios (CSV ou Parquet) — colonnes obligatoires :
+#   nb_dc, facteur_charge (%), puissance_mw
+# Toute autre colonne (ex. "scenario") est recopiée telle quelle dans les résultats.
+#
+# Exemple en ligne de commande (depuis le dossier app/) :
+#   python -m server.energie.simulateurs.batch scenarios.csv -o resultats.parquet --processus 4
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ._shared import (
+    prepare_sim_data, SimData,
+    twh_dc, equivalents, courbe_simulee, habitants_equivalents,
+    COUNTRY_CONSO,
+)
+from .montee_en_charge import profil_depuis_paliers, courbe_montee
+
+
+APP_DIR = Path(__file__).resolve().parents[3]
+
+COLONNES_SCENARIO = ["nb_dc", "facteur_charge", "puissance_mw"]
+
+
+# =========================================================
+# Évaluation d'une table de scénarios
+# =========================================================
+def evaluer(scenarios: pd.DataFrame, sim: SimData | None = None) -> pd.DataFrame:
+    """
+    Évalue tous les scénarios et renvoie une table de résultats :
+    colonnes d'entrée + twh_dc + conso_totale_twh + eq_<filière>
+    + habitants_<profil> + conso_<année> (courbe simulée)
+    + montee_<année> (courbe de montée en charge).
+    """
+    manquantes = [c for c in COLONNES_SCENARIO if c not in scenarios.columns]
+    if manquantes:
+        raise ValueError(f"Colonnes manquantes dans la table de scénarios : {manquantes}")
+
+    sim = sim or prepare_sim_data(APP_DIR)
+    sc  = scenarios.reset_index(drop=True)
+    nb, fc, mw = (sc[c].to_numpy(dtype=float) for c in COLONNES_SCENARIO)
+
+    twh = twh_dc(nb, fc, mw)
+    profil = profil_depuis_paliers(sim.DC_YEARS, sim.DC_TWH_DC)
+    habitants = habitants_equivalents(twh * 1e6, list(COUNTRY_CONSO.values()))
+    return pd.concat(
+        [
+            sc,
+            pd.DataFrame({
+                "twh_dc":           twh,
+                "conso_totale_twh": sim.consommation_actuelle + twh,
+            }),
+            pd.DataFrame({f"eq_{source}": n for source, n in equivalents(twh).items()}),
+            pd.DataFrame(habitants.T, columns=[f"habitants_{nom}" for nom in COUNTRY_CONSO]),
+            pd.DataFrame(
+                courbe_simulee(sim, twh),
+                columns=[f"conso_{a}" for a in sim.CONSO_PROJ_Y],
+            ),
+            pd.DataFrame(
+                courbe_montee(sim, profil, nb, fc, mw),
+                columns=[f"montee_{a}" for a in sim.CONSO_PROJ_Y],
+            ),
+        ],
+        axis=1,
+    )
+
+
+def _evaluer_bloc(args: tuple[pd.DataFrame, Path]) -> pd.DataFrame:
+    """Point d'entrée d'un processus du pool (les données sont rechargées dans chaque processus)."""
+    bloc, app_dir = args
+    return evaluer(bloc, prepare_sim_data(app_dir))
+
+
+def evaluer_parallele(
+    scenarios: pd.DataFrame,
+    *,
+    processus: int = 1,
+    app_dir: Path = APP_DIR,
+) -> pd.DataFrame:
+    """
+    Comme evaluer(), mais découpe la table en blocs répartis sur un pool de processus.
+    Utile seulement pour de très grandes tables : la version vectorisée traite déjà
+    des dizaines de milliers de scénarios en une fraction de seconde.
+    """
+    if processus <= 1 or len(scenarios) < 2:
+        return evaluer(scenarios, prepare_sim_data(app_dir))
+
+    sc     = scenarios.reset_index(drop=True)
+    bornes = np.linspace(0, len(sc), processus + 1).astype(int)
+    blocs  = [sc.iloc[a:b] for a, b in zip(bornes[:-1], bornes[1:]) if b > a]
+    with ProcessPoolExecutor(max_workers=processus) as pool:
+        resultats = list(pool.map(_evaluer_bloc, [(b, app_dir) for b in blocs]))
+    return pd.concat(resultats, ignore_index=True)
+
+
+# =========================================================
+# Lecture / écriture des tables (CSV ou Parquet selon l'extension)
+# =========================================================
+def lire_table(path: Path) -> pd.DataFrame:
+    path = Path(path)
+    if path.suffix.lower() in (".parquet", ".pq"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def ecrire_table(df: pd.DataFrame, path: Path) -> None:
+    path = Path(path)
+    if path.suffix.lower() in (".parquet", ".pq"):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Évalue une table de scénarios du simulateur prédictif sans lancer Shiny.",
+    )
+    parser.add_argument("scenarios", type=Path, help="table d'entrée (.csv ou .parquet)")
+    parser.add_argument("-o", "--sortie", type=Path, required=True, help="table de résultats (.csv ou .parquet)")
+    parser.add_argument("-p", "--processus", type=int, default=1, help="nombre de processus (défaut : 1)")
+    parser.add_argument("--app-dir", type=Path, default=APP_DIR, help="dossier de l'application (www/data)")
+    args = parser.parse_args(argv)
+
+    resultats = evaluer_parallele(
+        lire_table(args.scenarios), processus=args.processus, app_dir=args.app_dir,
+    )
+    ecrire_table(resultats, args.sortie)
+    print(f"{len(resultats)} scénarios évalués → {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
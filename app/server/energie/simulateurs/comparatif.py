@@ -13,6 +13,7 @@
 #   - france_pct, qatar_pct, mali_pct   → % de la population nationale
 #   - checkbox_group_conso             → liste de profils disponibles (rendu dynamique)
 #   - barplot                          → graphique comparatif par profil sélectionné
+#                                        (thème appliqué par patch, sans renvoyer les barres)
 #   - entites_dyn, entite_controls     → interface de comparaison personnalisée
 #   - barplot_personalisee             → graphique de la comparaison personnalisée
 from __future__ import annotations
@@ -23,15 +24,78 @@ import plotly.graph_objects as go
 from shiny import reactive, render, ui
 import shinywidgets as sw
 
+from server._common import is_dark, valeur_initiale
+from server._figures import figure, fusion, tableau, widget
 from ._shared import (
     prepare_sim_data,
     style_fig,
+    style_fig_theme,
+    theme_layout,
+    habitants_equivalents,
     COUNTRY_CONSO,
     DC_LABELS, DC_PALIER_MWH, DC_1GW_MWH,
     PALETTE,
 )
 
 
+# =========================================================
+# Graphique comparatif (dict Plotly brut, cf. server/_figures.py)
+# =========================================================
+def _scale_labels(max_val: float):
+    """Choisit l'unité d'affichage (habitants, milliers, millions) selon l'ordre de grandeur."""
+    if max_val >= 1e6:
+        return 1e6, "Nombre d'habitants équivalents (en millions)", " millions"
+    if max_val >= 1e3:
+        return 1e3, "Nombre d'habitants équivalents (en milliers)", " milliers"
+    return 1.0, "Nombre d'habitants équivalents", ""
+
+
+def _habitants_1gw(profil: str) -> float:
+    """Habitants équivalents d'un DC de 1 GW pour un profil de COUNTRY_CONSO (0 si inconnu)."""
+    return float(habitants_equivalents(DC_1GW_MWH, COUNTRY_CONSO.get(profil, 0.0))[0, 0])
+
+
+def _build_barplot(sel: list[str], dark: bool) -> dict:
+    """
+    Pour chaque profil sélectionné et chaque palier de puissance,
+    habitants équivalents = conso_DC / conso_par_habitant.
+    """
+    vals = [(p, COUNTRY_CONSO[p]) for p in sel if p in COUNTRY_CONSO]
+    if not vals:
+        return figure([], fusion(
+            dict(title=dict(text="Sélectionnez au moins un profil")),
+            theme_layout(dark, height=420),
+        ))
+
+    # Habitants équivalents : une ligne par profil, une colonne par palier
+    he = habitants_equivalents(DC_PALIER_MWH, [c for _, c in vals])
+
+    scale, y_title, hover_suffix = _scale_labels(float(he.max()) if he.size else 0.0)
+
+    data = [
+        dict(
+            type="bar", x=DC_LABELS, y=tableau(he[idx] / scale), name=p,
+            marker=dict(color=PALETTE[idx % len(PALETTE)]),
+            hovertemplate=(
+                "Profil : " + p +
+                "<br>Palier : %{x}<br>Habitants équivalents : %{y:,.2f}" +
+                hover_suffix + "<extra></extra>"
+            ),
+        )
+        for idx, (p, _) in enumerate(vals)
+    ]
+    layout = fusion(
+        dict(
+            legend=dict(title=dict(text="")),
+            xaxis=dict(title=dict(text="Paliers de puissance du Data Center de Eybens")),
+            yaxis=dict(title=dict(text=y_title)),
+            barmode="group",
+        ),
+        theme_layout(dark, height=460),
+    )
+    return figure(data, layout)
+
+
 def server(input, output, session, app_dir: Path):
     sim = prepare_sim_data(app_dir)
 
@@ -41,20 +105,20 @@ def server(input, output, session, app_dir: Path):
     @output
     @render.text
     def france_1gw():
-        v = COUNTRY_CONSO.get("France (68,29 M)")
-        return f"{int(round(DC_1GW_MWH / v)):,}".replace(",", " ") if v else ""
+        n = _habitants_1gw("France (68,29 M)")
+        return f"{int(round(n)):,}".replace(",", " ") if n else ""
 
     @output
     @render.text
     def qatar_1gw():
-        v = COUNTRY_CONSO.get("Qatar (2,66 M)")
-        return f"{int(round(DC_1GW_MWH / v)):,}".replace(",", " ") if v else ""
+        n = _habitants_1gw("Qatar (2,66 M)")
+        return f"{int(round(n)):,}".replace(",", " ") if n else ""
 
     @output
     @render.text
     def mali_1gw():
-        v = COUNTRY_CONSO.get("Mali (28,24 M)")
-        return f"{int(round(DC_1GW_MWH / v)):,}".replace(",", " ") if v else ""
+        n = _habitants_1gw("Mali (28,24 M)")
+        return f"{int(round(n)):,}".replace(",", " ") if n else ""
 
     @output
     @render.text
@@ -69,22 +133,19 @@ def server(input, output, session, app_dir: Path):
     @output
     @render.text
     def france_pct():
-        v   = COUNTRY_CONSO.get("France (68,29 M)", 1.0)
-        pct = round((DC_1GW_MWH / v) / 68_290_000 * 100.0, 2)
+        pct = round(_habitants_1gw("France (68,29 M)") / 68_290_000 * 100.0, 2)
         return f"Soit {pct} % de la population totale du pays"
 
     @output
     @render.text
     def qatar_pct():
-        v   = COUNTRY_CONSO.get("Qatar (2,66 M)", 1.0)
-        pct = round((DC_1GW_MWH / v) / 2_660_000 * 100.0, 2)
+        pct = round(_habitants_1gw("Qatar (2,66 M)") / 2_660_000 * 100.0, 2)
         return f"Soit {pct} % de la population totale du pays"
 
     @output
     @render.text
     def mali_pct():
-        v   = COUNTRY_CONSO.get("Mali (28,24 M)", 1.0)
-        pct = round((DC_1GW_MWH / v) / 28_243_609 * 100.0, 2)
+        pct = round(_habitants_1gw("Mali (28,24 M)") / 28_243_609 * 100.0, 2)
         return f"Soit {pct} % de la population totale du pays"
 
     # --- Sélecteur de profils (rendu dynamique pour pouvoir évoluer sans toucher l'UI) ---
@@ -99,58 +160,20 @@ def server(input, output, session, app_dir: Path):
         )
 
     # --- Graphique comparatif ---
-    # Pour chaque profil sélectionné et chaque palier de puissance,
-    # on calcule le nombre d'habitants équivalents = conso_DC / conso_par_habitant.
-    def _scale_labels(max_val: float):
-        """Choisit l'unité d'affichage (habitants, milliers, millions) selon l'ordre de grandeur."""
-        if max_val >= 1e6:
-            return 1e6, "Nombre d'habitants équivalents (en millions)", " millions"
-        if max_val >= 1e3:
-            return 1e3, "Nombre d'habitants équivalents (en milliers)", " milliers"
-        return 1.0, "Nombre d'habitants équivalents", ""
-
     @output
     @sw.render_widget
     def barplot():
         sel  = input.pays_selection() or ["Mondial"]
-        vals = [(p, COUNTRY_CONSO[p]) for p in sel if p in COUNTRY_CONSO]
-        if not vals:
-            fig = go.Figure()
-            fig.update_layout(title_text="Sélectionnez au moins un profil")
-            return style_fig(fig, input, height=420)
-
-        pays_names = [p for p, _ in vals]
-        pays_conso = [v for _, v in vals]
-
-        # Habitants équivalents par pays et par palier de puissance
-        he_by_pays: dict[str, list[float]] = {p: [] for p in pays_names}
-        for j, p in enumerate(pays_names):
-            c = pays_conso[j]
-            for mwh in DC_PALIER_MWH:
-                he_by_pays[p].append(mwh / c if c > 0 else 0.0)
+        dark = valeur_initiale(lambda: is_dark(input))
+        return widget(_build_barplot(sel, dark))
 
-        max_val = max((max(v) if v else 0.0) for v in he_by_pays.values())
-        scale, y_title, hover_suffix = _scale_labels(max_val)
-
-        fig = go.Figure()
-        for idx, p in enumerate(pays_names):
-            yvals = [v / scale for v in he_by_pays[p]]
-            fig.add_trace(go.Bar(
-                x=DC_LABELS, y=yvals, name=p,
-                marker=dict(color=PALETTE[idx % len(PALETTE)]),
-                hovertemplate=(
-                    "Profil : " + p +
-                    "<br>Palier : %{x}<br>Habitants équivalents : %{y:,.2f}" +
-                    hover_suffix + "<extra></extra>"
-                ),
-            ))
-
-        fig.update_layout(
-            legend_title_text="",
-            xaxis_title="Paliers de puissance du Data Center de Eybens",
-            yaxis_title=y_title, barmode="group",
-        )
-        return style_fig(fig, input, height=460)
+    # Thème → seules les couleurs de la mise en page sont envoyées
+    @reactive.effect
+    @reactive.event(lambda: is_dark(input), ignore_init=True)
+    def _patch_barplot_theme():
+        w = barplot.widget
+        with w.batch_update():
+            style_fig_theme(w, is_dark(input), height=w.layout.height)
 
     # --- Comparaison personnalisée ---
     # L'utilisateur définit ses propres entités (nom + consommation en kWh/MWh/GWh)
@@ -266,10 +289,8 @@ def server(input, output, session, app_dir: Path):
             fig.update_layout(title_text="Renseignez les champs puis cliquez sur « Valider » pour afficher/mettre à jour le diagramme.")
             return style_fig(fig, input, height=420)
 
-        he_by_name: dict[str, list[float]] = {name: [] for name, _ in rows}
-        for name, mwh in rows:
-            for dc_mwh in DC_PALIER_MWH:
-                he_by_name[name].append(dc_mwh / mwh if mwh > 0 else 0.0)
+        he = habitants_equivalents(DC_PALIER_MWH, [mwh for _, mwh in rows])
+        he_by_name = {name: he[i].tolist() for i, (name, _) in enumerate(rows)}
 
         max_val = max((max(v) if v else 0.0) for v in he_by_name.values())
         scale, y_title, hover_suffix = _scale_labels(max_val)
@@ -0,0 +1,240 @@
+# server/energie/simulateurs/horaire.py — simulation horaire (8 760 h) des data centers
+#
+# Les simulateurs raisonnent en TWh annuels, ce qui masque les tensions de pointe :
+# un DC de 1 GW à 85 % de facteur de charge ne pèse pas pareil un après-midi
+# d'été et un soir de janvier à 19 h.
+#
+# Ce module confronte, heure par heure, la charge d'un ou plusieurs scénarios de DC
+# à la consommation et à la production nationales :
+#
+#   marge résiduelle (MW) = production nationale − consommation nationale − charge DC
+#
+# et en déduit des indicateurs annuels : heures en déficit, marge minimale,
+# contribution des DC à la pointe, énergie consommée (TWh, même unité que
+# les KPI du simulateur prédictif).
+#
+# Fichiers d'entrée (CSV, fournis séparément — non versionnés dans www/data) :
+#   - profil national : une ligne par heure, colonnes conso_mw et prod_mw
+#     (une colonne d'horodatage facultative, par défaut "heure")
+#   - profil DC       : une ligne par heure, colonne charge (fraction 0–1 de la
+#     puissance nominale), exactement 8 760 valeurs. À défaut, un profil plat
+#     au facteur de charge de chaque scénario est utilisé.
+#
+# Scénarios : même table que batch.py (nb_dc, facteur_charge, puissance_mw).
+# Avec un profil DC, c'est lui qui fixe la charge heure par heure ; la colonne
+# facteur_charge n'est alors pas utilisée.
+#
+# Exemple en ligne de commande (depuis le dossier app/) :
+#   python -m server.energie.simulateurs.horaire scenarios.csv \
+#       --national profil_national.csv --profil-dc profil_dc.csv --sortie kpis.csv
+#
+# Le calcul est vectorisé sur l'axe des heures ET sur l'axe des scénarios :
+# les profils DC sont une matrice (scénarios × heures) comparée en une seule
+# opération NumPy aux profils nationaux (heures).
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from server._common import cached
+from ._shared import HEURES_PAR_AN, facteur_charge, nombre_dc
+from .batch import COLONNES_SCENARIO, ecrire_table, lire_table
+
+
+# Scénarios simulés ensemble : borne la matrice (scénarios × heures) en mémoire
+BLOC = 512
+
+
+# =========================================================
+# Chargement des profils horaires
+# =========================================================
+def _load_profil_national(path: Path) -> pd.DataFrame:
+    """Lit le profil national et vérifie la présence des colonnes attendues."""
+    if not path.exists():
+        raise FileNotFoundError(f"Profil horaire national introuvable : {path}")
+    df = pd.read_csv(path)
+    manquantes = {"conso_mw", "prod_mw"} - set(df.columns)
+    if manquantes:
+        raise ValueError(f"Colonnes manquantes dans {path.name} : {sorted(manquantes)}")
+    df[["conso_mw", "prod_mw"]] = df[["conso_mw", "prod_mw"]].astype(float)
+    return df
+
+
+def load_profil_national(path: Path) -> pd.DataFrame:
+    """Profil national (conso_mw, prod_mw) mis en cache au niveau du processus."""
+    path = Path(path)
+    return cached(f"horaire::national::{path.resolve()}", lambda: _load_profil_national(path))
+
+
+def load_profil_dc(path: Path) -> np.ndarray:
+    """
+    Lit un profil de charge DC (colonne "charge", fraction 0–1 de la puissance nominale,
+    une valeur par heure de l'année). Les valeurs hors bornes sont ramenées dans [0, 1].
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Profil horaire DC introuvable : {path}")
+    df = pd.read_csv(path)
+    if "charge" not in df.columns:
+        raise ValueError(f"Colonne 'charge' absente de {path.name}")
+    if len(df) != HEURES_PAR_AN:
+        raise ValueError(
+            f"{path.name} contient {len(df)} valeurs horaires, {HEURES_PAR_AN} attendues"
+        )
+    return np.clip(df["charge"].to_numpy(dtype=float), 0.0, 1.0)
+
+
+def profil_dc_plat(facteur_pct: float, heures: int = HEURES_PAR_AN) -> np.ndarray:
+    """Profil constant au facteur de charge (hypothèse des simulateurs annuels)."""
+    return np.full(heures, facteur_charge(facteur_pct)[0])
+
+
+# =========================================================
+# Construction des scénarios
+# =========================================================
+def charges_scenarios(nb_dc, puissance_mw, forme: np.ndarray) -> np.ndarray:
+    """
+    Matrice (scénarios × heures) de la charge DC en MW.
+    nb_dc et puissance_mw sont des scalaires ou des vecteurs de même longueur
+    (un élément par scénario) ; forme est le profil relatif (0–1) de chaque heure,
+    commun à tous les scénarios (vecteur) ou propre à chacun (matrice).
+    """
+    nb  = nombre_dc(nb_dc)
+    mw  = np.atleast_1d(np.asarray(puissance_mw, dtype=float))
+    frm = np.atleast_2d(np.asarray(forme, dtype=float))
+    return (nb * mw)[:, None] * frm
+
+
+# =========================================================
+# Simulation et indicateurs
+# =========================================================
+@dataclass
+class ResultatHoraire:
+    """Séries horaires d'une simulation (une ligne par scénario)."""
+    charge_dc_mw: np.ndarray   # (scénarios × heures)
+    conso_mw:     np.ndarray   # (heures,) consommation nationale hors DC simulés
+    prod_mw:      np.ndarray   # (heures,) production nationale
+    marge_mw:     np.ndarray   # (scénarios × heures) production − consommation − DC
+
+
+def simuler(charge_dc_mw: np.ndarray, conso_mw, prod_mw) -> ResultatHoraire:
+    """Calcule la marge résiduelle heure par heure pour chaque scénario."""
+    charge = np.atleast_2d(np.asarray(charge_dc_mw, dtype=float))
+    conso  = np.asarray(conso_mw, dtype=float)
+    prod   = np.asarray(prod_mw, dtype=float)
+    if not (charge.shape[1] == conso.shape[0] == prod.shape[0]):
+        raise ValueError(
+            f"Profils de longueurs différentes : DC={charge.shape[1]}, "
+            f"conso={conso.shape[0]}, prod={prod.shape[0]}"
+        )
+    marge = (prod - conso)[None, :] - charge
+    return ResultatHoraire(charge_dc_mw=charge, conso_mw=conso, prod_mw=prod, marge_mw=marge)
+
+
+def kpis_annuels(res: ResultatHoraire, puissance_nominale_mw) -> pd.DataFrame:
+    """
+    Indicateurs annuels par scénario. puissance_nominale_mw est la puissance
+    installée (nb_dc × puissance_mw, scalaire ou un élément par scénario),
+    celle passée à charges_scenarios() :
+      - twh_dc                : énergie consommée par les DC (TWh/an)
+      - facteur_charge_pct    : facteur de charge effectif (%) rapporté à la puissance
+                                nominale, réutilisable avec equivalent_units()
+                                du simulateur prédictif
+      - puissance_max_mw      : appel de puissance maximal des DC (MW)
+      - heures_deficit        : nombre d'heures où la marge devient négative
+      - heures_deficit_hors_dc: idem sans les DC (référence)
+      - energie_deficit_twh   : énergie manquante cumulée sur les heures en déficit
+      - marge_min_mw          : marge résiduelle la plus faible de l'année
+      - heure_marge_min       : index de l'heure correspondante (0 = 1er janvier 0 h)
+      - contribution_pointe_pct : part des DC dans la demande à l'heure de pointe
+    """
+    charge, marge = res.charge_dc_mw, res.marge_mw
+    demande = res.conso_mw[None, :] + charge
+    pointe  = np.argmax(demande, axis=1)
+    lignes  = np.arange(charge.shape[0])
+
+    puissance_max = charge.max(axis=1)
+    nominale = np.broadcast_to(np.asarray(puissance_nominale_mw, dtype=float), puissance_max.shape)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fc = np.where(nominale > 0, charge.mean(axis=1) / nominale * 100.0, 0.0)
+        contrib = np.where(
+            demande[lignes, pointe] > 0,
+            charge[lignes, pointe] / demande[lignes, pointe] * 100.0,
+            0.0,
+        )
+
+    return pd.DataFrame({
+        "twh_dc":                 charge.sum(axis=1) / 1e6,
+        "facteur_charge_pct":     fc,
+        "puissance_max_mw":       puissance_max,
+        "heures_deficit":         (marge < 0).sum(axis=1),
+        "heures_deficit_hors_dc": int(((res.prod_mw - res.conso_mw) < 0).sum()),
+        "energie_deficit_twh":    np.clip(-marge, 0.0, None).sum(axis=1) / 1e6,
+        "marge_min_mw":           marge.min(axis=1),
+        "heure_marge_min":        marge.argmin(axis=1),
+        "contribution_pointe_pct": contrib,
+    })
+
+
+# =========================================================
+# Évaluation d'une table de scénarios
+# =========================================================
+def evaluer(
+    scenarios: pd.DataFrame,
+    national: pd.DataFrame,
+    profil_dc: np.ndarray | None = None,
+) -> pd.DataFrame:
+    """
+    Simule tous les scénarios face au profil national et renvoie une table :
+    colonnes d'entrée + indicateurs de kpis_annuels(). Sans profil_dc, chaque
+    scénario suit un profil plat à son facteur de charge.
+    """
+    manquantes = [c for c in COLONNES_SCENARIO if c not in scenarios.columns]
+    if manquantes:
+        raise ValueError(f"Colonnes manquantes dans la table de scénarios : {manquantes}")
+
+    sc = scenarios.reset_index(drop=True)
+    nb, fc, mw = (sc[c].to_numpy(dtype=float) for c in COLONNES_SCENARIO)
+    nb = nombre_dc(nb)
+    conso = national["conso_mw"].to_numpy()
+    prod  = national["prod_mw"].to_numpy()
+
+    kpis = []
+    for debut in range(0, len(sc), BLOC):
+        tranche = slice(debut, debut + BLOC)
+        if profil_dc is None:
+            forme = np.stack([profil_dc_plat(f, len(conso)) for f in fc[tranche]])
+        else:
+            forme = profil_dc
+        res = simuler(charges_scenarios(nb[tranche], mw[tranche], forme), conso, prod)
+        kpis.append(kpis_annuels(res, nb[tranche] * mw[tranche]))
+    if not kpis:
+        return sc
+    return pd.concat([sc, pd.concat(kpis, ignore_index=True)], axis=1)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Simulation horaire (8 760 h) d'une table de scénarios de data centers.",
+    )
+    parser.add_argument("scenarios", type=Path, help="table d'entrée (.csv ou .parquet)")
+    parser.add_argument("--national", type=Path, required=True,
+                        help="profil horaire national (CSV : conso_mw, prod_mw)")
+    parser.add_argument("--profil-dc", type=Path, default=None,
+                        help="profil de charge DC (CSV : charge, 0–1) ; défaut : profil plat")
+    parser.add_argument("-o", "--sortie", type=Path, required=True,
+                        help="table des indicateurs (.csv ou .parquet)")
+    args = parser.parse_args(argv)
+
+    profil = load_profil_dc(args.profil_dc) if args.profil_dc else None
+    resultats = evaluer(lire_table(args.scenarios), load_profil_national(args.national), profil)
+    ecrire_table(resultats, args.sortie)
+    print(f"{len(resultats)} scénarios simulés heure par heure → {args.sortie}")
+
+
+if __name__ == "__main__":
+    main()
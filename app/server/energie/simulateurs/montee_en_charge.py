@@ -0,0 +1,162 @@
+# server/energie/simulateurs/montee_en_charge.py — montée en charge progressive des DC
+#
+# Le simulateur prédictif ajoute par défaut une consommation constante à partir
+# de 2025 : chaque DC est supposé tourner à pleine puissance dès sa mise en service.
+# En réalité, un DC monte en charge par paliers (cf. www/data/dc_paliers.csv pour
+# le projet Data One : 15 MW en 2025, 200 MW en 2026, 400 MW en 2028, 1 GW en 2035).
+#
+# Ce fichier modélise un PORTEFEUILLE de projets, chacun avec :
+#   - une année de mise en service
+#   - une puissance nominale (MW) et un facteur de charge (%)
+#   - un calendrier de paliers (générique, issu de dc_paliers.csv, ou propre au projet)
+#
+# Le calcul est entièrement vectorisé (NumPy) : chaque palier est converti en
+# un incrément de consommation annuelle, puis une somme cumulée sur l'axe des
+# années donne la demande totale. Le coût est linéaire en nombre de paliers,
+# ce qui permet d'évaluer des centaines de projets instantanément.
+#
+# Structures manipulées (DataFrames pandas) :
+#   - portefeuille : projet, mise_en_service, puissance_mw, facteur_charge
+#   - paliers      : projet, annee, mw, facteur_charge  (format "long", un palier par ligne)
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from ._shared import SimData, facteur_charge, nombre_dc, twh_par_an
+
+
+# =========================================================
+# Profil générique de montée en charge
+# =========================================================
+@dataclass(frozen=True)
+class ProfilPaliers:
+    """
+    Profil relatif de montée en charge, indépendant de la puissance du projet.
+    decalages : années écoulées depuis la mise en service (ex. 0, 1, 3, 10)
+    fractions : part de la puissance nominale atteinte à chaque palier (0–1)
+    """
+    decalages: np.ndarray
+    fractions: np.ndarray
+
+
+def profil_depuis_paliers(dc_years, dc_twh_dc) -> ProfilPaliers:
+    """
+    Convertit les paliers Data One (années, TWh par DC) en profil relatif.
+    Le dernier palier est la puissance nominale (fraction 1).
+    """
+    years = np.asarray(dc_years, dtype=int)
+    twh   = np.asarray(dc_twh_dc, dtype=float)
+    if years.size == 0:
+        return ProfilPaliers(decalages=np.zeros(1, dtype=int), fractions=np.ones(1))
+
+    order = np.argsort(years, kind="stable")
+    years, twh = years[order], twh[order]
+    final = twh[-1] if twh[-1] > 0 else 1.0
+    return ProfilPaliers(
+        decalages=years - years[0],
+        fractions=np.clip(twh / final, 0.0, 1.0),
+    )
+
+
+# =========================================================
+# Construction des portefeuilles et des paliers
+# =========================================================
+def portefeuille_uniforme(
+    nb_dc: int,
+    puissance_mw: float,
+    facteur_pct: float,
+    *,
+    debut: int = 2025,
+    ecart_annees: int = 0,
+) -> pd.DataFrame:
+    """
+    Portefeuille de nb_dc projets identiques.
+    ecart_annees > 0 échelonne les mises en service (un nouveau DC tous les N ans).
+    """
+    n = int(nombre_dc(nb_dc)[0])
+    idx = np.arange(n)
+    return pd.DataFrame({
+        "projet":          [f"DC {k + 1}" for k in idx],
+        "mise_en_service": debut + idx * int(ecart_annees),
+        "puissance_mw":    np.full(n, float(puissance_mw)),
+        "facteur_charge":  np.full(n, float(facteur_pct)),
+    })
+
+
+def paliers_portefeuille(portefeuille: pd.DataFrame, profil: ProfilPaliers) -> pd.DataFrame:
+    """
+    Applique le profil générique à chaque projet du portefeuille (produit
+    cartésien projets × paliers, construit par broadcasting).
+    """
+    n, k = len(portefeuille), len(profil.decalages)
+    if n == 0:
+        return pd.DataFrame(columns=["projet", "annee", "mw", "facteur_charge"])
+
+    debut = portefeuille["mise_en_service"].to_numpy(dtype=int)
+    mw    = portefeuille["puissance_mw"].to_numpy(dtype=float)
+    fc    = portefeuille["facteur_charge"].to_numpy(dtype=float)
+
+    annees = debut[:, None] + profil.decalages[None, :]
+    mw_pal = mw[:, None] * profil.fractions[None, :]
+
+    return pd.DataFrame({
+        "projet":         np.repeat(portefeuille["projet"].to_numpy(), k),
+        "annee":          annees.ravel(),
+        "mw":             mw_pal.ravel(),
+        "facteur_charge": np.repeat(fc, k),
+    })
+
+
+# =========================================================
+# Demande annuelle cumulée
+# =========================================================
+def demande_annuelle(paliers: pd.DataFrame, annees) -> np.ndarray:
+    """
+    Consommation annuelle totale du portefeuille (TWh) pour chaque année de `annees`
+    (liste triée par ordre croissant).
+
+    Chaque palier remplace le précédent du même projet : on calcule donc l'écart
+    d'énergie avec le palier précédent, on le dépose dans la case de l'année
+    correspondante, puis une somme cumulée propage cet écart aux années suivantes.
+    """
+    annees = np.asarray(annees, dtype=int)
+    if paliers.empty or annees.size == 0:
+        return np.zeros(annees.size)
+
+    df = paliers.sort_values(["projet", "annee"], kind="stable")
+    projet = df["projet"].to_numpy()
+    twh    = twh_par_an(df["mw"].to_numpy(dtype=float), df["facteur_charge"].to_numpy(dtype=float))
+
+    # Écart avec le palier précédent du même projet (0 pour le premier palier)
+    precedent = np.r_[0.0, twh[:-1]]
+    premier   = np.r_[True, projet[1:] != projet[:-1]]
+    precedent[premier] = 0.0
+    increments = twh - precedent
+
+    # Case de la première année >= année du palier ; au-delà de l'horizon → case perdue
+    cases = np.searchsorted(annees, df["annee"].to_numpy(dtype=int), side="left")
+    depots = np.bincount(cases, weights=increments, minlength=annees.size + 1)
+    return np.cumsum(depots[:-1])
+
+
+def courbe_montee(
+    sim: SimData, profil: ProfilPaliers, nb_dc, facteur_pct, puissance_mw,
+) -> np.ndarray:
+    """
+    Courbe "Consommation avec montée en charge" pour chaque scénario : matrice
+    (scénarios × années de projection), référence RTE + nb_dc DC identiques,
+    mis en service ensemble en 2025, qui suivent le profil de paliers.
+
+    La demande est celle d'un DC de 1 MW à 100 %, calculée une fois, mise à
+    l'échelle de nb_dc × puissance × facteur de charge de chaque scénario
+    (demande_annuelle() est linéaire en puissance et en facteur de charge).
+    """
+    unitaire = demande_annuelle(
+        paliers_portefeuille(portefeuille_uniforme(1, 1.0, 100.0), profil), sim.CONSO_PROJ_Y,
+    )
+    echelle = nombre_dc(nb_dc) * np.asarray(puissance_mw, dtype=float) * facteur_charge(facteur_pct)
+    ref = np.asarray(sim.CONSO_PROJ_REF, dtype=float)
+    return ref[None, :] + np.atleast_1d(echelle)[:, None] * unitaire[None, :]
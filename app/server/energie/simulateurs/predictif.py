@@ -12,8 +12,18 @@
 # Ces trois valeurs déclenchent la mise à jour de tous les outputs dès qu'une
 # valeur change (comportement réactif automatique de Shiny).
 #
+# Beaucoup d'utilisateurs tombent sur les mêmes positions de curseurs (valeurs
+# par défaut, positions "rondes"). La figure et les textes KPI sont donc mis en
+# cache au niveau du processus (LRUCache), avec pour clé les curseurs arrondis
+# (+ le thème pour la figure) : une position déjà vue ne coûte qu'une lecture.
+#
+# energiePlot n'est envoyé en entier qu'une fois par session : ensuite, un
+# changement de curseur ne renvoie que les ordonnées des deux courbes DC, et un
+# changement de thème que les couleurs de la mise en page (patch du widget).
+#
 # Outputs produits :
 #   - energiePlot          → graphique principal : historique + projections + courbe simulée
+#                            + courbe de montée en charge progressive (paliers Data One)
 #   - info_conso_totale    → consommation nationale totale avec les DC (TWh)
 #   - nuke_value, hydro_value, coal_value, wind_value, solar_value, bio_value
 #                          → nombre d'unités de production équivalentes
@@ -25,224 +35,330 @@ from __future__ import annotations
 
 from pathlib import Path
 
-import plotly.graph_objects as go
+import numpy as np
 from shiny import reactive, render, ui
 import shinywidgets as sw
 
+from server._common import is_dark, debounce, valeur_initiale, LRUCache
+from server._figures import figure, fusion, tableau, widget
 from ._shared import (
     COLORS,
+    SimData,
     prepare_sim_data,
-    style_fig,
-    equivalent_units,
+    style_fig_theme,
+    theme_layout,
+    twh_dc,
+    equivalents,
+    courbe_simulee,
     AURA_KM2,
     NUC_REACTORS_TOTAL, HYDRO_BARRAGES_TOTAL, WIND_PARCS_TOTAL,
     SOLAR_CENTRALES_TOTAL, COAL_PLANTS_ACTIVE, BIO_PLANTS_TOTAL,
-    capacities_twh_per_unit,
     COUNTRY_CONSO,
     DC_1GW_MWH,
 )
+from .montee_en_charge import (
+    profil_depuis_paliers,
+    courbe_montee,
+    ProfilPaliers,
+)
 
 
-def server(input, output, session, app_dir: Path):
-    sim = prepare_sim_data(app_dir)
-
-    # Raccourcis locaux pour alléger la lecture du code
-    CONSO_HIST_Y   = sim.CONSO_HIST_Y
-    CONSO_HIST_V   = sim.CONSO_HIST_V
-    PROD_HIST_Y    = sim.PROD_HIST_Y
-    PROD_HIST_V    = sim.PROD_HIST_V
-    CONSO_PROJ_Y   = sim.CONSO_PROJ_Y
-    CONSO_PROJ_REF = sim.CONSO_PROJ_REF
-    CONSO_PROJ_MIN = sim.CONSO_PROJ_MIN
-    CONSO_PROJ_MAX = sim.CONSO_PROJ_MAX
-    PROD_PROJ_Y    = sim.PROD_PROJ_Y
-    PROD_PROJ_REF  = sim.PROD_PROJ_REF
-    PROD_PROJ_MIN  = sim.PROD_PROJ_MIN
-    PROD_PROJ_MAX  = sim.PROD_PROJ_MAX
-    DC_YEARS       = sim.DC_YEARS
-    DC_TWH_DC      = sim.DC_TWH_DC
-    consommation_actuelle = sim.consommation_actuelle
+# =========================================================
+# Caches partagés entre sessions
+# =========================================================
+_FIG_CACHE    = LRUCache(maxsize=512, nom="predictif.figures")    # (app, curseurs, thème) → figure energiePlot (dict)
+_COURBE_CACHE = LRUCache(maxsize=2048, nom="predictif.courbes")    # (app, curseurs)        → ordonnées des courbes DC
+_KPI_CACHE    = LRUCache(maxsize=2048, nom="predictif.kpi")        # (app, curseurs)        → textes de tous les KPI
+
+# Position des courbes qui dépendent des curseurs dans energiePlot (cf. _build_energie_fig)
+TRACE_SIMULEE = 4
+TRACE_MONTEE  = 5
+
+# Délai d'inactivité des curseurs avant de relancer les rendus (secondes)
+DELAI_CURSEURS_S = 0.25
+
+
+def _quantifier(nb_dc, facteur_pct, puissance_mw) -> tuple[int, float, float]:
+    """
+    Arrondit les curseurs pour former une clé de cache stable
+    (sans perte : les pas des curseurs sont des entiers).
+    """
+    return (
+        int(round(float(nb_dc))),
+        round(float(facteur_pct), 1),
+        round(float(puissance_mw), 0),
+    )
+
+
+def _espaces(x) -> str:
+    """Séparateur de milliers à la française (espace)."""
+    return f"{x:,}".replace(",", " ")
 
-    # --- Graphique principal ---
-    # Trois couches visuelles :
-    #   1. Bandes min/max (enveloppe de scénarios RTE)
-    #   2. Lignes de référence conso/prod (scénario médian RTE)
-    #   3. Courbe simulée (référence + impact des DC, à partir de 2025)
-    @output
-    @sw.render_widget
-    def energiePlot():
-        nb_dc      = int(input.nb_dc())
-        facteur    = float(input.facteur_charge()) / 100
-        puissance_mw = float(input.puissance_mw())
 
-        # Impact total des DC simulés en TWh/an
-        twh_dc = (puissance_mw * 8760 * facteur / 1e6) * nb_dc
+# =========================================================
+# Construction de la figure et des KPI (fonctions pures, hors session)
+# =========================================================
+def _build_courbes_dc(
+    sim: SimData, profil: ProfilPaliers,
+    nb_dc: int, facteur_pct: float, puissance_mw: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Ordonnées des deux courbes qui dépendent des curseurs (NaN = pas de point) :
+      - courbe simulée (référence + impact des DC, à partir de 2025)
+      - courbe de montée en charge (référence + DC qui suivent les paliers Data One)
+    """
+    # Courbe simulée : part du scénario de référence + surconsommation des DC
+    # Le point d'attache est en 2025 (valeur identique à la référence),
+    # puis chaque année suivante = référence + impact DC.
+    simulated_y = courbe_simulee(sim, twh_dc(nb_dc, facteur_pct, puissance_mw))[0]
 
-        fig = go.Figure()
+    # Montée en charge : chaque DC suit les paliers de dc_paliers.csv
+    # (15 MW → 200 MW → 400 MW → puissance nominale), mis à l'échelle de puissance_mw.
+    montee_y = courbe_montee(sim, profil, nb_dc, facteur_pct, puissance_mw)[0]
 
+    return simulated_y, montee_y
+
+
+def _build_energie_fig(
+    sim: SimData, courbes: tuple[np.ndarray, np.ndarray], dark: bool,
+) -> dict:
+    """
+    Graphique principal, construit en dict Plotly brut (prêt à être mis en cache).
+    Quatre couches visuelles :
+      1. Bandes min/max (enveloppe de scénarios RTE)
+      2. Lignes de référence conso/prod (scénario médian RTE)
+      3. Courbe simulée            (trace TRACE_SIMULEE)
+      4. Courbe de montée en charge (trace TRACE_MONTEE)
+    """
+    simulated_y, montee_y = courbes
+
+    data = [
         # Bandes d'incertitude (fill="toself" = zone fermée entre min et max)
-        fig.add_trace(go.Scatter(
-            x=CONSO_PROJ_Y + list(reversed(CONSO_PROJ_Y)),
-            y=CONSO_PROJ_MAX + list(reversed(CONSO_PROJ_MIN)),
+        dict(
+            type="scatter",
+            x=tableau(sim.CONSO_PROJ_Y + list(reversed(sim.CONSO_PROJ_Y))),
+            y=tableau(sim.CONSO_PROJ_MAX + list(reversed(sim.CONSO_PROJ_MIN))),
             fill="toself", mode="none",
             fillcolor="rgba(31,111,235,0.14)",
             name="Estimation min/max de consommation",
             hoverinfo="skip",
-        ))
-
-        fig.add_trace(go.Scatter(
-            x=PROD_PROJ_Y + list(reversed(PROD_PROJ_Y)),
-            y=PROD_PROJ_MAX + list(reversed(PROD_PROJ_MIN)),
+        ),
+        dict(
+            type="scatter",
+            x=tableau(sim.PROD_PROJ_Y + list(reversed(sim.PROD_PROJ_Y))),
+            y=tableau(sim.PROD_PROJ_MAX + list(reversed(sim.PROD_PROJ_MIN))),
             fill="toself", mode="none",
             fillcolor="rgba(46,160,67,0.16)",
             name="Estimation min/max de production",
             hoverinfo="skip",
-        ))
-
+        ),
         # Lignes de référence (historique + projection)
-        fig.add_trace(go.Scatter(
-            x=CONSO_HIST_Y + CONSO_PROJ_Y,
-            y=CONSO_HIST_V + CONSO_PROJ_REF,
+        dict(
+            type="scatter",
+            x=tableau(sim.CONSO_HIST_Y + sim.CONSO_PROJ_Y),
+            y=tableau(sim.CONSO_HIST_V + sim.CONSO_PROJ_REF),
             mode="lines",
             line=dict(width=3, color="#1F6FEB"),
             name="Consommation nationale (référence)",
-        ))
-
-        fig.add_trace(go.Scatter(
-            x=PROD_HIST_Y + PROD_PROJ_Y,
-            y=PROD_HIST_V + PROD_PROJ_REF,
+        ),
+        dict(
+            type="scatter",
+            x=tableau(sim.PROD_HIST_Y + sim.PROD_PROJ_Y),
+            y=tableau(sim.PROD_HIST_V + sim.PROD_PROJ_REF),
             mode="lines",
             line=dict(width=3, color="#2EA043"),
             name="Production nationale (référence)",
-        ))
-
-        # Courbe simulée : part du scénario de référence + surconsommation des DC
-        # Le point d'attache est en 2025 (valeur identique à la référence),
-        # puis chaque année suivante = référence + impact DC.
-        simulated_x = CONSO_PROJ_Y
-        simulated_y = []
-        for year, ref in zip(CONSO_PROJ_Y, CONSO_PROJ_REF):
-            if year < 2025:
-                simulated_y.append(None)
-            elif year == 2025:
-                simulated_y.append(ref)
-            else:
-                simulated_y.append(ref + twh_dc)
-
-        fig.add_trace(go.Scatter(
-            x=simulated_x, y=simulated_y,
+        ),
+        # Courbe simulée — trace TRACE_SIMULEE, mise à jour par patch
+        dict(
+            type="scatter",
+            x=tableau(sim.CONSO_PROJ_Y), y=simulated_y,
             mode="lines",
             line=dict(width=3, dash="dash", color="#F97316"),
             name="Consommation avec Data Centers",
-        ))
-
-        fig.update_layout(
-            xaxis_title="Année",
-            yaxis_title="TWh",
-            height=460,
-            legend=dict(orientation="h", y=-0.2, x=0.5,
-                        xanchor="center", yanchor="top"),
+        ),
+        # Courbe de montée en charge — trace TRACE_MONTEE, mise à jour par patch
+        dict(
+            type="scatter",
+            x=tableau(sim.CONSO_PROJ_Y), y=montee_y,
+            mode="lines",
+            line=dict(width=2, dash="dot", color=COLORS["buildout"]),
+            name="Consommation avec montée en charge (paliers Data One)",
+        ),
+    ]
+
+    layout = fusion(
+        dict(
+            xaxis=dict(title=dict(text="Année")),
+            yaxis=dict(title=dict(text="TWh")),
+            legend=dict(yanchor="top"),
+        ),
+        theme_layout(dark, height=460),
+    )
+    return figure(data, layout)
+
+
+def _build_kpis(
+    consommation_actuelle: float,
+    nb_dc: int, facteur_pct: float, puissance_mw: float,
+) -> dict[str, str]:
+    """Textes de tous les KPI du simulateur, indexés par identifiant d'output."""
+    twh = float(twh_dc(nb_dc, facteur_pct, puissance_mw)[0])
+    eq  = {source: int(n[0]) for source, n in equivalents(twh).items()}
+
+    # Surface au sol pour l'éolien et le solaire
+    # (seules deux filières avec une emprise foncière significative)
+    # Éolien : 50 turbines/parc × 0,78 km²/turbine (espacement + sécurité inclus)
+    turbines_par_parc       = 50
+    surface_par_turbine_km2 = 0.78
+    wind_km2 = eq["wind"] * turbines_par_parc * surface_par_turbine_km2
+    # Solaire : centrale type 10 MW ≈ 12 ha artificialisés (sans compter les espaces entre rangées)
+    surface_par_centrale_km2 = 0.12
+    solar_km2 = eq["solar"] * surface_par_centrale_km2
+
+    return {
+        "info_conso_totale": f"{consommation_actuelle + twh:.0f} TWh",
+
+        # Équivalents de production (horizon 2035)
+        "nuke_value":  _espaces(eq["nuke"]),
+        "hydro_value": _espaces(eq["hydro"]),
+        "coal_value":  _espaces(eq["coal"]),
+        "wind_value":  _espaces(eq["wind"]),
+        "solar_value": _espaces(eq["solar"]),
+        "bio_value":   _espaces(eq["bio"]),
+
+        # Pourcentages du parc national par filière
+        "nuke_pct_total":
+            f"sur {NUC_REACTORS_TOTAL} réacteurs en France — soit {eq['nuke'] / NUC_REACTORS_TOTAL * 100.0:.1f} %",
+        "hydro_pct_total":
+            f"sur ~{HYDRO_BARRAGES_TOTAL} grands barrages hydroélectriques — soit {eq['hydro'] / HYDRO_BARRAGES_TOTAL * 100.0:.1f} %",
+        "wind_pct_total":
+            f"sur {WIND_PARCS_TOTAL:,} parcs éoliens en France — soit {eq['wind'] / WIND_PARCS_TOTAL * 100.0:.1f} %".replace(",", " "),
+        "solar_pct_total":
+            f"sur ~{SOLAR_CENTRALES_TOTAL} centrales PV ≥ 5 MW — soit {eq['solar'] / SOLAR_CENTRALES_TOTAL * 100.0:.1f} %",
+        "coal_pct_total":
+            f"sur {COAL_PLANTS_ACTIVE} centrales encore actives (fermeture 2027) — x{eq['coal'] / COAL_PLANTS_ACTIVE:.1f}",
+        "bio_pct_total":
+            f"sur ~{BIO_PLANTS_TOTAL} centrales biomasse électriques — soit {eq['bio'] / BIO_PLANTS_TOTAL * 100.0:.1f} %",
+
+        "wind_surface":
+            f"≈ {wind_km2:,.0f} km² mobilisés — {wind_km2 / AURA_KM2 * 100.0:.1f} % d'Auvergne-Rhône-Alpes".replace(",", " "),
+        "solar_surface":
+            f"≈ {solar_km2:,.0f} km² artificialisés — {solar_km2 / AURA_KM2 * 100.0:.1f} % d'Auvergne-Rhône-Alpes".replace(",", " "),
+    }
+
+
+# =========================================================
+# Fonctions serveur Shiny
+# =========================================================
+def server(input, output, session, app_dir: Path):
+    sim     = prepare_sim_data(app_dir)
+    cle_app = str(Path(app_dir).resolve())
+
+    # Profil relatif de montée en charge tiré de dc_paliers.csv
+    PROFIL_PALIERS = profil_depuis_paliers(sim.DC_YEARS, sim.DC_TWH_DC)
+
+    # Position des curseurs, arrondie : sert de clé aux caches partagés.
+    # Anti-rebond : pendant qu'un curseur glisse, les valeurs intermédiaires sont
+    # ignorées ; graphique et KPI ne sont recalculés qu'une fois, à la valeur finale.
+    @debounce(DELAI_CURSEURS_S)
+    def _curseurs() -> tuple[int, float, float]:
+        return _quantifier(input.nb_dc(), input.facteur_charge(), input.puissance_mw())
+
+    @reactive.calc
+    def _kpis() -> dict[str, str]:
+        q = _curseurs()
+        return _KPI_CACHE.get_or_build(
+            (cle_app, *q), lambda: _build_kpis(sim.consommation_actuelle, *q)
+        )
+
+    def _courbes(q: tuple[int, float, float]) -> tuple[np.ndarray, np.ndarray]:
+        return _COURBE_CACHE.get_or_build(
+            (cle_app, *q), lambda: _build_courbes_dc(sim, PROFIL_PALIERS, *q)
         )
-        return style_fig(fig, input, height=460)
+
+    # --- Graphique principal ---
+    # Rendu complet une seule fois ; les effets ci-dessous le mettent ensuite à jour.
+    @output
+    @sw.render_widget
+    def energiePlot():
+        q    = valeur_initiale(_curseurs)
+        dark = valeur_initiale(lambda: is_dark(input))
+        fig_dict = _FIG_CACHE.get_or_build(
+            (cle_app, *q, dark),
+            lambda: _build_energie_fig(sim, _courbes(q), dark),
+        )
+        return widget(fig_dict)
+
+    # Curseurs → seules les ordonnées des deux courbes DC sont envoyées
+    @reactive.effect
+    @reactive.event(_curseurs, ignore_init=True)
+    def _patch_courbes():
+        simulated_y, montee_y = _courbes(_curseurs())
+        w = energiePlot.widget
+        with w.batch_update():
+            w.data[TRACE_SIMULEE].y = simulated_y
+            w.data[TRACE_MONTEE].y  = montee_y
+
+    # Thème → seules les couleurs de la mise en page sont envoyées
+    @reactive.effect
+    @reactive.event(lambda: is_dark(input), ignore_init=True)
+    def _patch_theme():
+        w = energiePlot.widget
+        with w.batch_update():
+            style_fig_theme(w, is_dark(input), height=460)
 
     @output
     @render.text
-    def info_conso_totale():
-        nb_dc        = int(input.nb_dc())
-        facteur      = float(input.facteur_charge()) / 100
-        puissance_mw = float(input.puissance_mw())
-        twh_dc       = (puissance_mw * 8760 * facteur / 1e6) * nb_dc
-        total        = consommation_actuelle + twh_dc
-        return f"{total:.0f} TWh"
+    def info_conso_totale(): return _kpis()["info_conso_totale"]
 
     # --- KPI équivalents de production (horizon 2035) ---
-    # _eq() calcule le nombre d'unités pour chaque filière
-    def _eq(source: str) -> str:
-        return f"{equivalent_units(source, int(input.nb_dc()), float(input.facteur_charge()), float(input.puissance_mw())):,}".replace(",", " ")
-
     @output
     @render.text
-    def nuke_value():  return _eq("nuke")
+    def nuke_value():  return _kpis()["nuke_value"]
     @output
     @render.text
-    def hydro_value(): return _eq("hydro")
+    def hydro_value(): return _kpis()["hydro_value"]
     @output
     @render.text
-    def coal_value():  return _eq("coal")
+    def coal_value():  return _kpis()["coal_value"]
     @output
     @render.text
-    def wind_value():  return _eq("wind")
+    def wind_value():  return _kpis()["wind_value"]
     @output
     @render.text
-    def solar_value(): return _eq("solar")
+    def solar_value(): return _kpis()["solar_value"]
     @output
     @render.text
-    def bio_value():   return _eq("bio")
+    def bio_value():   return _kpis()["bio_value"]
 
     # Pourcentages du parc national par filière
     @output
     @render.text
-    def nuke_pct_total():
-        eq  = equivalent_units("nuke", int(input.nb_dc()), float(input.facteur_charge()), float(input.puissance_mw()))
-        pct = (eq / NUC_REACTORS_TOTAL) * 100.0
-        return f"sur {NUC_REACTORS_TOTAL} réacteurs en France — soit {pct:.1f} %"
-
+    def nuke_pct_total():  return _kpis()["nuke_pct_total"]
     @output
     @render.text
-    def hydro_pct_total():
-        eq  = equivalent_units("hydro", int(input.nb_dc()), float(input.facteur_charge()), float(input.puissance_mw()))
-        pct = (eq / HYDRO_BARRAGES_TOTAL) * 100.0
-        return f"sur ~{HYDRO_BARRAGES_TOTAL} grands barrages hydroélectriques — soit {pct:.1f} %"
-
+    def hydro_pct_total(): return _kpis()["hydro_pct_total"]
     @output
     @render.text
-    def wind_pct_total():
-        eq  = equivalent_units("wind", int(input.nb_dc()), float(input.facteur_charge()), float(input.puissance_mw()))
-        pct = (eq / WIND_PARCS_TOTAL) * 100.0
-        return f"sur {WIND_PARCS_TOTAL:,} parcs éoliens en France — soit {pct:.1f} %".replace(",", " ")
-
+    def wind_pct_total():  return _kpis()["wind_pct_total"]
     @output
     @render.text
-    def solar_pct_total():
-        eq  = equivalent_units("solar", int(input.nb_dc()), float(input.facteur_charge()), float(input.puissance_mw()))
-        pct = (eq / SOLAR_CENTRALES_TOTAL) * 100.0
-        return f"sur ~{SOLAR_CENTRALES_TOTAL} centrales PV ≥ 5 MW — soit {pct:.1f} %"
-
+    def solar_pct_total(): return _kpis()["solar_pct_total"]
     @output
     @render.text
-    def coal_pct_total():
-        eq = equivalent_units("coal", int(input.nb_dc()), float(input.facteur_charge()), float(input.puissance_mw()))
-        return f"sur {COAL_PLANTS_ACTIVE} centrales encore actives (fermeture 2027) — x{eq / COAL_PLANTS_ACTIVE:.1f}"
-
+    def coal_pct_total():  return _kpis()["coal_pct_total"]
     @output
     @render.text
-    def bio_pct_total():
-        eq  = equivalent_units("bio", int(input.nb_dc()), float(input.facteur_charge()), float(input.puissance_mw()))
-        pct = (eq / BIO_PLANTS_TOTAL) * 100.0
-        return f"sur ~{BIO_PLANTS_TOTAL} centrales biomasse électriques — soit {pct:.1f} %"
+    def bio_pct_total():   return _kpis()["bio_pct_total"]
 
     # Surface au sol pour l'éolien et le solaire
-    # (seules deux filières avec une emprise foncière significative)
     @output
     @render.text
-    def wind_surface():
-        # 50 turbines/parc × 0,78 km²/turbine (espacement + sécurité inclus)
-        nb_parcs             = equivalent_units("wind", int(input.nb_dc()), float(input.facteur_charge()), float(input.puissance_mw()))
-        turbines_par_parc    = 50
-        surface_par_turbine_km2 = 0.78
-        surface_km2          = nb_parcs * turbines_par_parc * surface_par_turbine_km2
-        pct_fr               = (surface_km2 / AURA_KM2) * 100.0
-        return f"≈ {surface_km2:,.0f} km² mobilisés — {pct_fr:.1f} % d'Auvergne-Rhône-Alpes".replace(",", " ")
-
+    def wind_surface():  return _kpis()["wind_surface"]
     @output
     @render.text
-    def solar_surface():
-        # Centrale type 10 MW ≈ 12 ha artificialisés (sans compter les espaces entre rangées)
-        nb_centrales             = equivalent_units("solar", int(input.nb_dc()), float(input.facteur_charge()), float(input.puissance_mw()))
-        surface_par_centrale_km2 = 0.12
-        surface_km2              = nb_centrales * surface_par_centrale_km2
-        pct_fr                   = (surface_km2 / AURA_KM2) * 100.0
-        return f"≈ {surface_km2:,.0f} km² artificialisés — {pct_fr:.1f} % d'Auvergne-Rhône-Alpes".replace(",", " ")
+    def solar_surface(): return _kpis()["solar_surface"]
 
     # Note de bas de page : sources et hypothèses de calcul
     @output
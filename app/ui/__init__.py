@@ -11,13 +11,19 @@
 #   ui/extraction/         → module Extraction
 #
 # Les textes de la barre de navigation viennent de www/texts/_common.json.
+# Feuille de style et logos sont servis comme fichiers statiques avec empreinte
+# (ui/_assets.py, route /assets/ ajoutée dans app.py), de même que la police et
+# les icônes une fois copiées dans www/vendor/ (python -m ui.vendor).
 from shiny import ui
 
+from ui import _assets
 from ui._common import LOGO_LIGHT, LOGO_DARK, LOGO_CLASS, load_texts
 
 
 def app_ui(request):
     """Point d'entrée UI : Shiny appelle cette fonction à chaque nouvelle connexion."""
+    from ui.vendor import liens_tete   # importé ici : ui.vendor est aussi un script (python -m ui.vendor)
+
     tx = load_texts("_common").get("section3", {})
 
     return ui.page_fluid(
@@ -28,20 +34,12 @@ def app_ui(request):
             ui.tags.meta(charset="utf-8"),
             ui.tags.meta(name="viewport", content="width=device-width, initial-scale=1"),
 
-            # Police Poppins chargée depuis Google Fonts
-            ui.tags.link(rel="preconnect", href="https://fonts.googleapis.com"),
-            ui.tags.link(rel="preconnect", href="https://fonts.gstatic.com", crossorigin=""),
-            ui.tags.link(
-                rel="stylesheet",
-                href="https://fonts.googleapis.com/css2?family=Poppins:wght@400;600;700;800;900&display=swap",
-            ),
-            # Icônes Font Awesome (fa-bolt, fa-map-location-dot, etc.)
-            ui.tags.link(
-                rel="stylesheet",
-                href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.0/css/all.min.css",
-            ),
-            # Feuille de style principale du projet
-            ui.include_css("www/styles.css"),
+            # Police Poppins et icônes Font Awesome (fa-bolt, fa-map-location-dot, etc.) :
+            # copies de www/vendor/, polices préchargées (cf. ui/vendor.py)
+            *liens_tete(),
+            # Feuille de style principale du projet : fichier à part, avec empreinte,
+            # gardé en cache par le navigateur (cf. ui/_assets.py)
+            ui.tags.link(rel="stylesheet", href=_assets.url("styles.css")),
 
             # ===== Mode sombre : bascule logo + classe CSS sur <html> =====
             # Quand l'utilisateur active l'interrupteur "Mode sombre",
@@ -127,6 +125,17 @@ Shiny.addCustomMessageHandler('scrollto', (msg) => {
 """
             ),
 
+            # ===== Espaces réservés des onglets Énergie =====
+            # Une sortie reçoit la classe .sortie-active dès que le serveur la calcule :
+            # le bloc animé de styles.css disparaît (cf. server/energie/__init__.py).
+            ui.tags.script(
+                """
+$(document).on('shiny:recalculating shiny:value shiny:error', (e) => {
+  if (e.target && e.target.classList) e.target.classList.add('sortie-active');
+});
+"""
+            ),
+
             ui.tags.style("#personalized-card{scroll-margin-top:160px;}"),
             ui.tags.style(
                 "button[disabled]{opacity:.45!important;cursor:not-allowed!important}"
@@ -0,0 +1,231 @@
+# ui/_assets.py — fichiers statiques de www/ servis avec empreinte
+#
+# Les logos étaient encodés en base64 dans le HTML de chaque page, et la feuille
+# de style recopiée dans chaque page : un visiteur retéléchargeait près d'un
+# mégaoctet d'images et de CSS à chaque ouverture de l'application.
+#
+# Ici, chaque fichier de www/ (hors data/ et texts/, lus par le serveur) reçoit
+# une URL qui contient une empreinte de son contenu :
+#
+#   url("images/logos.png")  →  "assets/images/logos.3f2a9c1b4d5e.png"
+#
+# Le contenu derrière une URL ne change donc jamais : la route /assets/ l'envoie
+# avec « Cache-Control: immutable » (un an), et le navigateur ne le redemande
+# plus. Quand le fichier change, son URL change avec lui.
+#
+# Les fichiers texte (CSS, JS, SVG…) sont compressés à l'avance en gzip, et en
+# brotli si le paquet brotli est installé. Ces variantes sont écrites une fois
+# dans app/.assets/ (non versionné), partagées par tous les workers, et choisies
+# selon l'en-tête Accept-Encoding du navigateur. La compression (plusieurs
+# secondes pour les bundles JS de www/vendor/) tourne dans un thread au
+# démarrage : en attendant, le fichier est envoyé tel quel.
+#
+# Les URLs sont relatives (sans « / » initial) : elles restent valides quand
+# l'application est servie sous un sous-chemin.
+#
+# Utilisation : url() dans les fichiers ui/ ; monter(app) dans app.py ajoute la
+# route et lance la compression. server/deploiement.py prépare toutes les
+# variantes avant de lancer les workers (preparer_tout).
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # brotli est facultatif : seules les variantes gzip sont produites
+    brotli = None
+
+
+APP_ROOT   = Path(__file__).resolve().parents[1]
+WWW_DIR    = APP_ROOT / "www"
+ASSETS_DIR = APP_ROOT / ".assets"
+
+# Préfixe des URLs (et chemin de la route)
+PREFIXE = "assets"
+
+# Sous-dossiers de www/ qui ne sont pas des fichiers publics
+DOSSIERS_PRIVES = {"data", "texts"}
+
+# Extensions compressées à l'avance (les images et polices woff2 le sont déjà)
+COMPRESSIBLES = {".css", ".js", ".mjs", ".map", ".svg", ".json", ".html", ".txt", ".ttf", ".otf", ".eot"}
+# En dessous de cette taille, la compression ne vaut pas l'aller-retour
+TAILLE_MIN_COMPRESSION = 1024
+
+CACHE_IMMUABLE = "public, max-age=31536000, immutable"
+
+# Longueur de l'empreinte (caractères hexadécimaux de SHA-256)
+LONGUEUR_EMPREINTE = 12
+
+# nom.<empreinte>.ext → (nom, empreinte, .ext)
+_NOM_EMPREINTE = re.compile(rf"^(?P<nom>.+)\.(?P<empreinte>[0-9a-f]{{{LONGUEUR_EMPREINTE}}})(?P<ext>\.[^./]+)?$")
+
+
+@dataclass
+class Fichier:
+    """Un fichier de www/ prêt à être servi."""
+    chemin: str                 # chemin relatif à www/ (ex. "images/logos.png")
+    empreinte: str
+    type_mime: str
+    signature: tuple            # (mtime_ns, taille) de la source au moment du calcul
+
+    @property
+    def url(self) -> str:
+        p = Path(self.chemin)
+        return f"{PREFIXE}/{p.with_name(f'{p.stem}.{self.empreinte}{p.suffix}').as_posix()}"
+
+    @property
+    def compressible(self) -> bool:
+        return Path(self.chemin).suffix.lower() in COMPRESSIBLES and self.signature[1] >= TAILLE_MIN_COMPRESSION
+
+    def variante(self, encodage: str) -> Path:
+        """Fichier compressé (encodage "br" ou "gzip") dans ASSETS_DIR, qu'il existe ou non."""
+        p = Path(self.chemin)
+        return ASSETS_DIR / f"{p.stem}.{self.empreinte}{p.suffix}{_EXTENSIONS[encodage]}"
+
+
+# Encodages produits, du préféré au moins bon → extension du fichier compressé
+_EXTENSIONS = {"br": ".br", "gzip": ".gz"} if brotli is not None else {"gzip": ".gz"}
+
+_FICHIERS: dict[str, Fichier] = {}
+_LOCK = threading.Lock()
+
+
+# =====================================================================
+# Empreintes et variantes compressées
+# =====================================================================
+def _source(chemin: str) -> Path | None:
+    """Fichier de www/ correspondant à chemin, ou None s'il n'est pas public."""
+    source = (WWW_DIR / chemin).resolve()
+    try:
+        relatif = source.relative_to(WWW_DIR)
+    except ValueError:
+        return None         # chemin qui sort de www/ (« ../ »)
+    if not relatif.parts or relatif.parts[0] in DOSSIERS_PRIVES or not source.is_file():
+        return None
+    return source
+
+
+def _ecrire(cible: Path, donnees: bytes) -> None:
+    # Écriture atomique : plusieurs workers peuvent préparer le même fichier
+    tmp = cible.with_name(f"{cible.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(donnees)
+    os.replace(tmp, cible)
+
+
+def compresser(f: Fichier) -> None:
+    """Écrit les variantes compressées de f qui manquent encore."""
+    if not f.compressible:
+        return
+    ASSETS_DIR.mkdir(exist_ok=True)
+    donnees = None
+    for encodage in _EXTENSIONS:
+        cible = f.variante(encodage)
+        if cible.exists():
+            continue
+        if donnees is None:
+            donnees = (WWW_DIR / f.chemin).read_bytes()
+        if encodage == "br":
+            _ecrire(cible, brotli.compress(donnees, quality=11))
+        else:
+            _ecrire(cible, gzip.compress(donnees, compresslevel=9, mtime=0))
+
+
+def _preparer(chemin: str, source: Path) -> Fichier:
+    st = source.stat()
+    empreinte = hashlib.sha256(source.read_bytes()).hexdigest()[:LONGUEUR_EMPREINTE]
+    type_mime = mimetypes.guess_type(source.name)[0] or "application/octet-stream"
+    if type_mime.startswith("text/") or type_mime in ("application/javascript", "image/svg+xml"):
+        type_mime += "; charset=utf-8"
+    return Fichier(chemin=chemin, empreinte=empreinte, type_mime=type_mime, signature=(st.st_mtime_ns, st.st_size))
+
+
+def fichier(chemin: str) -> Fichier | None:
+    """
+    Fichier de www/ avec son empreinte, ou None s'il n'existe pas (ou n'est pas
+    public). Recalculé si la source a changé depuis le dernier appel.
+    """
+    source = _source(chemin)
+    if source is None:
+        return None
+    chemin = source.relative_to(WWW_DIR).as_posix()
+    st = source.stat()
+    with _LOCK:
+        f = _FICHIERS.get(chemin)
+        if f is None or f.signature != (st.st_mtime_ns, st.st_size):
+            f = _FICHIERS[chemin] = _preparer(chemin, source)
+        return f
+
+
+def url(chemin: str) -> str:
+    """URL avec empreinte de www/<chemin> (ex. "styles.css" → "assets/styles.<empreinte>.css")."""
+    f = fichier(chemin)
+    if f is None:
+        raise FileNotFoundError(f"Fichier statique introuvable : www/{chemin}")
+    return f.url
+
+
+def preparer_tout() -> int:
+    """Calcule l'empreinte et les variantes compressées de tous les fichiers publics. Renvoie leur nombre."""
+    n = 0
+    for source in sorted(WWW_DIR.rglob("*")):
+        f = fichier(source.relative_to(WWW_DIR).as_posix()) if source.is_file() else None
+        if f is not None:
+            compresser(f)
+            n += 1
+    return n
+
+
+# =====================================================================
+# Route /assets/
+# =====================================================================
+def _encodages_acceptes(entete: str) -> set[str]:
+    """Encodages de l'en-tête Accept-Encoding (sauf ceux marqués q=0)."""
+    acceptes = set()
+    for partie in entete.split(","):
+        nom, _, params = partie.strip().partition(";")
+        q = params.strip().removeprefix("q=").strip()
+        if nom and q not in ("0", "0.0", "0.00", "0.000"):
+            acceptes.add(nom.strip().lower())
+    return acceptes
+
+
+async def _route_assets(request):
+    from starlette.responses import FileResponse, PlainTextResponse
+
+    # assets/<dossier>/<nom>.<empreinte><ext> → www/<dossier>/<nom><ext>
+    demande = Path(request.path_params["chemin"])
+    m = _NOM_EMPREINTE.match(demande.name)
+    f = fichier(demande.with_name(m["nom"] + (m["ext"] or "")).as_posix()) if m else None
+    if f is None or f.empreinte != m["empreinte"]:
+        # Fichier inconnu, ou ancienne version : le contenu n'est plus celui de cette URL
+        return PlainTextResponse("Not Found", status_code=404)
+
+    entetes = {"Cache-Control": CACHE_IMMUABLE}
+    chemin = WWW_DIR / f.chemin
+    if f.compressible:
+        entetes["Vary"] = "Accept-Encoding"
+        acceptes = _encodages_acceptes(request.headers.get("accept-encoding", ""))
+        for encodage in _EXTENSIONS:            # brotli d'abord s'il est disponible
+            variante = f.variante(encodage)
+            if encodage in acceptes and variante.exists():
+                chemin = variante
+                entetes["Content-Encoding"] = encodage
+                break
+    return FileResponse(chemin, media_type=f.type_mime, headers=entetes)
+
+
+def monter(app) -> None:
+    """Ajoute la route /assets/ à l'application Shiny et prépare les fichiers en arrière-plan."""
+    from starlette.routing import Route
+
+    app.starlette_app.router.routes.insert(
+        0, Route(f"/{PREFIXE}/{{chemin:path}}", _route_assets, methods=["GET", "HEAD"]),
+    )
+    threading.Thread(target=preparer_tout, name="assets", daemon=True).start()
@@ -3,16 +3,23 @@
 # Ce fichier n'affiche rien lui-même. Il fournit des fonctions utilitaires
 # que tous les autres fichiers ui/ importent : chargement des textes JSON,
 # construction du pied de page, des encadrés déroulants, etc.
+#
+# Il garde aussi le rendu HTML de chaque page (accueil, Énergie, Données) :
+# le serveur l'envoie tel quel à chaque navigation au lieu de reconstruire
+# l'arbre de balises (cf. page_en_cache, en fin de fichier).
 from __future__ import annotations
 
-import base64
 import json
-import mimetypes
 import pathlib
+import threading
 from functools import lru_cache
+from typing import Callable
 
+from htmltools import TagList
 from shiny import ui
 
+from ui import _assets
+
 
 # =====================================================================
 # Chemins importants
@@ -94,48 +101,22 @@ def savoir_plus_label() -> str:
 _EXTENSIONS = ("png", "svg", "jpg", "jpeg", "webp")
 
 
-def _data_uri_pour(chemin: pathlib.Path) -> str | None:
-    """Encode une image en base64 pour l'intégrer directement dans le HTML.
-    Évite une requête HTTP séparée et fonctionne même sans serveur de fichiers statiques."""
-    try:
-        mime, _ = mimetypes.guess_type(chemin.name)
-        if mime is None:
-            mime = "image/svg+xml" if chemin.suffix.lower() == ".svg" else "image/png"
-        donnees = base64.b64encode(chemin.read_bytes()).decode("ascii")
-        return f"data:{mime};base64,{donnees}"
-    except Exception:
-        return None
-
-
 def _trouver_logo(noms: list[str]) -> str | None:
     """Cherche un logo parmi plusieurs noms possibles dans www/images/.
-    Renvoie une data-URI si possible (prioritaire), sinon un chemin relatif."""
-    racine = WWW_DIR
-    candidats: list[pathlib.Path] = []
+    Renvoie son URL avec empreinte (ui/_assets.py) : l'image est téléchargée une
+    fois puis gardée en cache par le navigateur, au lieu d'être intégrée en
+    base64 dans chaque page."""
     for nom in noms:
         for ext in _EXTENSIONS:
-            candidats += [racine / "images" / f"{nom}.{ext}", racine / f"{nom}.{ext}"]
-
-    # 1er essai : data URI (intègre l'image dans le HTML)
-    for p in candidats:
-        if p.exists():
-            uri = _data_uri_pour(p)
-            if uri:
-                return uri
-
-    # 2e essai : chemin relatif simple
-    for p in candidats:
-        if p.exists():
-            try:
-                return p.relative_to(racine).as_posix()
-            except Exception:
-                return p.name
-
+            for chemin in (f"images/{nom}.{ext}", f"{nom}.{ext}"):
+                f = _assets.fichier(chemin)
+                if f is not None:
+                    return f.url
     return None
 
 
 def _sources_logos() -> tuple[str, str | None, str]:
-    """Détermine les URLs (ou data-URIs) du logo clair et du logo sombre.
+    """Détermine les URLs du logo clair et du logo sombre.
     Retourne (logo_clair, logo_sombre, classe_css)."""
     clair = _trouver_logo(["verit_logo", "logo"])
     sombre = _trouver_logo(["verit_logo_dark", "logo_dark"])
@@ -232,3 +213,44 @@ def app_footer():
         ),
         class_="app-footer",
     )
+
+
+# =====================================================================
+# Pages pré-rendues
+# Une page ne dépend que des textes JSON : son HTML et ses dépendances
+# (JS/CSS des curseurs, onglets, widgets…) sont calculés une fois par
+# processus et partagés par toutes les sessions. Si un fichier de
+# www/texts/ change, les textes et les pages sont reconstruits.
+# =====================================================================
+_PAGES: dict[str, TagList] = {}
+_PAGES_SIGNATURE: tuple | None = None
+_PAGES_LOCK = threading.Lock()
+
+
+def _signature_textes() -> tuple:
+    """Date de modification et taille de chaque fichier de textes."""
+    signature = []
+    for chemin in sorted(TEXTS_DIR.rglob("*.json")):
+        st = chemin.stat()
+        signature.append((str(chemin), st.st_mtime_ns, st.st_size))
+    return tuple(signature)
+
+
+def page_en_cache(nom: str, construire: Callable[[], ui.TagChild]) -> TagList:
+    """
+    Renvoie la page nom déjà rendue : le HTML sous forme de chaîne et les
+    dépendances web de la page. construire() n'est appelée qu'au premier
+    appel, ou après une modification des textes.
+    """
+    global _PAGES_SIGNATURE
+    signature = _signature_textes()
+    with _PAGES_LOCK:
+        if signature != _PAGES_SIGNATURE:
+            load_texts.cache_clear()
+            _PAGES.clear()
+            _PAGES_SIGNATURE = signature
+        page = _PAGES.get(nom)
+        if page is None:
+            rendu = TagList(construire()).render()
+            page = _PAGES[nom] = TagList(ui.HTML(rendu["html"]), *rendu["dependencies"])
+        return page
@@ -10,6 +10,7 @@
 # Les visualisations sont calculées par server/donnees/gestionnaire.py.
 # Les textes viennent de www/texts/donnees/gestionnaire.json.
 from shiny import ui
+import shinywidgets as sw
 
 from ui._common import load_texts, html
 
@@ -87,7 +88,7 @@ def bloc_hq_flapd():
                                         "position:absolute;top:0;left:0;"
                                         "width:100%;height:100%;"
                                     )},
-                                    ui.output_ui("map_hq_flapd"),
+                                    ui.output_ui("map_hq_flapd", class_="rendu-lourd"),
                                 ),
                             ),
                             class_="panel-body",
@@ -108,7 +109,7 @@ def bloc_hq_flapd():
                     class_="col",
                 ),
 
-                # ---- Treemap (rendu par server → treemap_hq) ----
+                # ---- Treemap (widget rempli par server → treemap_hq) ----
                 ui.div(
                     ui.div(
                         {"class": "panel"},
@@ -120,7 +121,7 @@ def bloc_hq_flapd():
 
                         ui.div(
                             ui.div(
-                                ui.output_ui("treemap_hq"),
+                                sw.output_widget("treemap_hq"),
                                 style="width:100%;height:420px;",
                             ),
                             class_="panel-body",
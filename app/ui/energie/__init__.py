@@ -41,8 +41,9 @@ def _carte_repartition():
             tx_repartition.get("titre_carte", ""),
         ),
         ui.navset_tab(
-            ui.nav_panel(tx_repartition.get("libelle_onglet", ""), repartition_ui.panel()),
-            ui.nav_panel(tx_flapd.get("libelle_onglet",       ""), flapd_ui.panel()),
+            # value= : identifiant stable de l'onglet, lu par server/energie/__init__.py
+            ui.nav_panel(tx_repartition.get("libelle_onglet", ""), repartition_ui.panel(), value="repartition"),
+            ui.nav_panel(tx_flapd.get("libelle_onglet",       ""), flapd_ui.panel(),       value="flapd"),
             id="tabs_repartition",
         ),
         class_="thematique-card",
@@ -66,8 +67,8 @@ def _carte_bilan():
             tx_bilan.get("titre_carte", ""),
         ),
         ui.navset_tab(
-            ui.nav_panel(tx_bilan.get("libelle_onglet",    ""), bilan_ui.panel()),
-            ui.nav_panel(tx_echanges.get("libelle_onglet", ""), echanges_ui.panel()),
+            ui.nav_panel(tx_bilan.get("libelle_onglet",    ""), bilan_ui.panel(),    value="bilan"),
+            ui.nav_panel(tx_echanges.get("libelle_onglet", ""), echanges_ui.panel(), value="echanges"),
             id="tabs_bilan",
         ),
         class_="thematique-card",
@@ -73,7 +73,7 @@ def panel():
                             class_="panel-title",
                         ),
                     ),
-                    ui.div(ui.output_ui("fr_map"), class_="panel-body"),
+                    ui.div(ui.output_ui("fr_map", class_="rendu-lourd"), class_="panel-body"),
                     ui.div(
                         _accordeon_aide(
                             s3.get("aide_html",     ""),
@@ -78,7 +78,7 @@ def panel():
                     ),
 
                     # Carte Folium injectée par le serveur
-                    ui.output_ui("map_flapd_sites", class_="mt-3"),
+                    ui.output_ui("map_flapd_sites", class_="mt-3 rendu-lourd"),
                 ),
             ),
             ui.div(
@@ -31,10 +31,12 @@ def card():
             ui.nav_panel(
                 cadre.get("libelle_predictif",  ""),
                 predictif_ui.panel(),
+                value="predictif",
             ),
             ui.nav_panel(
                 cadre.get("libelle_comparatif", ""),
                 comparatif_ui.panel(),
+                value="comparatif",
             ),
             id="sim_tabs",
         ),
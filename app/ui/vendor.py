@@ -0,0 +1,387 @@
+# ui/vendor.py — bibliothèques front-end hébergées par l'application (www/vendor/)
+#
+# La page chargeait la police Poppins depuis Google Fonts, les icônes Font
+# Awesome depuis cdnjs, et les cartes Folium chargeaient Leaflet (et jQuery,
+# Bootstrap…) depuis plusieurs CDN. Sur un réseau qui bloque ces CDN, la page
+# s'affichait sans police, sans icônes et sans cartes ; ailleurs, ces requêtes
+# vers d'autres domaines retardaient le premier affichage.
+#
+# Ces bibliothèques sont désormais servies depuis www/vendor/, avec empreinte
+# et cache permanent (ui/_assets.py), sans aucun CDN :
+#
+#   vendor/poppins/             Poppins, graisses de la page, alphabets latins
+#                               seulement (latin, latin-ext), en woff2      (versionné)
+#   vendor/fontawesome/         Font Awesome réduit aux icônes citées dans ui/,
+#                               server/, www/texts/ et www/styles.css ; polices
+#                               woff2 réduites aux mêmes glyphes            (versionné)
+#   vendor/leaflet/, vendor/leaflet.markercluster/
+#                               Leaflet et son extension de regroupement
+#                               des marqueurs, pour les cartes Folium       (versionné)
+#   vendor/plotly/              plotly.min.js et widgetbundle.js, copiés depuis
+#                               le paquet plotly installé au déploiement    (non versionné)
+#
+# Les fichiers versionnés sont produits par ce script à partir de paquets PyPI
+# aux versions fixées (SOURCES), jamais depuis un CDN : à relancer seulement
+# quand une icône est ajoutée ou une version changée, puis à committer.
+# server/deploiement.py refuse de démarrer s'il en manque un (verifier()).
+#
+# Les widgets Plotly (FigureWidget) embarquent normalement tout plotly.js
+# (~5 Mo) dans leur état, renvoyé à chaque affichage : avec
+# vendor/plotly/widgetbundle.js, ils le chargent une fois depuis son URL
+# (cf. server/_figures.py).
+#
+# Usage (depuis le dossier app/) :
+#   python -m ui.vendor                        # copie Plotly, vérifie les autres fichiers
+#   python -m ui.vendor --regenerer            # reconstruit Poppins, Font Awesome et Leaflet
+#   python -m ui.vendor --regenerer --wheels /chemin/wheels    # idem, sans réseau
+from __future__ import annotations
+
+import argparse
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+from shiny import ui
+
+from ui import _assets
+
+
+APP_ROOT   = _assets.APP_ROOT
+WWW_DIR    = _assets.WWW_DIR
+VENDOR_DIR = WWW_DIR / "vendor"
+
+# Fichiers utilisés par la page et les widgets (chemins relatifs à www/)
+PLOTLY_JS       = "vendor/plotly/plotly.min.js"
+PLOTLY_WIDGET   = "vendor/plotly/widgetbundle.js"
+POPPINS_CSS     = "vendor/poppins/poppins.css"
+FONTAWESOME_CSS = "vendor/fontawesome/css/all.min.css"
+
+# Paquets PyPI (wheels) d'où sont extraits les fichiers versionnés : nom, version
+SOURCES = {
+    "poppins":       ("fontpkg-poppins", "4.4"),       # Poppins 4.004 (TTF, SIL OFL 1.1)
+    "fontawesome":   ("fontawesomefree", "6.6.0"),     # Font Awesome Free 6.6.0
+    "leaflet":       ("django-leaflet", "0.34.0"),     # Leaflet 1.9.3, version attendue par Folium
+    "markercluster": ("umap-project", "2.0.0"),        # Leaflet.markercluster 1.5.3
+}
+
+# Poppins : graisses utilisées par www/styles.css (500 n'a jamais été chargée :
+# le navigateur la simule), et alphabets conservés (plages Unicode de Google Fonts)
+POPPINS_POIDS = {400: "Regular", 600: "SemiBold", 700: "Bold", 800: "ExtraBold", 900: "Black"}
+POPPINS_ALPHABETS = {
+    "latin": (
+        "U+0000-00FF, U+0131, U+0152-0153, U+02BB-02BC, U+02C6, U+02DA, U+02DC, U+0304, "
+        "U+0308, U+0329, U+2000-206F, U+20AC, U+2122, U+2191, U+2193, U+2212, U+2215, U+FEFF, U+FFFD"
+    ),
+    "latin-ext": (
+        "U+0100-02BA, U+02BD-02C5, U+02C7-02CC, U+02CE-02D7, U+02DD-02FF, U+0304, U+0308, "
+        "U+0329, U+1D00-1DBF, U+1E00-1E9F, U+1EF2-1EFF, U+2020, U+20A0-20AB, U+20AD-20C0, "
+        "U+2113, U+2C60-2C7F, U+A720-A7FF"
+    ),
+}
+
+# Font Awesome : style → police, et classes fa-* qui ne sont pas des icônes
+FONTAWESOME_POLICES = {"solid": "fa-solid-900", "regular": "fa-regular-400", "brands": "fa-brands-400"}
+FONTAWESOME_UTILITAIRES = {
+    "fw", "xs", "sm", "lg", "xl", "2xs", "2xl", "1x", "2x", "3x", "4x", "5x", "6x", "7x", "8x", "9x", "10x",
+    "spin", "spin-pulse", "spin-reverse", "pulse", "beat", "beat-fade", "bounce", "fade", "flip", "shake",
+    "rotate-90", "rotate-180", "rotate-270", "rotate-by", "flip-horizontal", "flip-vertical", "flip-both",
+    "border", "pull-left", "pull-right", "stack", "stack-1x", "stack-2x", "inverse", "ul", "li", "sr-only",
+}
+
+# Ressources Folium (nom donné par Folium → fichier de www/vendor/)
+FOLIUM = {
+    "leaflet":                 "vendor/leaflet/leaflet.js",
+    "leaflet_css":             "vendor/leaflet/leaflet.css",
+    "markerclusterjs":         "vendor/leaflet.markercluster/leaflet.markercluster.js",
+    "markerclustercss":        "vendor/leaflet.markercluster/MarkerCluster.css",
+    "markerclusterdefaultcss": "vendor/leaflet.markercluster/MarkerCluster.Default.css",
+}
+# Chargées par défaut par Folium mais inutiles à nos cartes (marqueurs « awesome »,
+# Bootstrap, jQuery, Glyphicons) : retirées
+FOLIUM_INUTILES = {
+    "jquery", "bootstrap", "awesome_markers", "bootstrap_css", "glyphicons_css",
+    "awesome_markers_font_css", "awesome_markers_css", "awesome_rotate_css",
+}
+LEAFLET_IMAGES = ("layers.png", "layers-2x.png", "marker-icon.png", "marker-icon-2x.png", "marker-shadow.png")
+
+# Fichiers versionnés sans lesquels la page ou les cartes s'affichent mal
+FICHIERS_REQUIS = [
+    POPPINS_CSS,
+    *(f"vendor/poppins/poppins-{p}-{a}.woff2" for p in POPPINS_POIDS for a in POPPINS_ALPHABETS),
+    FONTAWESOME_CSS,
+    *FOLIUM.values(),
+    *(f"vendor/leaflet/images/{image}" for image in LEAFLET_IMAGES),
+]
+
+
+# =====================================================================
+# Utilisation dans l'application
+# =====================================================================
+def manquants() -> list[str]:
+    """Fichiers de FICHIERS_REQUIS absents de www/."""
+    return [chemin for chemin in FICHIERS_REQUIS if _assets.fichier(chemin) is None]
+
+
+def verifier() -> None:
+    """Lève FileNotFoundError s'il manque un fichier versionné de www/vendor/ (appelée au déploiement)."""
+    absents = manquants()
+    if absents:
+        raise FileNotFoundError(
+            f"{len(absents)} fichier(s) de www/vendor/ manquant(s) ({', '.join(absents[:3])}…) : "
+            "python -m ui.vendor --regenerer"
+        )
+
+
+def _prechargement(police: Path) -> object:
+    return ui.tags.link(
+        rel="preload", href=_assets.url(police.relative_to(WWW_DIR).as_posix()),
+        **{"as": "font", "type": "font/woff2", "crossorigin": ""},
+    )
+
+
+def liens_tete() -> list:
+    """
+    Balises <head> des polices et icônes (fichiers de www/vendor/), précédées du
+    préchargement des polices utilisées dès le premier affichage.
+    """
+    liens = [_prechargement(p) for p in sorted((VENDOR_DIR / "poppins").glob("*-latin.woff2"))]
+    liens.append(ui.tags.link(rel="stylesheet", href=_assets.url(POPPINS_CSS)))
+    liens += [_prechargement(p) for p in sorted((VENDOR_DIR / "fontawesome" / "webfonts").glob("*.woff2"))]
+    liens.append(ui.tags.link(rel="stylesheet", href=_assets.url(FONTAWESOME_CSS)))
+    return liens
+
+
+def ressources_folium(liens: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """
+    Liste (nom, URL) de bibliothèques d'un élément Folium, avec les copies de
+    www/vendor/ à la place des CDN, sans les bibliothèques inutiles à nos cartes.
+    """
+    resultat = []
+    for nom, lien in liens:
+        if nom in FOLIUM_INUTILES:
+            continue
+        resultat.append((nom, _assets.url(FOLIUM[nom]) if nom in FOLIUM else lien))
+    return resultat
+
+
+# =====================================================================
+# Construction de www/vendor/
+# =====================================================================
+def _ecrire(chemin: str, donnees: bytes | str) -> Path:
+    cible = WWW_DIR / chemin
+    cible.parent.mkdir(parents=True, exist_ok=True)
+    if isinstance(donnees, str):
+        cible.write_text(donnees, encoding="utf-8")
+    else:
+        cible.write_bytes(donnees)
+    return cible
+
+
+def _wheel(source: str, dossier: Path, wheels: Path | None) -> zipfile.ZipFile:
+    """
+    Wheel du paquet SOURCES[source], téléchargé par pip (index configuré, ou
+    seulement le dossier wheels s'il est donné : aucun accès réseau).
+    """
+    paquet, version = SOURCES[source]
+    commande = [
+        sys.executable, "-m", "pip", "download", "--quiet", "--no-deps",
+        "--only-binary=:all:", "--dest", str(dossier), f"{paquet}=={version}",
+    ]
+    if wheels is not None:
+        commande += ["--no-index", "--find-links", str(wheels)]
+    subprocess.run(commande, check=True)
+    prefixe = paquet.replace("-", "_").lower() + "-" + version + "-"
+    (chemin,) = [w for w in dossier.glob("*.whl") if w.name.lower().startswith(prefixe)]
+    return zipfile.ZipFile(chemin)
+
+
+def _sous_ensemble(police: bytes, unicodes: list[int] | None = None, texte_plages: str | None = None) -> bytes:
+    """Police woff2 réduite aux caractères donnés (codes, ou plages « U+0000-00FF, … »)."""
+    import io
+    from fontTools import subset
+
+    if texte_plages is not None:
+        unicodes = subset.parse_unicodes(texte_plages.replace("U+", "").replace(" ", ""))
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["*"]
+    options.name_IDs = ["*"]            # noms et mentions de licence conservés
+    f = subset.load_font(io.BytesIO(police), options)
+    sous_ensemble = subset.Subsetter(options)
+    sous_ensemble.populate(unicodes=unicodes)
+    sous_ensemble.subset(f)
+    sortie = io.BytesIO()
+    subset.save_font(f, sortie, options)
+    return sortie.getvalue()
+
+
+def construire_poppins(dossier: Path, wheels: Path | None = None) -> list[str]:
+    """Poppins en woff2 : graisses POPPINS_POIDS, un fichier par alphabet de POPPINS_ALPHABETS."""
+    whl = _wheel("poppins", dossier, wheels)
+    blocs, fichiers = [], []
+    for graisse, style in POPPINS_POIDS.items():
+        ttf = whl.read(f"fontpkg_poppins/files/Poppins-{style}.ttf")
+        for alphabet, plages in POPPINS_ALPHABETS.items():
+            nom = f"poppins-{graisse}-{alphabet}.woff2"
+            _ecrire(f"vendor/poppins/{nom}", _sous_ensemble(ttf, texte_plages=plages))
+            fichiers.append(f"vendor/poppins/{nom}")
+            blocs.append(
+                f"/* {alphabet} */\n@font-face {{\n  font-family: 'Poppins';\n  font-style: normal;\n"
+                f"  font-weight: {graisse};\n  font-display: swap;\n  src: url({nom}) format('woff2');\n"
+                f"  unicode-range: {plages};\n}}"
+            )
+    _ecrire("vendor/poppins/OFL.txt", whl.read("fontpkg_poppins/LICENSE"))
+
+    _urls_avec_empreinte(_ecrire(POPPINS_CSS, "\n".join(blocs) + "\n"))
+    return fichiers + [POPPINS_CSS, "vendor/poppins/OFL.txt"]
+
+
+def icones_utilisees() -> tuple[set[str], set[str]]:
+    """(icônes, styles) Font Awesome cités dans ui/, server/, www/texts/ et www/styles.css."""
+    sources = [
+        *APP_ROOT.glob("ui/**/*.py"), *APP_ROOT.glob("server/**/*.py"),
+        *WWW_DIR.glob("texts/**/*.json"), WWW_DIR / "styles.css",
+    ]
+    noms: set[str] = set()
+    for source in sources:
+        if source == Path(__file__):
+            continue            # noms des polices ci-dessus, pas des icônes
+        noms |= set(re.findall(r"\bfa-([a-z0-9]+(?:-[a-z0-9]+)*)", source.read_text(encoding="utf-8")))
+    styles = {s for s in FONTAWESOME_POLICES if s in noms} or {"solid"}
+    return noms - FONTAWESOME_UTILITAIRES - set(FONTAWESOME_POLICES), styles
+
+
+# Règle d'icône : « .fa-bolt:before{content:"\f0e7"} » (ou --fa: depuis Font Awesome 6.6)
+_REGLE_ICONE = re.compile(r'((?:\.fa-[a-z0-9-]+(?:::?before)?,?)+)\{(?:content|--fa):"(\\[0-9a-f]+|[^"]*)";?\}')
+
+
+def _css_fontawesome(css: str, icones: set[str], polices: set[str]) -> tuple[str, set[int]]:
+    """CSS réduit aux icônes et polices utilisées, et codes Unicode des glyphes conservés."""
+    codes: set[int] = set()
+
+    def garder(m: re.Match) -> str:
+        selecteurs = [s for s in m[1].split(",") if s and re.match(r"\.fa-([a-z0-9-]+?)(?:::?before)?$", s)[1] in icones]
+        if not selecteurs:
+            return ""
+        valeur = m[2]
+        codes.update([int(valeur[1:], 16)] if valeur.startswith("\\") else (ord(c) for c in valeur))
+        return ",".join(selecteurs) + m[0][len(m[1]):]
+
+    css = _REGLE_ICONE.sub(garder, css)
+    # @font-face des styles inutilisés, et formats autres que woff2
+    css = re.sub(r"@font-face\{[^}]*\}", lambda m: m[0] if any(p in m[0] for p in polices) else "", css)
+    css = re.sub(r',url\([^)]+\.ttf\) format\("truetype"\)', "", css)
+    return css, codes
+
+
+def construire_fontawesome(dossier: Path, wheels: Path | None = None) -> list[str]:
+    """Font Awesome réduit aux icônes utilisées : CSS et polices woff2."""
+    whl = _wheel("fontawesome", dossier, wheels)
+    base = "fontawesomefree/static/fontawesomefree"
+    icones, styles = icones_utilisees()
+    polices = {FONTAWESOME_POLICES[s] for s in styles}
+    css, codes = _css_fontawesome(whl.read(f"{base}/css/all.min.css").decode("utf-8"), icones, polices)
+
+    fichiers = []
+    for police in sorted(polices):
+        chemin = f"vendor/fontawesome/webfonts/{police}.woff2"
+        _ecrire(chemin, _sous_ensemble(whl.read(f"{base}/webfonts/{police}.woff2"), unicodes=sorted(codes)))
+        fichiers.append(chemin)
+
+    _urls_avec_empreinte(_ecrire(FONTAWESOME_CSS, css))
+    print(f"  Font Awesome : {len(icones)} icônes conservées ({', '.join(sorted(styles))})")
+    return fichiers + [FONTAWESOME_CSS]
+
+
+def construire_leaflet(dossier: Path, wheels: Path | None = None) -> list[str]:
+    """Leaflet (paquet django-leaflet) et Leaflet.markercluster (paquet umap-project)."""
+    leaflet = _wheel("leaflet", dossier, wheels)
+    cluster = _wheel("markercluster", dossier, wheels)
+    fichiers_sources = {
+        FOLIUM["leaflet"]:                 (leaflet, "leaflet/static/leaflet/leaflet.js"),
+        FOLIUM["leaflet_css"]:             (leaflet, "leaflet/static/leaflet/leaflet.css"),
+        # Version non minifiée : elle seule porte la mention de copyright (licence MIT)
+        FOLIUM["markerclusterjs"]:         (cluster, "umap/static/umap/vendors/markercluster/leaflet.markercluster-src.js"),
+        FOLIUM["markerclustercss"]:        (cluster, "umap/static/umap/vendors/markercluster/MarkerCluster.css"),
+        FOLIUM["markerclusterdefaultcss"]: (cluster, "umap/static/umap/vendors/markercluster/MarkerCluster.Default.css"),
+        # Images référencées par leaflet.css (contrôle des couches, marqueur par défaut)
+        **{
+            f"vendor/leaflet/images/{image}": (leaflet, f"leaflet/static/leaflet/images/{image}")
+            for image in LEAFLET_IMAGES
+        },
+    }
+    for chemin, (whl, membre) in fichiers_sources.items():
+        _ecrire(chemin, whl.read(membre))
+    # Le fichier source garde sa carte de source : lien retiré, elle n'est pas copiée
+    js = WWW_DIR / FOLIUM["markerclusterjs"]
+    js.write_text(re.sub(r"\n//# sourceMappingURL=.*\s*$", "\n", js.read_text(encoding="utf-8")), encoding="utf-8")
+    _urls_avec_empreinte(WWW_DIR / FOLIUM["leaflet_css"])
+    return list(fichiers_sources)
+
+
+def _urls_avec_empreinte(css: Path) -> None:
+    """Remplace, dans un CSS de www/vendor/, les url() de fichiers locaux par leur nom avec empreinte."""
+    def remplacer(m: re.Match) -> str:
+        ref = m[2]
+        if ref.startswith(("data:", "http:", "https:", "//", "#")):
+            return m[0]
+        # « fichier.woff2?v=6.5.0#iefix » → fichier, « ? », « v=6.5.0#iefix »
+        chemin, sep, suite = (re.split(r"([?#])", ref, maxsplit=1) + ["", ""])[:3]
+        cible = (css.parent / chemin).resolve()
+        try:
+            f = _assets.fichier(cible.relative_to(WWW_DIR).as_posix())
+        except ValueError:
+            f = None
+        if f is None:
+            return m[0]
+        nouveau = (Path(chemin).parent / Path(f.url).name).as_posix()
+        return f"url({m[1]}{nouveau}{sep}{suite}{m[1]})"
+
+    texte = css.read_text(encoding="utf-8")
+    css.write_text(re.sub(r"url\((['\"]?)([^)'\"]+)\1\)", remplacer, texte), encoding="utf-8")
+
+
+def copier_plotly() -> list[str]:
+    """Copie plotly.min.js et widgetbundle.js depuis le paquet plotly installé."""
+    import plotly
+
+    source = Path(plotly.__file__).parent / "package_data"
+    copies = []
+    for nom, cible in (("plotly.min.js", PLOTLY_JS), ("widgetbundle.js", PLOTLY_WIDGET)):
+        destination = WWW_DIR / cible
+        if destination.exists() and destination.read_bytes() == (source / nom).read_bytes():
+            continue
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source / nom, destination)
+        copies.append(cible)
+    return copies
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Prépare les bibliothèques front-end de www/vendor/.")
+    parser.add_argument("--regenerer", action="store_true",
+                        help="reconstruit Poppins, Font Awesome et Leaflet depuis les paquets de SOURCES")
+    parser.add_argument("--wheels", type=Path, help="dossier de wheels à utiliser au lieu de l'index PyPI")
+    args = parser.parse_args(argv)
+
+    print(f"{'Plotly':<14} {len(copier_plotly())} fichier(s) copié(s)")
+    if args.regenerer:
+        with tempfile.TemporaryDirectory() as tmp:
+            for nom, etape in [("Poppins", construire_poppins), ("Font Awesome", construire_fontawesome),
+                               ("Leaflet", construire_leaflet)]:
+                fichiers = etape(Path(tmp), args.wheels)
+                print(f"{nom:<14} {len(fichiers)} fichier(s) écrit(s)")
+
+    absents = manquants()
+    for chemin in absents:
+        print(f"manquant : www/{chemin}")
+    print(f"Fichiers statiques : {_assets.preparer_tout()} prêts")
+    return 1 if absents else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())